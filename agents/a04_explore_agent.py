@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 from crewai import Agent
-from tools.custom_tools import AdvancedPineconeVectorSearchTool, serper_search_tool, get_simple_tools
+from tools.custom_tools import AdvancedPineconeVectorSearchTool, pinecone_multi_vector_search, serper_search_tool, get_simple_tools
 from config import config
 import streamlit as st
 from datetime import datetime
@@ -62,6 +62,7 @@ class ExploreAgent:
         # 2) Core you always used (kept for backward compatibility; de-dupe later)
         tools_list += [
             AdvancedPineconeVectorSearchTool(),
+            pinecone_multi_vector_search,  # fan-out research in one call
             serper_search_tool,
         ]
 
@@ -304,6 +305,7 @@ Every key statement must carry its **provenance cue**.
 ──────────────────────────────────────────────────────────────────────────────
 ## TOOLS (AUTONOMOUS, CASE-DEPENDENT SELECTION)
 - **AdvancedPineconeVectorSearchTool** → internal semantic corpus (cite Doc-ID §).  
+- **pinecone_multi_vector_search** → several internal-corpus queries in one call (grouped results).  
 - **serper_search_tool** → external web evidence (URL + access date).  
 - **Optional pack:** WebPageReaderTool, PDFTableExtractorTool, HTML2TextTool, SourceCredibilityTool, DeduplicateSnippetsTool, CitationWeaverTool, DataCleanerTool, MarkdownFormatterTool, EntityResolutionTool, KPIExtractorTool, TrendDetectorTool, NewsTimelineTool, RiskRegisterTool.  
 - **Other domain-specific tools** required by the problem.
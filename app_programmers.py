@@ -23,6 +23,7 @@ import threading
 from config import config
 from utils import AuthManager, SessionManager, DocumentProcessor, VectorStore, PDFGenerator
 from utils.docx_generator import DocxGenerator
+from utils.ingestion_pipeline import IngestionPipeline
 from workflows.decide_workflow import DecideWorkflow
 from utils.token_batch_manager import TokenBatchManager  # Import the TokenBatchManager
 
@@ -454,23 +455,28 @@ def process_documents(uploaded_files):
     doc_processor = DocumentProcessor()
     vector_store = VectorStore(collection_name="mimetica") if 'collection_name' in VectorStore.__init__.__code__.co_varnames else VectorStore()
     
-    processed_documents = []
+    def on_progress(event):
+        progress_bar.progress(event['completed_steps'] / max(1, event['total_steps']))
+        status_text.text(f"{event['filename']}: {event['message']}")
+    
+    # Parse, embed and upsert all files as overlapping pipeline stages
+    pipeline = IngestionPipeline(doc_processor, vector_store)
+    results = pipeline.run(uploaded_files, on_progress=on_progress)
     
-    for i, uploaded_file in enumerate(uploaded_files):
-        progress = (i + 1) / len(uploaded_files)
-        progress_bar.progress(progress)
-        status_text.text(f"Processing {uploaded_file.name}...")
-        # Process document
-        doc_result = doc_processor.process_file(uploaded_file)
-        if doc_result:
-            processed_documents.append(doc_result)
-            # Vectorize document always into 'mimetica' collection
-            if vector_store.vectorize_document(doc_result):
-                SessionManager.add_log("INFO", f"Successfully processed and vectorized {uploaded_file.name}")
+    processed_documents = []
+    for result in results:
+        if result['document']:
+            processed_documents.append(result['document'])
+            if result['vectorized']:
+                SessionManager.add_log("INFO", f"Successfully processed and vectorized {result['filename']}")
             else:
-                SessionManager.add_log("WARNING", f"Failed to vectorize {uploaded_file.name}")
+                SessionManager.add_log("WARNING", f"Failed to vectorize {result['filename']}: {result['error'] or 'no chunks stored'}")
         else:
-            SessionManager.add_log("ERROR", f"Failed to process {uploaded_file.name}")
+            SessionManager.add_log("ERROR", f"Failed to process {result['filename']}: {result['error']}")
+            if result['failed_stage'] != 'validate':  # validate_file already reported it
+                st.error(f"Error processing {result['filename']}: {result['error']}")
+        if result['failed_chunks']:
+            st.warning(f"{result['failed_chunks']} of {result['chunks']} chunks could not be embedded for {result['filename']}")
     
     # Update session state
     st.session_state.workflow_state['documents'] = processed_documents
@@ -615,13 +621,25 @@ def show_workflow_page():
     
     else:
         # Show workflow control panel (existing functionality)
-        col1, col2 = st.columns(2)
+        checkpoint = workflow.load_checkpoint() or {}
+        checkpointed_phases = checkpoint.get('completed_phases', [])
+        bypass_cache = st.checkbox(
+            "🔁 Regenerate every phase (bypass phase cache)",
+            help="By default, phases whose prompts, inputs and model are unchanged reuse their previous output"
+        )
+        col1, col2, col3 = st.columns(3)
         
         with col1:
             if st.button("▶️ Run Complete Workflow", type="primary", use_container_width=True):
-                run_complete_workflow(workflow)
+                run_complete_workflow(workflow, use_cache=not bypass_cache)
         
         with col2:
+            if st.button("⏯️ Resume Workflow", use_container_width=True,
+                         disabled=not checkpointed_phases,
+                         help=f"Skip checkpointed phases: {', '.join(checkpointed_phases)}" if checkpointed_phases else None):
+                run_complete_workflow(workflow, resume=True, use_cache=not bypass_cache)
+        
+        with col3:
             if st.button("View Progress", use_container_width=True):
                 show_workflow_progress()
     
@@ -670,8 +688,8 @@ def show_workflow_page():
         else:
             st.info("No logs available")
 
-def run_complete_workflow(workflow):
-    """Run the complete DECIDE workflow with enhanced rate limiting"""
+def run_complete_workflow(workflow, resume=False, use_cache=True):
+    """Run the complete DECIDE workflow with enhanced rate limiting (resume: continue from the last checkpoint)"""
     try:
         documents = st.session_state.workflow_state.get('documents', [])
         if not documents:
@@ -687,10 +705,13 @@ def run_complete_workflow(workflow):
             
             # Display workflow information
             st.info(f"🎯 Using {provider} provider ({current_model})")
-            st.info(f"📊 Rate limits: {rate_limits['tokens_per_minute']:,} TPM, {rate_limits['inter_phase_delay']}s between phases")
+            st.info(f"📊 Rate limits: {rate_limits['tokens_per_minute']:,} TPM, token-bucket admission between phases")
             
             # Execute enhanced workflow
-            result = workflow.run_complete_workflow()
+            if resume:
+                result = workflow.resume_from(use_cache=use_cache)
+            else:
+                result = workflow.run_complete_workflow(use_cache=use_cache)
             
             if result.get('success'):
                 st.success("🎉 Workflow completed successfully!")
@@ -0,0 +1,306 @@
+"""
+MIMÉTICA headless runner - DECIDE workflow without a Streamlit session
+Runs the workflow from a directory of documents and a JSON project spec, singly or as an overnight batch
+
+    python cli.py run --docs ./docs --project project.json
+    python cli.py batch jobs/*.json
+
+Project spec (JSON):
+    {
+        "name": "Loyalty program redesign",
+        "description": "...",
+        "focus": "Customer Experience",
+        "language_tag": "en",                 optional, default "en"
+        "model": "gpt-4o-mini",               optional, default config.DEFAULT_MODEL
+        "documents_dir": "docs"               batch only; relative to the spec file
+    }
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import argparse
+import traceback
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from streamlit import config as st_config, logger as st_logger
+
+from config import config
+from utils import DocumentProcessor, IngestionPipeline, SessionManager, VectorStore
+from utils.state_backend import DictState, use_state_backend
+from workflows.decide_workflow import DecideWorkflow
+
+
+class LocalDocument(io.BufferedReader):
+    """A document on disk presented like a Streamlit UploadedFile (name, size, read/seek)"""
+
+    def __init__(self, path: str):
+        super().__init__(io.FileIO(path, 'rb'))
+        self._display_name = os.path.basename(path)
+        self.size = os.path.getsize(path)
+
+    @property
+    def name(self) -> str:
+        return self._display_name
+
+
+class _EchoLogs(list):
+    """Session log list that also prints each entry as it is added"""
+
+    def append(self, entry: Dict[str, Any]):
+        super().append(entry)
+        print(f"[{entry['timestamp'][11:19]}] {entry['level']:<7} {entry['message']}", flush=True)
+
+
+def load_project_spec(path: str) -> Dict[str, Any]:
+    """Load and check a JSON project spec"""
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict) or not spec.get('name'):
+        raise ValueError(f"{path}: project spec must be a JSON object with at least a 'name'")
+    return spec
+
+
+def find_documents(docs_dir: str) -> List[str]:
+    """Supported documents directly inside docs_dir, sorted by name"""
+    if not os.path.isdir(docs_dir):
+        raise ValueError(f"Documents directory not found: {docs_dir}")
+    return sorted(
+        os.path.join(docs_dir, name) for name in os.listdir(docs_dir)
+        if os.path.isfile(os.path.join(docs_dir, name))
+        and os.path.splitext(name)[1].lower() in config.ALLOWED_EXTENSIONS
+    )
+
+
+def run_index_name(workflow_id: str) -> str:
+    """Vector index of one headless run: a valid Pinecone index name derived from its workflow ID"""
+    return re.sub(r'[^a-z0-9-]+', '-', f"mimetica-{workflow_id}".lower())[:45].strip('-')
+
+
+def ingest_documents(paths: List[str], vectorize: bool = True) -> List[Dict[str, Any]]:
+    """
+    Parse (and embed) documents through the same pipeline as the app's upload page
+
+    The session's vector index (the run's own, see run_index_name) is cleared
+    first, so the run only retrieves from its own documents.
+
+    Raises:
+        RuntimeError: The vector index could not be cleared, or a parsed document could not be vectorized
+    """
+    vector_store = None
+    if vectorize:
+        vector_store = VectorStore()
+        if not vector_store.clear_collection():
+            raise RuntimeError(f"Could not clear vector index {vector_store.index_name}")
+
+    files = [LocalDocument(path) for path in paths]
+    try:
+        pipeline = IngestionPipeline(DocumentProcessor(), vector_store)
+        results = pipeline.run(files)
+    finally:
+        for f in files:
+            f.close()
+
+    documents = []
+    not_vectorized = []
+    for result in results:
+        if result['document']:
+            documents.append(result['document'])
+            if vector_store is not None and not result['vectorized']:
+                SessionManager.add_log("ERROR", f"Failed to vectorize {result['filename']}: {result['error'] or 'no chunks stored'}")
+                not_vectorized.append(result['filename'])
+        else:
+            SessionManager.add_log("ERROR", f"Failed to process {result['filename']}: {result['error']}")
+    SessionManager.add_log("INFO", f"Document processing completed: {len(documents)} documents")
+    # The analysis would silently miss these documents' content
+    if not_vectorized:
+        raise RuntimeError(f"Failed to vectorize {len(not_vectorized)} of {len(documents)} documents: {', '.join(not_vectorized)}")
+    return documents
+
+
+def run_analysis(spec: Dict[str, Any], docs_dir: str,
+                 use_cache: bool = True,
+                 vectorize: bool = True,
+                 resume_workflow_id: Optional[str] = None,
+                 resume_phase: Optional[str] = None,
+                 index_name: Optional[str] = None,
+                 verbose: bool = False) -> Dict[str, Any]:
+    """
+    Run one DECIDE workflow in its own in-memory session state
+
+    Args:
+        spec: Project spec (name, description, focus, language_tag, model)
+        docs_dir: Directory of documents to analyze
+        use_cache: Reuse cached phase outputs whose inputs are unchanged
+        vectorize: Embed documents into the vector store (False: parse only)
+        resume_workflow_id: Resume this checkpointed workflow instead of starting a new one
+        resume_phase: With resume_workflow_id, re-run from this phase
+        index_name: Vector index to use instead of the run's own (see run_index_name)
+        verbose: Print session log entries as they are added
+
+    Returns:
+        Run summary, also written to outputs/<workflow_id>/headless_run.json
+    """
+    state = DictState()
+    started = datetime.now()
+    with use_state_backend(state):
+        SessionManager.init_session()
+        if verbose:
+            state.logs = _EchoLogs()
+
+        ws = state.workflow_state
+        # Batch jobs can start within the same second; keep their output directories apart
+        ws['workflow_id'] = resume_workflow_id or f"workflow_{started.strftime('%Y%m%d_%H%M%S_%f')}"
+        # Never touch the app's shared index; a resumed run finds its vectors where it left them
+        state['vector_index_name'] = index_name or run_index_name(ws['workflow_id'])
+        ws['project_info'] = {
+            'name': spec['name'],
+            'description': spec.get('description', ''),
+            'focus': spec.get('focus', ''),
+            'created_at': spec.get('created_at', started.isoformat())
+        }
+        state['language_tag'] = ws['language_tag'] = spec.get('language_tag', 'en')
+        state['selected_model'] = spec.get('model', config.DEFAULT_MODEL)
+        model = config.validate_and_fix_selected_model()
+
+        workflow = DecideWorkflow()
+        if resume_workflow_id:
+            # Documents are restored from the checkpoint and are already in the run's index
+            result = workflow.resume_from(resume_phase, workflow_id=resume_workflow_id, use_cache=use_cache)
+        else:
+            try:
+                ws['documents'] = ingest_documents(find_documents(docs_dir), vectorize=vectorize)
+            except Exception as e:
+                result = {'success': False, 'error': f"Document ingestion failed: {str(e)}"}
+            else:
+                if not ws['documents']:
+                    result = {'success': False, 'error': f"No documents could be processed from {docs_dir}"}
+                else:
+                    result = workflow.run_complete_workflow(use_cache=use_cache)
+
+        # Pinecone caps the number of indexes: keep the run's own index only while a
+        # failed run can still be resumed from its checkpoint
+        vector_index = state['vector_index_name']
+        vector_index_deleted = False
+        resumable = not result.get('success') and workflow.load_checkpoint() is not None
+        if index_name is None and not resumable:
+            vector_index_deleted = VectorStore.delete_session_index()
+            if not vector_index_deleted:
+                SessionManager.add_log("WARNING", f"Could not delete vector index {vector_index}; delete it manually")
+
+        summary = {
+            'workflow_id': workflow.workflow_id,
+            'project': spec['name'],
+            'model': model,
+            'documents': len(ws['documents']),
+            'started_at': started.isoformat(),
+            'finished_at': datetime.now().isoformat(),
+            'success': bool(result.get('success')),
+            'error': result.get('error'),
+            'failed_phase': result.get('failed_phase'),
+            'completed_phases': result.get('completed_phases', []),
+            'vector_index': vector_index,
+            'vector_index_deleted': vector_index_deleted,
+            'execution_stats': result.get('execution_stats', {}),
+            'outputs': {
+                phase: files.get('latest')
+                for phase, files in ws.get('saved_markdown_files', {}).items()
+            },
+            'logs': list(state.logs)
+        }
+
+    summary_path = os.path.join(config.OUTPUTS_DIR, summary['workflow_id'], "headless_run.json")
+    os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    summary['summary_path'] = summary_path
+    return summary
+
+
+def _print_summary(summary: Dict[str, Any]):
+    status = "OK" if summary['success'] else f"FAILED at {summary['failed_phase'] or 'setup'}: {summary['error']}"
+    print(f"{summary['project']} [{summary['workflow_id']}] {status}")
+    print(f"  phases: {', '.join(summary['completed_phases']) or 'none'}")
+    print(f"  summary: {summary['summary_path']}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run the DECIDE workflow without Streamlit")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Run one analysis")
+    run.add_argument('--docs', required=True, help="Directory of documents to analyze")
+    run.add_argument('--project', required=True, help="JSON project spec")
+    run.add_argument('--resume', metavar='WORKFLOW_ID', help="Resume a checkpointed workflow")
+    run.add_argument('--from-phase', help="With --resume, re-run from this phase")
+
+    batch = commands.add_parser('batch', help="Run one analysis per project spec, in sequence")
+    batch.add_argument('specs', nargs='+', help="JSON project specs, each with a documents_dir")
+    batch.add_argument('--stop-on-error', action='store_true', help="Stop at the first failed analysis")
+
+    for command in (run, batch):
+        command.add_argument('--no-cache', action='store_true', help="Regenerate every phase (bypass phase cache)")
+        command.add_argument('--no-vectorize', action='store_true', help="Parse documents without embedding them")
+        command.add_argument('--index-name', help="Vector index to use (and keep) instead of the run's own "
+                                                  "(mimetica-<workflow_id>, deleted unless the run can be resumed)")
+        command.add_argument('--quiet', action='store_true', help="Only print run summaries")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    # Without a script run, st.* calls are no-ops; silence Streamlit's bare-mode warnings about them
+    st_config.set_option('global.showWarningOnDirectExecution', False)
+    st_logger.set_log_level('error')
+
+    # Check every spec before the first (long) run starts
+    try:
+        if args.command == 'run':
+            jobs = [(load_project_spec(args.project), args.docs)]
+        else:
+            jobs = []
+            for spec_path in args.specs:
+                spec = load_project_spec(spec_path)
+                if not spec.get('documents_dir'):
+                    raise ValueError(f"{spec_path}: batch project specs need a 'documents_dir'")
+                jobs.append((spec, os.path.join(os.path.dirname(os.path.abspath(spec_path)), spec['documents_dir'])))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    failures = 0
+    for i, (spec, docs_dir) in enumerate(jobs, 1):
+        print(f"=== [{i}/{len(jobs)}] {spec['name']} ({docs_dir})", flush=True)
+        try:
+            summary = run_analysis(
+                spec, docs_dir,
+                use_cache=not args.no_cache,
+                vectorize=not args.no_vectorize,
+                resume_workflow_id=getattr(args, 'resume', None),
+                resume_phase=getattr(args, 'from_phase', None),
+                index_name=args.index_name,
+                verbose=not args.quiet
+            )
+        except Exception as e:
+            print(f"{spec['name']} FAILED: {str(e)}")
+            if not args.quiet:
+                print(traceback.format_exc())
+            summary = None
+        if summary is not None:
+            _print_summary(summary)
+        if summary is None or not summary['success']:
+            failures += 1
+            if getattr(args, 'stop_on_error', False):
+                break
+
+    if len(jobs) > 1:
+        print(f"=== {len(jobs) - failures}/{len(jobs)} analyses succeeded")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
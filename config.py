@@ -48,6 +48,8 @@ class Config:
     # File Settings
     MAX_FILE_SIZE: int = 200 * 1024 * 1024  # 200MB
     ALLOWED_EXTENSIONS: tuple = (".pdf", ".docx", ".doc", ".csv", ".xlsx", ".xls")
+    DOCUMENT_CACHE_ENABLED: bool = True
+    DOCUMENT_CACHE_MAX_MB: int = 256  # On-disk parsed-document cache size bound (LRU eviction)
     
     # Paths
     DATA_DIR: str = "data"
@@ -55,12 +57,26 @@ class Config:
     TEMP_DIR: str = "temp"
     
     # Vector Store Settings
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "pinecone")  # "pinecone" or "local"
     VECTOR_COLLECTION: str = "mimetica"
     VECTOR_SIZE: int = 1536  # OpenAI embedding size
-    
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000  # Token budget per embeddings request
+    EMBEDDING_BATCH_MAX_INPUTS: int = 512  # Hard cap on inputs per embeddings request
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_MB: int = 512  # On-disk embedding cache size bound (LRU eviction)
+    CHUNK_MAX_TOKENS: int = 1200  # Semantic chunk budget for embeddings (ada-002 accepts 8191)
+    CHUNK_OVERLAP_TOKENS: int = 100
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_TTL_SECONDS: int = 900  # In-memory search cache; also invalidated on upsert/clear
+
     # Agent Settings
     MAX_ITERATIONS: int = 5
     TEMPERATURE: float = 0.7
+    WORKFLOW_MAX_PARALLEL_PHASES: int = 2  # Phases whose inputs are complete may run concurrently
+    PHASE_CACHE_ENABLED: bool = True  # Reuse a phase's output when its prompts, inputs and model are unchanged
+    PHASE_CACHE_MAX_MB: int = 128  # On-disk phase output cache size bound (LRU eviction)
     
     # Model Configuration
     # Default model for the application - lightweight yet effective for strategic analysis
@@ -75,6 +91,13 @@ class Config:
     # Rate Limiting Settings by Provider
     RATE_LIMITS: dict = field(default_factory=dict)
     
+    # Token Counting
+    TOKENIZER_ENCODING: str = "cl100k_base"  # tiktoken BPE; heuristic fallback if it cannot be loaded
+    TOKENIZER_LOAD_TIMEOUT_SECONDS: float = 10.0  # First use may download the BPE file; give up on it after this
+    TOKEN_COUNT_CACHE_MAX_ENTRIES: int = 100000  # Digest-keyed, so memory stays roughly constant per entry
+    TOKEN_COUNT_CACHE_MIN_CHARS: int = 256  # Shorter texts are counted directly, not cached
+    ANTHROPIC_TOKEN_RATIO: float = 1.1  # Approximate Claude tokens per cl100k token
+    
     # --- Tools feature flags ---
     USE_OPTIONAL_TOOLS: bool = True
     TOOLS_ENABLED: dict = field(default_factory=lambda: {
@@ -179,7 +202,6 @@ class Config:
                     "tokens_per_minute": 20000,
                     "requests_per_minute": 1000,
                     "safety_margin": 0.75,  # Conservative for Anthropic
-                    "inter_phase_delay": 15,
                     "max_retries": 3,
                     "retry_delay": 30
                 },
@@ -187,7 +209,6 @@ class Config:
                     "tokens_per_minute": 200000,  # Default for most OpenAI models
                     "requests_per_minute": 10000,
                     "safety_margin": 0.85,  # More aggressive for OpenAI
-                    "inter_phase_delay": 5,
                     "max_retries": 2,
                     "retry_delay": 15
                 }
@@ -199,8 +220,8 @@ class Config:
         cfg = cls()
         # Determina el modelo seleccionado (o default si no hay Streamlit)
         try:
-            import streamlit as st
-            selected = st.session_state.get('selected_model', cfg.DEFAULT_MODEL)
+            from utils.state_backend import session_state
+            selected = session_state.get('selected_model', cfg.DEFAULT_MODEL)
         except Exception:
             selected = cfg.DEFAULT_MODEL
 
@@ -222,9 +243,9 @@ class Config:
     def get_current_model_config(self) -> dict:
         """Get configuration for currently selected model"""
         try:
-            import streamlit as st
+            from utils.state_backend import session_state
             # Get selected model from session state, fallback to default
-            selected_model = st.session_state.get('selected_model', self.DEFAULT_MODEL)
+            selected_model = session_state.get('selected_model', self.DEFAULT_MODEL)
         except:
             selected_model = self.DEFAULT_MODEL
         
@@ -243,8 +264,8 @@ class Config:
 
         if model_name is None:
             try:
-                import streamlit as st
-                model_name = st.session_state.get('selected_model', self.DEFAULT_MODEL)
+                from utils.state_backend import session_state
+                model_name = session_state.get('selected_model', self.DEFAULT_MODEL)
             except Exception:
                 model_name = self.DEFAULT_MODEL
 
@@ -256,8 +277,8 @@ class Config:
         """Get rate limiting settings for a specific model or current model"""
         if model_name is None:
             try:
-                import streamlit as st
-                model_name = st.session_state.get('selected_model', self.DEFAULT_MODEL)
+                from utils.state_backend import session_state
+                model_name = session_state.get('selected_model', self.DEFAULT_MODEL)
             except:
                 model_name = self.DEFAULT_MODEL
         
@@ -282,9 +303,9 @@ class Config:
     def validate_and_fix_selected_model(self) -> str:
         """Validate the selected model and fix if outdated or invalid"""
         try:
-            import streamlit as st
+            from utils.state_backend import session_state
             # Get currently selected model
-            selected_model = st.session_state.get('selected_model', self.DEFAULT_MODEL)
+            selected_model = session_state.get('selected_model', self.DEFAULT_MODEL)
         except:
             # Fallback when Streamlit is not available
             selected_model = self.DEFAULT_MODEL
@@ -309,8 +330,9 @@ class Config:
             if selected_model in model_migrations:
                 new_model = model_migrations[selected_model]
                 try:
+                    from utils.state_backend import session_state
                     import streamlit as st
-                    st.session_state['selected_model'] = new_model
+                    session_state['selected_model'] = new_model
                     st.warning(f"Model '{selected_model}' has been updated to '{new_model}' (newer version)")
                 except:
                     pass  # Streamlit not available
@@ -318,8 +340,9 @@ class Config:
             else:
                 # Fall back to default model
                 try:
+                    from utils.state_backend import session_state
                     import streamlit as st
-                    st.session_state['selected_model'] = self.DEFAULT_MODEL
+                    session_state['selected_model'] = self.DEFAULT_MODEL
                     st.warning(f"Model '{selected_model}' is not available. Using default model '{self.DEFAULT_MODEL}'")
                 except:
                     pass  # Streamlit not available
@@ -0,0 +1,32 @@
+"""
+Test configuration - makes the project root importable and keeps on-disk state in temporary directories
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point config.DATA_DIR (caches, local vector indexes) at a fresh temporary directory"""
+    from utils import sqlite_cache
+    monkeypatch.setattr(config, 'DATA_DIR', str(tmp_path / "data"))
+    # Global caches opened by the test live in the temporary directory and are dropped afterwards
+    monkeypatch.setattr(sqlite_cache, '_shared_caches', {})
+    return tmp_path / "data"
+
+
+@pytest.fixture
+def heuristic_token_counter(monkeypatch):
+    """Global token counter that never loads tiktoken (its first load may download the BPE file)"""
+    from utils import token_counter
+    counter = token_counter.TokenCounter()
+    counter._encoding_loaded = True
+    monkeypatch.setattr(token_counter, '_global_token_counter', counter)
+    return counter
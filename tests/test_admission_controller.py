@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from utils.admission_controller import TokenBucket, get_admission_controller
+
+
+class FakeClock:
+    """Manual clock; sleeping advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_bucket(clock, tokens_per_minute=600, burst=None):
+    return TokenBucket(tokens_per_minute, burst=burst, clock=clock, sleep=clock.sleep)
+
+
+def test_starts_full_and_admits_without_waiting(clock):
+    bucket = make_bucket(clock)
+    assert bucket.available_tokens() == 600
+    assert bucket.acquire(600) == 0
+    assert clock.slept == []
+    assert bucket.available_tokens() == 0
+
+
+def test_blocks_for_exact_refill_time(clock):
+    bucket = make_bucket(clock)  # 10 tokens per second
+    bucket.acquire(600)
+    assert bucket.wait_time(50) == pytest.approx(5.0)
+    assert bucket.acquire(50) == pytest.approx(5.0)
+    assert clock.slept == [pytest.approx(5.0)]
+    stats = bucket.get_stats()
+    assert stats['blocked'] == 1
+    assert stats['blocked_seconds'] == pytest.approx(5.0)
+
+
+def test_refills_continuously_up_to_burst(clock):
+    bucket = make_bucket(clock, burst=100)
+    bucket.acquire(100)
+    clock.now += 3
+    assert bucket.available_tokens() == pytest.approx(30)
+    clock.now += 3600
+    assert bucket.available_tokens() == pytest.approx(100)
+
+
+def test_max_wait_rejects_without_taking_tokens(clock):
+    bucket = make_bucket(clock)
+    bucket.acquire(600)
+    assert bucket.acquire(100, max_wait=1) is None
+    assert bucket.get_stats()['rejected'] == 1
+    assert bucket.wait_time(10) == pytest.approx(1.0)
+
+
+def test_request_larger_than_burst_leaves_debt(clock):
+    bucket = make_bucket(clock, burst=100)
+    assert bucket.acquire(300) == 0
+    # 300 tokens admitted from a 100 token bucket: 200 tokens of debt, 20 s at 10 tokens/s
+    assert bucket.wait_time(100) == pytest.approx(30.0)
+
+
+def test_release_returns_unspent_tokens(clock):
+    bucket = make_bucket(clock)
+    bucket.acquire(600)
+    bucket.release(200)
+    assert bucket.available_tokens() == pytest.approx(200)
+    # Never refills beyond a full bucket
+    bucket.release(10_000)
+    assert bucket.available_tokens() == pytest.approx(600)
+    assert bucket.get_stats()['tokens_released'] == 10_200
+
+
+def test_concurrent_acquires_queue_in_order(clock):
+    # Sleeping does not advance time here, so every caller reserves against the same instant
+    bucket = TokenBucket(600, clock=clock, sleep=lambda seconds: None)
+    bucket.acquire(600)
+    waits = []
+    lock = threading.Lock()
+
+    def worker():
+        wait = bucket.acquire(60)
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Each reservation queues behind the previous one: 6 s of refill apiece
+    assert sorted(waits) == [pytest.approx(6.0), pytest.approx(12.0), pytest.approx(18.0)]
+    assert bucket.get_stats()['admitted'] == 4
+
+
+def test_reset_stats_keeps_level(clock):
+    bucket = make_bucket(clock)
+    bucket.acquire(300)
+    bucket.reset_stats()
+    assert bucket.get_stats()['admitted'] == 0
+    assert bucket.available_tokens() == pytest.approx(300)
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_global_controller_is_shared_per_provider_and_rate():
+    bucket = get_admission_controller('test-provider', 1234)
+    assert get_admission_controller('test-provider', 1234) is bucket
+    assert get_admission_controller('test-provider', 4321) is not bucket
@@ -0,0 +1,165 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from utils import SessionManager
+from utils.enhanced_workflow_manager import EnhancedWorkflowManager
+from utils.state_backend import DictState, session_state, use_state_backend
+from workflows import decide_workflow
+from workflows.decide_workflow import DecideWorkflow
+
+
+class FakeIndex:
+    """Stand-in for VectorStore; the phases under test never query it"""
+
+    def __init__(self):
+        pass
+
+
+class FakeCrew:
+    """Phase function whose crew returns canned output, stored the way the real phases store theirs"""
+
+    def __init__(self, workflow, phase, runs, fail=False):
+        self.workflow = workflow
+        self.phase = phase
+        self.runs = runs
+        self.fail = fail
+
+    def __call__(self):
+        self.runs.append(self.phase)
+        if self.fail:
+            return {'success': False, 'phase': self.phase, 'error': "model error"}
+        output = f"{self.phase} output\nsecond line"
+        self.workflow._store_phase_output(self.phase, output)
+        return {'success': True, 'phase': self.phase, 'output': output, 'agent': f"{self.phase} agent"}
+
+
+PHASES = [phase for phase, _, _ in DecideWorkflow.PHASE_GRAPH]
+
+
+def new_session(workflow_id):
+    if 'workflow_state' in session_state:
+        del session_state.workflow_state
+    SessionManager.init_session()
+    session_state.workflow_state['workflow_id'] = workflow_id
+
+
+@pytest.fixture
+def workflow_factory(tmp_path, data_dir, heuristic_token_counter, monkeypatch):
+    # Phase Markdown and checkpoints are written relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(decide_workflow, 'VectorStore', FakeIndex)
+    monkeypatch.setattr(EnhancedWorkflowManager, 'estimate_phase_tokens', lambda self, name, function: 0)
+    runs = []
+
+    with use_state_backend(DictState()):
+        SessionManager.init_session()
+
+        def create(workflow_id="workflow_1", fail=()):
+            """Workflow in a fresh session"""
+            new_session(workflow_id)
+            workflow = DecideWorkflow()
+            workflow.get_phase_graph = lambda: [
+                (phase, FakeCrew(workflow, phase, runs, fail=phase in fail), list(inputs))
+                for phase, _, inputs in DecideWorkflow.PHASE_GRAPH
+            ]
+            return workflow
+        yield create, runs
+
+
+def test_save_and_load_checkpoint(workflow_factory):
+    create, _ = workflow_factory
+    workflow = create()
+    assert workflow.load_checkpoint() is None
+
+    ws = session_state.workflow_state
+    ws['project_info'] = {'name': "Project"}
+    ws['documents'] = [{'filename': "a.pdf", 'content': "full text", 'chunks': ["full"], 'pages': 3}]
+    ws['phase_outputs']['context_base'] = {'timestamp': "t0", 'output': "inline context"}
+    workflow._store_phase_output('collection', "collected")
+    workflow.checkpoint_phase('collection', {'success': True, 'phase': 'collection', 'output': "collected"})
+
+    state = workflow.load_checkpoint()
+    assert state['workflow_id'] == "workflow_1"
+    assert state['completed_phases'] == ['collection']
+    assert state['phase_files']['collection']['path'] == os.path.join("outputs", "workflow_1", "latest", "collection.md")
+    assert state['inline_outputs'] == {'context_base': {'timestamp': "t0", 'output': "inline context"}}
+    assert state['session']['project_info'] == {'name': "Project"}
+    assert state['session']['documents'] == [{'filename': "a.pdf", 'pages': 3}]
+    assert not os.path.exists(workflow._checkpoint_path() + ".tmp")
+
+    with open(workflow._checkpoint_path(), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert workflow.load_checkpoint() is None
+
+
+def test_read_phase_markdown_strips_header(workflow_factory, tmp_path):
+    create, _ = workflow_factory
+    workflow = create()
+    output = "# Heading\n\nBody line\n**Not** a header line"
+    workflow._store_phase_output('definition', output)
+
+    path = session_state.workflow_state['saved_markdown_files']['definition']['latest']
+    assert workflow._read_phase_markdown(path) == output
+    assert workflow._read_phase_markdown(str(tmp_path / "missing.md")) is None
+    (tmp_path / "short.md").write_text("# Phase: Definition\n", encoding="utf-8")
+    assert workflow._read_phase_markdown(str(tmp_path / "short.md")) is None
+
+
+def test_restore_checkpoint_in_a_new_session(workflow_factory):
+    create, _ = workflow_factory
+    workflow = create(fail=('exploration',))
+    assert not workflow.run_complete_workflow()['success']
+    state = workflow.load_checkpoint()
+    assert state['completed_phases'] == ['collection', 'analysis', 'definition']
+
+    # A lost phase file means that phase has to run again
+    os.remove(state['phase_files']['analysis']['path'])
+    restored = create()._restore_checkpoint(state)
+
+    assert restored == ['collection', 'definition']
+    outputs = session_state.workflow_state['phase_outputs']
+    assert outputs['definition']['output'] == "definition output\nsecond line"
+    assert 'analysis' not in outputs
+
+
+def test_resume_skips_checkpointed_phases(workflow_factory):
+    create, runs = workflow_factory
+    assert not create(fail=('creation',)).run_complete_workflow()['success']
+    assert runs == PHASES[:5]
+
+    runs.clear()
+    result = create(workflow_id="workflow_2").resume_from(workflow_id="workflow_1")
+
+    assert result['success'], result
+    assert runs[0] == 'creation' and sorted(runs) == sorted(PHASES[4:])
+    assert result['execution_stats']['phases_resumed'] == PHASES[:4]
+    assert session_state.workflow_state['workflow_id'] == "workflow_1"
+    with open(os.path.join("outputs", "workflow_1", "latest", "state.json"), encoding="utf-8") as f:
+        assert sorted(json.load(f)['completed_phases']) == sorted(PHASES)
+
+
+def test_resume_from_phase_reruns_downstream_phases(workflow_factory):
+    create, runs = workflow_factory
+    assert create().run_complete_workflow()['success']
+
+    runs.clear()
+    result = create().resume_from('simulation')
+
+    assert result['success']
+    assert sorted(runs) == sorted(['simulation', 'simulation_explainers', 'evaluation', 'report'])
+
+
+def test_resume_errors(workflow_factory):
+    create, runs = workflow_factory
+    result = create().resume_from(workflow_id="workflow_missing")
+    assert not result['success'] and "No checkpoint" in result['error']
+
+    assert create().run_complete_workflow()['success']
+    runs.clear()
+    result = create().resume_from('decide')
+    assert not result['success'] and result['error'] == "Unknown phase: decide"
+    assert runs == []
@@ -0,0 +1,217 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("crewai")
+
+import cli
+from config import config
+
+
+def write_spec(path, **spec):
+    path.write_text(json.dumps(spec), encoding='utf-8')
+    return str(path)
+
+
+def test_parser_run_and_batch_options():
+    parser = cli._build_parser()
+
+    args = parser.parse_args(['run', '--docs', 'docs', '--project', 'p.json',
+                              '--resume', 'workflow_1', '--from-phase', 'report', '--no-cache', '--quiet'])
+    assert (args.command, args.docs, args.project) == ('run', 'docs', 'p.json')
+    assert (args.resume, args.from_phase) == ('workflow_1', 'report')
+    assert args.no_cache and args.quiet and not args.no_vectorize
+    assert args.index_name is None
+
+    args = parser.parse_args(['batch', 'a.json', 'b.json', '--stop-on-error', '--index-name', 'shared'])
+    assert args.specs == ['a.json', 'b.json']
+    assert args.stop_on_error and args.index_name == 'shared'
+
+
+@pytest.mark.parametrize('argv', [[], ['run', '--docs', 'docs'], ['run', '--project', 'p.json'], ['batch']])
+def test_parser_requires_arguments(argv):
+    with pytest.raises(SystemExit) as exc:
+        cli._build_parser().parse_args(argv)
+    assert exc.value.code == 2
+
+
+def test_run_index_name_is_a_valid_index_name():
+    assert cli.run_index_name('workflow_20251020_131634_123456') == 'mimetica-workflow-20251020-131634-123456'
+    name = cli.run_index_name('Workflow 2025/10/20 (retry) ' + 'x' * 40)
+    assert len(name) <= 45
+    assert all(c.islower() or c.isdigit() or c == '-' for c in name)
+    assert not name.endswith('-')
+
+
+def test_load_project_spec(tmp_path):
+    spec = {'name': "Loyalty program redesign", 'focus': "Customer Experience"}
+    assert cli.load_project_spec(write_spec(tmp_path / 'ok.json', **spec)) == spec
+
+    with pytest.raises(ValueError):
+        cli.load_project_spec(write_spec(tmp_path / 'unnamed.json', description="No name"))
+    (tmp_path / 'list.json').write_text('["name"]', encoding='utf-8')
+    with pytest.raises(ValueError):
+        cli.load_project_spec(str(tmp_path / 'list.json'))
+
+
+def test_find_documents(tmp_path):
+    for name in ('b.pdf', 'a.CSV', 'notes.txt'):
+        (tmp_path / name).write_bytes(b"x")
+    (tmp_path / 'sub.pdf').mkdir()
+
+    assert cli.find_documents(str(tmp_path)) == [str(tmp_path / 'a.CSV'), str(tmp_path / 'b.pdf')]
+    with pytest.raises(ValueError):
+        cli.find_documents(str(tmp_path / 'missing'))
+
+
+def test_main_rejects_invalid_specs(tmp_path, capsys):
+    unnamed = write_spec(tmp_path / 'unnamed.json', description="No name")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(['run', '--docs', str(tmp_path), '--project', unnamed])
+    assert exc.value.code == 2
+
+    no_docs = write_spec(tmp_path / 'no_docs.json', name="Batch job")
+    with pytest.raises(SystemExit) as exc:
+        cli.main(['batch', no_docs])
+    assert exc.value.code == 2
+    assert "documents_dir" in capsys.readouterr().err
+
+
+class FakeWorkflow:
+    calls = []
+    # Result of the next run or resume
+    result = {'success': True, 'completed_phases': ['define']}
+
+    def __init__(self):
+        from utils.state_backend import session_state
+        self.workflow_id = session_state.workflow_state['workflow_id']
+        self.checkpointed = False
+        self.calls.append(('init', session_state['vector_index_name']))
+
+    def resume_from(self, phase, workflow_id=None, use_cache=True):
+        from utils.state_backend import session_state
+        session_state.workflow_state['documents'] = [{'filename': "restored.pdf"}]
+        self.checkpointed = True
+        self.calls.append(('resume', workflow_id, phase))
+        return dict(self.result, completed_phases=['create', 'implement'])
+
+    def run_complete_workflow(self, use_cache=True):
+        self.checkpointed = True
+        self.calls.append(('run', use_cache))
+        return dict(self.result)
+
+    def load_checkpoint(self):
+        return {'completed_phases': []} if self.checkpointed else None
+
+
+def delete_session_index():
+    from utils.state_backend import session_state
+    FakeWorkflow.calls.append(('delete', session_state['vector_index_name']))
+    return True
+
+
+@pytest.fixture
+def fake_workflow(tmp_path, monkeypatch):
+    FakeWorkflow.calls = []
+    monkeypatch.setattr(FakeWorkflow, 'result', FakeWorkflow.result)
+    monkeypatch.setattr(config, 'OUTPUTS_DIR', str(tmp_path / 'outputs'))
+    monkeypatch.setattr(cli, 'DecideWorkflow', FakeWorkflow)
+    monkeypatch.setattr(cli.VectorStore, 'delete_session_index', staticmethod(delete_session_index))
+    monkeypatch.setattr(cli, 'ingest_documents',
+                        lambda paths, vectorize=True: FakeWorkflow.calls.append(('ingest', vectorize)) or [{'filename': "a.pdf"}])
+    return FakeWorkflow.calls
+
+
+def test_run_analysis_uses_its_own_index(tmp_path, fake_workflow):
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path), use_cache=False)
+
+    index = cli.run_index_name(summary['workflow_id'])
+    assert summary['success'] and summary['documents'] == 1
+    # A successful run deletes its index
+    assert fake_workflow == [('init', index), ('ingest', True), ('run', False), ('delete', index)]
+    assert summary['vector_index'] == index and summary['vector_index_deleted']
+    with open(summary['summary_path'], encoding='utf-8') as f:
+        assert json.load(f)['workflow_id'] == summary['workflow_id']
+
+    fake_workflow.clear()
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path), index_name='shared')
+    assert fake_workflow[0] == ('init', 'shared')
+    assert not any(call[0] == 'delete' for call in fake_workflow)
+    assert summary['vector_index'] == 'shared' and not summary['vector_index_deleted']
+
+
+def test_failed_run_keeps_its_index_for_resume(tmp_path, fake_workflow, monkeypatch):
+    monkeypatch.setattr(FakeWorkflow, 'result', {'success': False, 'error': "model error", 'failed_phase': 'explore'})
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path))
+
+    assert not summary['success'] and summary['failed_phase'] == 'explore'
+    assert fake_workflow[-1] == ('run', True)
+    assert not summary['vector_index_deleted']
+
+    # Resuming it to success deletes the index
+    monkeypatch.setattr(FakeWorkflow, 'result', {'success': True})
+    fake_workflow.clear()
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path), resume_workflow_id=summary['workflow_id'])
+    assert summary['success'] and fake_workflow[-1] == ('delete', summary['vector_index'])
+
+
+def test_ingest_failure_fails_the_run(tmp_path, fake_workflow, monkeypatch):
+    def ingest_documents(paths, vectorize=True):
+        raise RuntimeError("Failed to vectorize 1 of 2 documents: b.pdf")
+    monkeypatch.setattr(cli, 'ingest_documents', ingest_documents)
+
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path))
+
+    assert not summary['success'] and summary['failed_phase'] is None
+    assert summary['error'] == "Document ingestion failed: Failed to vectorize 1 of 2 documents: b.pdf"
+    # Nothing ran, so there is nothing to resume
+    assert [call[0] for call in fake_workflow] == ['init', 'delete']
+    with open(summary['summary_path'], encoding='utf-8') as f:
+        assert not json.load(f)['success']
+
+
+def test_resume_skips_ingest(tmp_path, fake_workflow):
+    summary = cli.run_analysis({'name': "Project"}, str(tmp_path),
+                               resume_workflow_id='workflow_20251020_131634', resume_phase='create')
+
+    assert fake_workflow == [
+        ('init', 'mimetica-workflow-20251020-131634'),
+        ('resume', 'workflow_20251020_131634', 'create'),
+        ('delete', 'mimetica-workflow-20251020-131634')
+    ]
+    assert summary['workflow_id'] == 'workflow_20251020_131634'
+    assert summary['documents'] == 1
+    assert summary['completed_phases'] == ['create', 'implement']
+    assert os.path.exists(summary['summary_path'])
+
+
+def test_ingest_documents_raises_when_a_document_is_not_vectorized(tmp_path, monkeypatch):
+    class FakeIndex:
+        index_name = 'mimetica-run'
+        cleared = True
+
+        def clear_collection(self):
+            return self.cleared
+
+    class FakePipeline:
+        def __init__(self, processor, vector_store):
+            assert isinstance(vector_store, FakeIndex)
+
+        def run(self, files):
+            return [{'filename': f.name, 'document': {'filename': f.name}, 'vectorized': f.name == 'a.pdf',
+                     'error': None} for f in files]
+
+    monkeypatch.setattr(cli, 'VectorStore', FakeIndex)
+    monkeypatch.setattr(cli, 'IngestionPipeline', FakePipeline)
+    monkeypatch.setattr(cli.SessionManager, 'add_log', lambda level, message: None)
+    for name in ('a.pdf', 'b.pdf'):
+        (tmp_path / name).write_bytes(b"x")
+    paths = cli.find_documents(str(tmp_path))
+
+    assert len(cli.ingest_documents(paths[:1])) == 1
+    with pytest.raises(RuntimeError, match=r"1 of 2 documents: b\.pdf"):
+        cli.ingest_documents(paths)
+    FakeIndex.cleared = False
+    with pytest.raises(RuntimeError, match="Could not clear vector index mimetica-run"):
+        cli.ingest_documents(paths[:1])
@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+
+import pytest
+
+from config import config
+from utils.document_cache import DocumentCache, get_document_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DocumentCache(str(tmp_path / "documents.sqlite"), max_bytes=100_000)
+
+
+def test_round_trip(cache):
+    document = {'filename': 'a.pdf', 'content': "Quarterly results", 'word_count': 2}
+    key = DocumentCache.make_key("abc123", ".pdf", "5")
+    cache.put(key, document)
+
+    assert cache.get(key) == document
+    assert cache.get(DocumentCache.make_key("abc123", ".pdf", "4")) is None
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_documents_larger_than_the_bound_are_not_stored(tmp_path):
+    cache = DocumentCache(str(tmp_path / "tiny.sqlite"), max_bytes=50)
+    cache.put("big", {'content': os.urandom(200).hex()})
+    assert cache.get("big") is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_eviction_keeps_recently_used_documents(tmp_path):
+    cache = DocumentCache(str(tmp_path / "lru.sqlite"), max_bytes=400)
+    for i in range(10):
+        cache.put(f"k{i}", {'content': os.urandom(40).hex()})
+        cache.get("k0")  # keep touching the first document
+
+    stats = cache.get_stats()
+    assert stats['size_bytes'] <= 400
+    assert stats['evictions'] > 0
+    assert cache.get("k0") is not None
+    assert cache.get("k9") is not None
+    assert cache.get("k1") is None
+
+
+def test_size_total_tracks_replacements_and_clear(cache):
+    cache.put("k", {'content': "a" * 1000})
+    cache.put("k", {'content': "b"})
+    # The running total may overcount replaced rows, but never drifts below the real size
+    assert cache.size_bytes >= cache.get_stats()['size_bytes']
+    cache.clear()
+    assert cache.size_bytes == cache.get_stats()['size_bytes'] == 0
+
+
+def test_global_cache_respects_config(data_dir, monkeypatch):
+    monkeypatch.setattr(config, 'DOCUMENT_CACHE_ENABLED', False)
+    assert get_document_cache() is None
+    monkeypatch.setattr(config, 'DOCUMENT_CACHE_ENABLED', True)
+    cache = get_document_cache()
+    assert cache is get_document_cache()
+    assert cache.path == str(data_dir / "document_cache.sqlite")
+
+
+def _child_cache_state(queue):
+    cache = get_document_cache()
+    queue.put((id(cache.conn), cache.get("shared")))
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_forked_children_open_their_own_connection(data_dir):
+    parent = get_document_cache()
+    parent.put("shared", {'content': "from parent"})
+
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    child = context.Process(target=_child_cache_state, args=(queue,))
+    child.start()
+    conn_id, document = queue.get(timeout=30)
+    child.join(timeout=30)
+
+    assert child.exitcode == 0
+    assert conn_id != id(parent.conn)
+    assert document == {'content': "from parent"}
+    # The parent's connection is untouched by the child
+    assert parent.get("shared") == {'content': "from parent"}
@@ -0,0 +1,66 @@
+import pytest
+
+from config import config
+from utils.embedding_cache import EmbeddingCache, get_embedding_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "embeddings.sqlite"), max_bytes=10_000)
+
+
+def test_round_trip_with_whitespace_normalized_keys(cache):
+    cache.put_many('model-a', ["alpha  beta\n", "gamma"], [[1.0, 2.0], [3.0, 4.0]])
+
+    assert cache.get_many('model-a', ["alpha beta", "gamma", "delta"]) == [[1.0, 2.0], [3.0, 4.0], None]
+    # Keys include the model
+    assert cache.get_many('model-b', ["gamma"]) == [None]
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 2, 2)
+
+
+def test_case_is_part_of_the_key(cache):
+    cache.put_many('m', ["US"], [[1.0]])
+    assert cache.get_many('m', ["us"]) == [None]
+
+
+def test_empty_vectors_are_not_stored(cache):
+    cache.put_many('m', ["a", "b"], [[], [5.0]])
+    assert cache.get_many('m', ["a", "b"]) == [None, [5.0]]
+
+
+def test_least_recently_used_vectors_are_evicted(tmp_path):
+    # Three float32 values per vector: 12 bytes, room for two
+    cache = EmbeddingCache(str(tmp_path / "small.sqlite"), max_bytes=24)
+    cache.put_many('m', ["a", "b"], [[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]])
+    cache.get_many('m', ["a"])  # "b" is now the least recently used
+    cache.put_many('m', ["c"], [[3.0, 3.0, 3.0]])
+
+    assert cache.get_many('m', ["a", "b", "c"]) == [[1.0, 1.0, 1.0], None, [3.0, 3.0, 3.0]]
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['size_bytes'] <= 24
+
+
+def test_persists_across_instances(tmp_path):
+    path = str(tmp_path / "persist.sqlite")
+    EmbeddingCache(path).put_many('m', ["kept"], [[0.5]])
+    assert EmbeddingCache(path).get_many('m', ["kept"]) == [[0.5]]
+
+
+def test_clear(cache):
+    cache.put_many('m', ["a"], [[1.0]])
+    cache.clear()
+    assert cache.get_many('m', ["a"]) == [None]
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_global_cache_respects_config(data_dir, monkeypatch):
+    monkeypatch.setattr(config, 'EMBEDDING_CACHE_ENABLED', False)
+    assert get_embedding_cache() is None
+    monkeypatch.setattr(config, 'EMBEDDING_CACHE_ENABLED', True)
+    assert get_embedding_cache() is get_embedding_cache()
+
+
+def test_global_cache_is_opened_under_data_dir(data_dir):
+    assert get_embedding_cache().path == str(data_dir / "embedding_cache.sqlite")
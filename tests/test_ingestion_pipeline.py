@@ -0,0 +1,202 @@
+import concurrent.futures
+import io
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from config import config
+from utils import document_processor
+from utils.document_processor import DocumentProcessor
+from utils.ingestion_pipeline import IngestionPipeline
+
+
+class Upload(io.BytesIO):
+    """In-memory upload with the name and size of a Streamlit UploadedFile"""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def csv_upload(name, rows=3):
+    data = "region,revenue\n" + "".join(f"{name}-{r},{r * 10}\n" for r in range(rows))
+    return Upload(name, data.encode('utf-8'))
+
+
+def pdf_upload(name, pages):
+    """Minimal PDF with one line of text per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>",
+               "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * p} 0 R" for p in range(pages)), pages),
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for p in range(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td (Page {p} reports revenue growth.) Tj ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * p} 0 R >>")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    out, offsets = "%PDF-1.4\n", []
+    for n, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n"
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    return Upload(name, out.encode('latin-1'))
+
+
+class FakeVectorStore:
+    def __init__(self, fail_embed=()):
+        self.fail_embed = set(fail_embed)
+        self.upserted = []
+        self.sources = {}
+
+    def prepare_document_vectors(self, document, source=None):
+        if document['filename'] in self.fail_embed:
+            raise RuntimeError("embedding service unavailable")
+        # Record whether the text was streamed, and the text that was chunked
+        self.sources[document['filename']] = (
+            (False, document['content']) if source is None else (True, "".join(source))
+        )
+        return {
+            'vectors': [(document['file_hash'], [0.0], {'filename': document['filename']})],
+            'total_chunks': 1, 'skipped_chunks': 0, 'failed_chunks': 0, 'errors': []
+        }
+
+    def upsert_vectors(self, vectors):
+        self.upserted.extend(vectors)
+        return len(vectors)
+
+
+@pytest.fixture
+def workdir(data_dir, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'TEMP_DIR', str(tmp_path / "temp"))
+    return tmp_path
+
+
+def run(files, vector_store=None, **kwargs):
+    events = []
+    kwargs.setdefault('parse_workers', 1)
+    pipeline = IngestionPipeline(DocumentProcessor(), vector_store, **kwargs)
+    return pipeline.run(files, on_progress=events.append), events
+
+
+def test_results_follow_upload_order(workdir):
+    files = [csv_upload(f"file{i}.csv", rows=i + 1) for i in range(6)]
+    vector_store = FakeVectorStore()
+
+    results, events = run(files, vector_store, max_in_flight=2)
+
+    assert [r['filename'] for r in results] == [f.name for f in files]
+    assert all(r['vectorized'] and r['error'] is None for r in results)
+    assert [f"file{i}.csv-0" in r['document']['content'] for i, r in enumerate(results)] == [True] * 6
+    assert len(vector_store.upserted) == 6
+    assert events[-1]['completed_steps'] == events[-1]['total_steps'] == 18
+    # Spools are removed once parsed
+    assert not list((workdir / "temp").iterdir())
+
+
+def test_cached_documents_skip_parsing(workdir, monkeypatch):
+    first, _ = run([csv_upload("a.csv"), csv_upload("b.csv")])
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("cached document was parsed again")
+    monkeypatch.setattr(DocumentProcessor, 'extract', no_parse)
+    monkeypatch.setattr('utils.ingestion_pipeline.SpooledUpload.spool', no_parse)
+    second, events = run([csv_upload("b.csv"), csv_upload("a.csv")])
+
+    assert [r['document']['content'] for r in second] == [r['document']['content'] for r in reversed(first)]
+    assert [r['document']['filename'] for r in second] == ["b.csv", "a.csv"]
+    assert events[-1]['completed_steps'] == events[-1]['total_steps'] == 2
+
+
+def test_failures_are_reported_per_file_and_stage(workdir):
+    files = [
+        csv_upload("good.csv"),
+        Upload("notes.txt", b"not a supported type"),
+        Upload("broken.pdf", b"%PDF-1.4 truncated"),
+        csv_upload("offline.csv")
+    ]
+
+    results, events = run(files, FakeVectorStore(fail_embed={"offline.csv"}))
+
+    by_name = {r['filename']: r for r in results}
+    assert by_name["good.csv"]['vectorized'] and by_name["good.csv"]['failed_stage'] is None
+    assert by_name["notes.txt"]['failed_stage'] == 'validate'
+    assert by_name["broken.pdf"]['failed_stage'] == 'parse' and by_name["broken.pdf"]['document'] is None
+    assert by_name["offline.csv"]['failed_stage'] == 'embed'
+    assert by_name["offline.csv"]['document'] is not None and not by_name["offline.csv"]['vectorized']
+    # Failed files still account for all of their steps
+    assert events[-1]['completed_steps'] == events[-1]['total_steps'] == 12
+    assert {e['filename'] for e in events if e['status'] == 'failed'} == {"notes.txt", "broken.pdf", "offline.csv"}
+
+
+def test_large_pdfs_are_parsed_by_page_range_and_streamed_to_embedding(workdir, monkeypatch):
+    monkeypatch.setattr(document_processor.os, 'cpu_count', lambda: 4)
+    pools = []
+    real_pool = concurrent.futures.ProcessPoolExecutor
+
+    def spy_pool(*args, **kwargs):
+        pools.append(kwargs.get('initializer'))
+        return real_pool(*args, **kwargs)
+    monkeypatch.setattr(concurrent.futures, 'ProcessPoolExecutor', spy_pool)
+    large = pdf_upload("annual.pdf", DocumentProcessor.PDF_PARALLEL_MIN_PAGES + 8)
+    small = pdf_upload("memo.pdf", 2)
+    expected = DocumentProcessor()._process_pdf(large)
+    pools.clear()
+    vector_store = FakeVectorStore()
+
+    results, events = run([large, small], vector_store, parse_workers=2)
+
+    assert all(r['vectorized'] and r['error'] is None for r in results)
+    assert results[0]['document']['content'] == expected
+    assert "Page 39 reports revenue growth." in expected
+    # The large PDF's text reached the chunker as it streamed, not from the finished document
+    assert vector_store.sources["annual.pdf"] == (True, expected)
+    assert vector_store.sources["memo.pdf"] == (False, results[1]['document']['content'])
+    assert document_processor._init_pdf_worker in pools
+    assert events[-1]['completed_steps'] == events[-1]['total_steps'] == 6
+    # The streamed document is cached like any other
+    assert DocumentProcessor().get_cached(large)['content'] == expected
+
+
+class BrokenPool:
+    """Parse pool whose workers die: futures fail with BrokenProcessPool after the first `healthy` parses"""
+
+    def __init__(self, healthy=0):
+        self.healthy = healthy
+        self.submitted = 0
+
+    def submit(self, fn, *args):
+        future = concurrent.futures.Future()
+        self.submitted += 1
+        if self.submitted <= self.healthy:
+            future.set_result(fn(*args))
+        else:
+            future.set_exception(BrokenProcessPool("a child process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True, **kwargs):
+        pass
+
+
+def test_pool_that_cannot_start_falls_back_to_threads(workdir, monkeypatch):
+    monkeypatch.setattr(IngestionPipeline, '_create_parse_pool', lambda self: BrokenPool())
+
+    results, _ = run([csv_upload("a.csv"), csv_upload("b.csv")], parse_workers=2)
+
+    assert all(r['document'] is not None and r['error'] is None for r in results)
+
+
+def test_worker_dying_mid_run_fails_the_file_instead_of_reparsing(workdir, monkeypatch):
+    pools = [BrokenPool(healthy=1), BrokenPool(healthy=5)]
+    monkeypatch.setattr(IngestionPipeline, '_create_parse_pool', lambda self: pools.pop(0))
+
+    results, events = run([csv_upload("a.csv"), csv_upload("b.csv"), csv_upload("c.csv")],
+                          parse_workers=2, max_in_flight=1)
+
+    assert results[0]['document'] is not None
+    assert results[1]['failed_stage'] == 'parse' and "worker process died" in results[1]['error']
+    # Later files are parsed by a fresh pool
+    assert results[2]['document'] is not None and not pools
+    assert events[-1]['completed_steps'] == events[-1]['total_steps'] == 3
@@ -0,0 +1,130 @@
+import os
+import random
+
+import numpy as np
+import pytest
+
+from utils.local_vector_index import LocalVectorIndex
+
+DIM = 8
+
+
+@pytest.fixture
+def base_dir(tmp_path, monkeypatch):
+    # Small capacity so tests cross the growth and log-compaction thresholds
+    monkeypatch.setattr(LocalVectorIndex, 'INITIAL_CAPACITY', 4)
+    return str(tmp_path / "indexes")
+
+
+def vector(seed):
+    return np.random.default_rng(seed).normal(size=DIM).tolist()
+
+
+def contents(index):
+    """{id: (metadata, vector)} of every stored vector"""
+    fetched = index.fetch(ids=list(index.ids)).vectors
+    return {vector_id: (match.metadata, np.round(match.values, 5).tolist()) for vector_id, match in fetched.items()}
+
+
+def test_query_returns_normalized_top_k(base_dir):
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    index.upsert([(f"v{i}", vector(i), {'chunk_index': i}) for i in range(6)])
+
+    query = [v * 10 for v in vector(3)]
+    matches = index.query(vector=query, top_k=3, include_metadata=True).matches
+
+    assert len(matches) == 3
+    assert matches[0].id == "v3" and matches[0].score == pytest.approx(1.0, abs=1e-5)
+    assert matches[0].metadata == {'chunk_index': 3}
+    assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+    expected = sorted(range(6), key=lambda i: -np.dot(vector(i), vector(3)) / np.linalg.norm(vector(i)))[:3]
+    assert [m.id for m in matches] == [f"v{i}" for i in expected]
+    assert index.query(vector=query, top_k=10).matches[0].metadata is None
+    assert len(index.query(vector=query, top_k=10).matches) == 6
+
+
+def test_reopen_after_appends_and_deletes(base_dir):
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    index.upsert([(f"v{i}", vector(i), {'chunk_index': i}) for i in range(3)])
+    index.upsert([("v1", vector(10), {'chunk_index': 10}), ("v3", vector(3), {'chunk_index': 3})])
+    index.delete(ids=["v0", "missing"])
+    # Changes since the snapshot are in the append-only log
+    assert os.path.exists(os.path.join(index.path, LocalVectorIndex.META_LOG_FILE))
+    expected = contents(index)
+
+    reopened = LocalVectorIndex("docs", DIM, base_dir)
+
+    assert sorted(reopened.ids) == ["v1", "v2", "v3"]
+    assert contents(reopened) == expected
+    assert expected["v1"][0] == {'chunk_index': 10}
+    assert reopened.describe_index_stats()['total_vector_count'] == 3
+
+
+def test_log_is_compacted_into_the_snapshot(base_dir):
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    for i in range(12):
+        index.upsert([(f"v{i % 5}", vector(i), {'round': i})])
+    log_path = os.path.join(index.path, LocalVectorIndex.META_LOG_FILE)
+    log_lines = sum(1 for _ in open(log_path)) if os.path.exists(log_path) else 0
+
+    assert log_lines <= max(len(index.ids), LocalVectorIndex.INITIAL_CAPACITY)
+    assert contents(LocalVectorIndex("docs", DIM, base_dir)) == contents(index)
+
+
+def test_torn_log_line_is_dropped(base_dir):
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    index.upsert([("v0", vector(0), {'n': 0})])
+    index.upsert([("v1", vector(1), {'n': 1})])
+    with open(os.path.join(index.path, LocalVectorIndex.META_LOG_FILE), "a", encoding="utf-8") as f:
+        f.write('{"put": "v2", "meta')
+
+    reopened = LocalVectorIndex("docs", DIM, base_dir)
+    assert sorted(reopened.ids) == ["v0", "v1"]
+    # Later appends are not hidden behind the torn line
+    reopened.upsert([("v3", vector(3), {'n': 3})])
+    assert sorted(LocalVectorIndex("docs", DIM, base_dir).ids) == ["v0", "v1", "v3"]
+
+
+def test_delete_all_empties_the_index(base_dir):
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    index.upsert([(f"v{i}", vector(i), {}) for i in range(10)])
+
+    index.delete(delete_all=True)
+
+    assert index.describe_index_stats()['total_vector_count'] == 0
+    assert index.query(vector=vector(0), top_k=3).matches == []
+    assert LocalVectorIndex("docs", DIM, base_dir).ids == []
+    index.upsert([("new", vector(1), {'n': 1})])
+    assert contents(LocalVectorIndex("docs", DIM, base_dir)) == contents(index)
+
+
+def test_random_operations_survive_reopening(base_dir):
+    rng = random.Random(0)
+    model = {}
+    index = LocalVectorIndex("docs", DIM, base_dir)
+    for step in range(60):
+        if rng.random() < 0.65 or not model:
+            batch = [(f"v{rng.randrange(30)}", vector(step * 100 + j), {'step': step}) for j in range(rng.randint(1, 4))]
+            index.upsert(batch)
+            for vector_id, values, metadata in batch:
+                model[vector_id] = metadata
+        else:
+            ids = rng.sample(sorted(model), rng.randint(1, min(3, len(model))))
+            index.delete(ids=ids)
+            for vector_id in ids:
+                del model[vector_id]
+        if step % 7 == 0:
+            before = contents(index)
+            index = LocalVectorIndex("docs", DIM, base_dir)
+            assert contents(index) == before
+
+    assert {vector_id: metadata for vector_id, (metadata, _) in contents(index).items()} == model
+
+
+def test_exists_and_destroy(base_dir):
+    assert not LocalVectorIndex.exists("docs", base_dir)
+    LocalVectorIndex("docs", DIM, base_dir)
+    assert LocalVectorIndex.exists("docs", base_dir)
+    assert LocalVectorIndex.destroy("docs", base_dir)
+    assert not LocalVectorIndex.exists("docs", base_dir)
+    assert not LocalVectorIndex.destroy("docs", base_dir)
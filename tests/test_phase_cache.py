@@ -0,0 +1,95 @@
+import os
+import sqlite3
+import time
+import zlib
+
+import pytest
+
+from config import config
+from utils.phase_cache import PhaseCache, get_phase_cache
+
+TASKS = [{'description': "Define the problem. Current date: 2025-10-20 13:16:34", 'expected_output': "A problem statement"}]
+AGENTS = [{'role': "Definer", 'goal': "Define", 'backstory': "", 'model': "gpt-4o-mini", 'temperature': 0.2}]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PhaseCache(str(tmp_path / "phases.sqlite"), max_bytes=100_000)
+
+
+def test_fingerprint_ignores_run_time():
+    later = [{**TASKS[0], 'description': "Define the problem. Current date: 2026-01-02 08:00:00"}]
+    assert PhaseCache.fingerprint("define", TASKS, AGENTS, {}) == PhaseCache.fingerprint("define", later, AGENTS, {})
+
+    monday = [{'description': "As of Monday, October 20, 2025, define the problem"}]
+    friday = [{'description': "As of Friday, January 02, 2026, define the problem"}]
+    assert PhaseCache.fingerprint("define", monday, AGENTS, {}) == PhaseCache.fingerprint("define", friday, AGENTS, {})
+
+
+def test_fingerprint_covers_inputs():
+    base = PhaseCache.fingerprint("define", TASKS, AGENTS, {'analysis': "Feasible"})
+    changed_task = [{**TASKS[0], 'expected_output': "Three problem statements"}]
+    changed_agent = [{**AGENTS[0], 'temperature': 0.7}]
+
+    assert PhaseCache.fingerprint("define", TASKS, AGENTS, {'analysis': "Not feasible"}) != base
+    assert PhaseCache.fingerprint("define", changed_task, AGENTS, {'analysis': "Feasible"}) != base
+    assert PhaseCache.fingerprint("define", TASKS, changed_agent, {'analysis': "Feasible"}) != base
+    assert PhaseCache.fingerprint("explore", TASKS, AGENTS, {'analysis': "Feasible"}) != base
+
+
+def test_round_trip_and_clear_by_phase(cache):
+    cache.put("k1", "define", "# Definition\nProblem statement")
+    cache.put("k2", "explore", "# Exploration")
+
+    assert cache.get("k1") == "# Definition\nProblem statement"
+    assert cache.get("missing") is None
+
+    cache.clear("define")
+    assert cache.get("k1") is None
+    assert cache.get("k2") == "# Exploration"
+    assert cache.size_bytes == cache.get_stats()['size_bytes']
+
+    cache.clear()
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_eviction_recounts_the_size_total(tmp_path):
+    cache = PhaseCache(str(tmp_path / "lru.sqlite"), max_bytes=1000)
+    for i in range(20):
+        cache.put(f"k{i}", "define", os.urandom(100).hex())
+
+    stats = cache.get_stats()
+    assert 0 < stats['size_bytes'] <= 1000
+    assert stats['evictions'] > 0
+    assert cache.get("k19") is not None
+    assert cache.get("k0") is None
+    # The running total may overcount replaced rows, but never drifts below the real size
+    cache.put("k19", "define", "short")
+    assert cache.size_bytes >= cache.get_stats()['size_bytes']
+
+
+def test_opens_caches_written_by_the_previous_schema(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE phase_outputs (key TEXT PRIMARY KEY, phase TEXT NOT NULL, payload BLOB NOT NULL,"
+        " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+    )
+    payload = zlib.compress("# Old output".encode('utf-8'))
+    conn.execute("INSERT INTO phase_outputs VALUES (?, ?, ?, ?, ?, ?)",
+                 ("old", "define", payload, len(payload), time.time(), time.time()))
+    conn.commit()
+    conn.close()
+
+    cache = PhaseCache(path, max_bytes=100_000)
+    assert cache.size_bytes == len(payload)
+    assert cache.get("old") == "# Old output"
+    cache.put("new", "explore", "# New output")
+    assert cache.get("new") == "# New output"
+
+
+def test_global_cache_respects_config(data_dir, monkeypatch):
+    monkeypatch.setattr(config, 'PHASE_CACHE_ENABLED', False)
+    assert get_phase_cache() is None
+    monkeypatch.setattr(config, 'PHASE_CACHE_ENABLED', True)
+    assert get_phase_cache() is get_phase_cache()
@@ -0,0 +1,101 @@
+import threading
+import time
+
+import pytest
+
+from config import config
+from utils import SessionManager
+from utils.enhanced_workflow_manager import EnhancedWorkflowManager
+from utils.state_backend import DictState, use_state_backend
+
+
+class FakeWorkflow:
+    """Workflow whose phases record when they run; odd-numbered phases come from the phase cache"""
+
+    workflow_id = "workflow_test"
+
+    def __init__(self, phases=16, fail=None):
+        self.cached_phases = set()
+        self.checkpointed = []
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.started = []
+        self.phases = phases
+        self.fail = fail
+
+    def _phase(self, name, cached=False):
+        def run():
+            with self.lock:
+                self.started.append(name)
+                self.running += 1
+                self.max_running = max(self.max_running, self.running)
+            time.sleep(0.02)
+            with self.lock:
+                self.running -= 1
+            if name == self.fail:
+                raise RuntimeError("model error")
+            if cached:
+                self.cached_phases.add(name)
+            return {'success': True, 'phase': name, 'output': f"{name} output"}
+        return run
+
+    def get_phase_graph(self):
+        names = [f"p{i}" for i in range(self.phases)]
+        graph = [(name, self._phase(name, cached=i % 2 == 1), []) for i, name in enumerate(names)]
+        graph.append(('final', self._phase('final'), names))
+        return graph
+
+    def checkpoint_phase(self, phase_name, phase_result):
+        self.checkpointed.append(phase_name)
+
+    def generate_workflow_summary(self, all_results):
+        return {'phases': len(all_results)}
+
+
+@pytest.fixture
+def manager_factory(data_dir, heuristic_token_counter, monkeypatch):
+    monkeypatch.setattr(config, 'WORKFLOW_MAX_PARALLEL_PHASES', 8)
+    with use_state_backend(DictState()):
+        SessionManager.init_session()
+
+        def create(workflow):
+            manager = EnhancedWorkflowManager(workflow)
+            manager.estimate_phase_tokens = lambda name, function: 100
+            return manager
+        yield create
+
+
+def test_independent_phases_run_concurrently_and_dependents_wait(manager_factory):
+    workflow = FakeWorkflow()
+    result = manager_factory(workflow).run_enhanced_workflow()
+
+    assert result['success']
+    assert workflow.max_running > 1
+    assert workflow.max_running <= config.WORKFLOW_MAX_PARALLEL_PHASES
+    assert workflow.started[-1] == 'final'
+    assert sorted(workflow.checkpointed) == sorted(workflow.started)
+
+
+def test_concurrent_phases_keep_stats_consistent(manager_factory):
+    workflow = FakeWorkflow(phases=24)
+    manager = manager_factory(workflow)
+
+    stats = manager.run_enhanced_workflow()['execution_stats']
+
+    assert sorted(stats['phases_completed']) == sorted([f"p{i}" for i in range(24)] + ['final'])
+    assert sorted(stats['phases_cached']) == sorted(f"p{i}" for i in range(1, 24, 2))
+    assert stats['provider_stats']['total_tokens_processed'] == 25 * 100
+    # The returned stats are a snapshot, not the live lists
+    stats['phases_cached'].clear()
+    assert len(manager.execution_stats['phases_cached']) == 12
+
+
+def test_failure_stops_new_phases(manager_factory):
+    workflow = FakeWorkflow(fail='p3')
+
+    result = manager_factory(workflow).run_enhanced_workflow()
+
+    assert not result['success'] and result['failed_phase'] == 'p3'
+    assert 'final' not in workflow.started
+    assert 'p3' not in workflow.checkpointed
@@ -0,0 +1,100 @@
+import random
+
+from utils.semantic_chunker import SemanticChunker, estimate_tokens
+
+
+def make_document(paragraphs=40, seed=0):
+    rng = random.Random(seed)
+    words = ["market", "growth", "risk", "customer", "revenue", "pricing", "channel", "retention"]
+    parts = []
+    for p in range(paragraphs):
+        if p % 10 == 0:
+            parts.append(f"## Section {p // 10}\n")
+        if p % 7 == 3:
+            parts.append("| Metric | Q1 | Q2 |\n| --- | --- | --- |\n" +
+                         "".join(f"| KPI {r} | {r * 3} | {r * 5} |\n" for r in range(6)))
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(5, 15))).capitalize() + "."
+            for _ in range(rng.randint(2, 6))
+        ]
+        parts.append(" ".join(sentences) + "\n\n")
+    return "".join(parts)
+
+
+def test_chunks_are_token_bounded_ordered_slices_of_the_source():
+    text = make_document()
+    chunker = SemanticChunker(max_tokens=120, overlap_tokens=0)
+
+    chunks = list(chunker.chunks(text))
+
+    assert len(chunks) > 5
+    for chunk in chunks:
+        assert chunk.tokens <= 120
+        assert chunk.text == text[chunk.start:chunk.end]
+    assert all(a.end <= b.start for a, b in zip(chunks, chunks[1:]))
+    # Without overlap, only whitespace lies between consecutive chunks
+    covered = "".join(text[a.end:b.start] for a, b in zip(chunks, chunks[1:]))
+    assert not covered.strip()
+
+
+def test_streamed_pieces_chunk_like_the_whole_string():
+    text = make_document(seed=1)
+    chunker = SemanticChunker(max_tokens=150, overlap_tokens=30)
+    rng = random.Random(2)
+    pieces, i = [], 0
+    while i < len(text):
+        n = rng.randint(1, 300)
+        pieces.append(text[i:i + n])
+        i += n
+
+    assert list(chunker.chunks(iter(pieces))) == list(chunker.chunks(text))
+
+
+def test_pages_without_newlines_are_split_at_page_breaks():
+    # PDF pages arrive whitespace-collapsed, one line each, separated by a blank line
+    pages = [" ".join(f"Page {p} sentence {s} is here." for s in range(45)) for p in range(5)]
+    source = []
+    for p, page in enumerate(pages):
+        if p:
+            source.append("\n\n")
+        source.append(page)
+
+    chunks = SemanticChunker(max_tokens=400, overlap_tokens=0).split(iter(source))
+
+    # Each page fills most of the budget, so every page break closes a chunk
+    assert chunks == pages
+
+
+def test_headings_start_new_chunks_once_reasonably_full():
+    text = ("Intro sentence one. " * 30) + "\n# Pricing\n" + ("Pricing sentence. " * 10)
+    chunks = SemanticChunker(max_tokens=400, overlap_tokens=0).split(text)
+    assert len(chunks) == 2
+    assert chunks[1].startswith("# Pricing")
+
+
+def test_tables_are_split_only_between_rows():
+    rows = "".join(f"| row {i} | value {i * 10} | note {i} |\n" for i in range(200))
+    chunks = SemanticChunker(max_tokens=60, overlap_tokens=0).split(rows)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert all(line.startswith("|") and line.endswith("|") for line in chunk.splitlines())
+
+
+def test_overlap_repeats_trailing_sentences():
+    text = " ".join(f"Sentence {i} has several words in it." for i in range(60))
+    chunks = list(SemanticChunker(max_tokens=80, overlap_tokens=20).chunks(text))
+    assert len(chunks) > 2
+    assert all(b.start < a.end for a, b in zip(chunks, chunks[1:]))
+
+
+def test_unbreakable_text_is_cut_at_whitespace():
+    text = "word " * 2000
+    chunks = SemanticChunker(max_tokens=100, overlap_tokens=0).split(text)
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_empty_input_yields_nothing():
+    chunker = SemanticChunker(max_tokens=100)
+    assert chunker.split("") == []
+    assert chunker.split(iter(["", "   ", "\n"])) == []
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from utils import state_backend
+from utils.state_backend import DictState, get_state_backend, session_state, set_state_backend, use_state_backend
+
+
+def test_dict_state_supports_item_and_attribute_access():
+    state = DictState()
+    state.logs = []
+    state['language_tag'] = "en"
+
+    assert state['logs'] == [] and state.language_tag == "en"
+    assert 'logs' in state
+    del state.logs
+    assert 'logs' not in state
+    with pytest.raises(AttributeError):
+        state.logs
+    with pytest.raises(AttributeError):
+        del state.logs
+    # hasattr/getattr defaults work as with st.session_state
+    assert getattr(state, 'missing', None) is None
+
+
+def test_use_state_backend_restores_the_previous_backend():
+    outer, inner = DictState(), DictState()
+    with use_state_backend(outer):
+        with pytest.raises(RuntimeError):
+            with use_state_backend(inner):
+                assert get_state_backend() is inner
+                raise RuntimeError("phase failed")
+        assert get_state_backend() is outer
+    assert state_backend._state_backend is None
+
+
+def test_backend_is_shared_with_worker_threads():
+    state = DictState()
+    seen = []
+    with use_state_backend(state):
+        worker = threading.Thread(target=lambda: seen.append(get_state_backend()))
+        worker.start()
+        worker.join()
+    assert seen == [state]
+
+
+def test_session_state_proxy_forwards_to_the_active_backend():
+    first, second = DictState(), DictState(shared=1)
+    with use_state_backend(first):
+        session_state['workflow_state'] = {'current_phase': "define"}
+        session_state.selected_model = "gpt-4o-mini"
+        assert first == {'workflow_state': {'current_phase': "define"}, 'selected_model': "gpt-4o-mini"}
+        assert 'selected_model' in session_state
+        assert sorted(session_state) == ['selected_model', 'workflow_state']
+        assert len(session_state) == 2
+        assert session_state.get('missing', "default") == "default"
+
+        del session_state['workflow_state']
+        del session_state.selected_model
+        assert first == {}
+
+        set_state_backend(second)
+        assert session_state.shared == 1
+        with pytest.raises(AttributeError):
+            session_state.missing
@@ -0,0 +1,91 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.table_profiler import TableProfiler, iter_excel_sheets
+
+
+def chunks_of(frame, size):
+    return (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(4)
+    n = 5000
+    values = rng.normal(50, 10, n)
+    values[::97] = np.nan
+    return pd.DataFrame({
+        'amount': values,
+        'units': rng.integers(0, 100, n),
+        'region': rng.choice(['north', 'south', 'east'], n, p=[0.5, 0.3, 0.2]),
+    })
+
+
+def test_chunked_statistics_match_pandas(frame):
+    profiler = TableProfiler().consume(chunks_of(frame, 333))
+
+    assert profiler.rows == len(frame)
+    assert profiler.column_names == ['amount', 'units', 'region']
+    for name in ('amount', 'units'):
+        summary = profiler.columns[name].numeric_summary()
+        expected = frame[name].describe()
+        for stat in ('count', 'mean', 'std', 'min', 'max'):
+            assert summary[stat] == pytest.approx(expected[stat])
+        # Every value fits in the reservoir, so quantiles are exact too
+        assert summary['50%'] == pytest.approx(expected['50%'])
+    assert profiler.columns['amount'].nulls == frame['amount'].isna().sum()
+
+
+def test_quantiles_are_approximate_beyond_the_sample(frame, monkeypatch):
+    from utils.table_profiler import ColumnProfile
+    monkeypatch.setattr(ColumnProfile, 'SAMPLE_SIZE', 500)
+    profiler = TableProfiler().consume(chunks_of(frame, 1000))
+    summary = profiler.columns['units'].numeric_summary()
+    assert len(profiler.columns['units'].sample) == 500
+    assert summary['50%'] == pytest.approx(frame['units'].median(), abs=10)
+    assert summary['mean'] == pytest.approx(frame['units'].mean())
+
+
+def test_categories_and_text_summaries(frame):
+    profiler = TableProfiler(sample_rows=3).consume(chunks_of(frame, 700))
+
+    top = profiler.columns['region'].top_categories(3)
+    assert top == sorted(frame['region'].value_counts().items(), key=lambda item: item[1], reverse=True)
+    assert profiler.categories_text().startswith("region: north (")
+    assert len(profiler.head_text().splitlines()) == 4  # header plus three rows
+    assert "amount" in profiler.nulls_text()
+    assert "float64" in profiler.dtypes_text()
+    assert "mean" in profiler.numeric_text()
+
+
+def test_mixed_chunk_dtypes_widen():
+    profiler = TableProfiler().consume([pd.DataFrame({'x': [1, 2]}), pd.DataFrame({'x': [1.5]})])
+    assert profiler.columns['x'].dtype == 'float64'
+    profiler.update(pd.DataFrame({'x': ['text']}))
+    assert profiler.columns['x'].dtype == 'object'
+
+
+def test_empty_table():
+    profiler = TableProfiler().consume([])
+    assert profiler.rows == 0
+    assert profiler.head_text() == ""
+    assert profiler.numeric_text() == ""
+
+
+def test_excel_sheets_are_streamed_in_chunks():
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        pd.DataFrame({'a': range(25), 'b': [f"v{i}" for i in range(25)]}).to_excel(writer, sheet_name='Data', index=False)
+        pd.DataFrame({'c': [1.5, 2.5]}).to_excel(writer, sheet_name='Small', index=False)
+
+    sheets = {name: list(chunks) for name, chunks in iter_excel_sheets(buffer, chunk_rows=10)}
+
+    assert [len(chunk) for chunk in sheets['Data']] == [10, 10, 5]
+    assert pd.api.types.is_numeric_dtype(sheets['Data'][0]['a'])
+    profiler = TableProfiler().consume(sheets['Data'])
+    assert profiler.rows == 25
+    assert profiler.columns['a'].numeric_summary()['max'] == 24
+    assert sheets['Small'][0]['c'].tolist() == [1.5, 2.5]
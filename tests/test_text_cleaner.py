@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from utils.text_cleaner import _legacy_clean_text, clean_text
+
+# ASCII letters, punctuation, controls and whitespace; accented and non-Latin letters;
+# Unicode whitespace, typographic punctuation, symbols, digits, combining marks and a lone surrogate
+ALPHABET = (
+    "abcXYZ019_ .,!?;:-()\"'$%&#/\\*+=<>@[]{}|~`^\t\n\r\x0b\x0c\x1c\x1f\x00\x7f"
+    "\u00f1\u00e1\u00e9\u00ed\u00f3\u00fa\u00fc\u00d1\u00c1\u00c7\u00df\u00f8"
+    "\u00a0\u0085\u2003\u2028\u3000"
+    "\u201c\u201d\u2018\u2019\u00ab\u00bb\u2014\u2013\u2026\u2022\u20ac\u00bf\u00a1\u00b0\u00b7"
+    "\u0663\u00b2\u00bd\u0416\u03a9\u4e2d\ud55c\u203f"
+    "\u0301\u200b\ufeff\ud800"
+)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_the_legacy_cleaner(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 200)))
+        assert clean_text(text) == _legacy_clean_text(text)
+
+
+def test_ascii_and_non_ascii_paths_agree():
+    text = "  Revenue:\t$120m  (Q3-2025) — “growth” 50% #1\n\nnext  "
+    assert clean_text(text) == "Revenue: 120m (Q3-2025) growth 50 1 next"
+    assert clean_text(text.replace("—", "-").replace("“", "\"").replace("”", "\"")) == \
+        "Revenue: 120m (Q3-2025) - growth 50 1 next"
+    assert clean_text("Análisis de   mercado: año 2025…") == "Análisis de mercado: año 2025"
+    assert clean_text("") == "" and clean_text("  \n") == ""
@@ -0,0 +1,118 @@
+import random
+
+import pytest
+
+from utils.token_batch_manager import (
+    DocumentChunk,
+    TokenBatchManager,
+    best_fit_decreasing,
+    pack_groups_contiguous,
+    _legacy_best_fit,
+)
+
+
+def bin_totals(bins, sizes):
+    return [sum(sizes[i] for i in b) for b in bins]
+
+
+def test_best_fit_decreasing_respects_capacity_and_places_every_item():
+    rng = random.Random(7)
+    sizes = [rng.randint(1, 100) for _ in range(500)]
+    bins = best_fit_decreasing(sizes, 100)
+    assert sorted(i for b in bins for i in b) == list(range(len(sizes)))
+    assert max(bin_totals(bins, sizes)) <= 100
+
+
+def test_best_fit_decreasing_matches_previous_packer():
+    rng = random.Random(3)
+    for _ in range(20):
+        sizes = [rng.randint(1, 50) for _ in range(rng.randint(0, 200))]
+        assert best_fit_decreasing(sizes, 60) == _legacy_best_fit(sizes, 60)
+
+
+def test_best_fit_decreasing_fills_fullest_bin_first():
+    assert best_fit_decreasing([6, 5, 4, 3], 10) == [[0, 2], [1, 3]]
+
+
+def test_pack_groups_contiguous_keeps_groups_together_and_in_order():
+    sizes = [30, 30, 30, 30, 30, 20, 20, 50]
+    groups = [[0, 1, 2, 3, 4], [5, 6], [7]]
+    bins = pack_groups_contiguous(groups, sizes, 100)
+    assert max(bin_totals(bins, sizes)) <= 100
+    # The oversized group spans consecutive bins in its original order
+    spanned = [i for b in bins for i in b if i in groups[0]]
+    assert spanned == groups[0]
+    # Groups that fit in one bin are never split
+    for group in groups[1:]:
+        assert sum(1 for b in bins if set(group) & set(b)) == 1
+
+
+@pytest.fixture
+def manager(heuristic_token_counter):
+    return TokenBatchManager(tpm_limit=10_000, safety_margin=1.0, max_tokens_per_request=100)
+
+
+def make_chunks(doc, count, tokens):
+    return [DocumentChunk(doc, i, i + 1, tokens, i, count) for i in range(count)]
+
+
+def test_keep_documents_together_groups_chunks_by_source_document(manager):
+    # Parsed documents carry file_hash and filename but no id
+    docs = [{'filename': f"doc{i}.pdf", 'file_hash': f"h{i}", 'content': "x" * 10} for i in range(3)]
+    chunks = [chunk for doc in docs for chunk in make_chunks(doc, 2, 40)]
+    random.Random(1).shuffle(chunks)
+
+    batches = manager.create_smart_batches(chunks, max_tokens_per_batch=100, keep_documents_together=True)
+
+    # One batch per document, its chunks in order (batch order follows packing, not input)
+    assert sorted([chunk.chunk_id for chunk in batch] for batch in batches) == [
+        ['h0_0', 'h0_1'], ['h1_0', 'h1_1'], ['h2_0', 'h2_1']
+    ]
+
+
+def test_chunks_of_unidentified_documents_group_by_source_object(manager):
+    docs = [{'content': "x" * 10}, {'content': "y" * 10}]
+    chunks = make_chunks(docs[0], 2, 40) + make_chunks(docs[1], 2, 40)
+
+    batches = manager.create_smart_batches(chunks, max_tokens_per_batch=100, keep_documents_together=True)
+
+    assert len(batches) == 2
+    for batch in batches:
+        assert len({id(chunk.doc) for chunk in batch}) == 1
+
+
+def test_document_identity_falls_back_from_id_to_hash_to_filename():
+    assert DocumentChunk({'id': 'a', 'file_hash': 'h', 'filename': 'f'}, 0, 0, 0).original_doc_id == 'a'
+    assert DocumentChunk({'file_hash': 'h', 'filename': 'f'}, 0, 0, 0, 3).chunk_id == 'h_3'
+    assert DocumentChunk({'filename': 'f'}, 0, 0, 0).original_doc_id == 'f'
+    chunk = DocumentChunk({}, 0, 0, 0, 2)
+    assert (chunk.original_doc_id, chunk.chunk_id) == ('unknown', 'doc_2')
+
+
+def test_oversized_chunks_are_skipped(manager):
+    doc = {'filename': 'big.pdf', 'content': "x"}
+    chunks = [DocumentChunk(doc, 0, 1, 500), DocumentChunk(doc, 0, 1, 50, 1, 2)]
+    batches = manager.create_smart_batches(chunks, max_tokens_per_batch=100)
+    assert [[chunk.estimated_tokens for chunk in batch] for batch in batches] == [[50]]
+
+
+def test_chunk_document_smart_covers_the_document_within_the_request_budget(manager):
+    content = " ".join(f"Sentence number {i} talks about the market." for i in range(200))
+    doc = {'filename': 'long.txt', 'file_hash': 'abc', 'content': content}
+
+    chunks = manager.chunk_document_smart(doc)
+
+    assert len(chunks) > 1
+    assert all(chunk.estimated_tokens <= 100 for chunk in chunks)
+    assert [chunk.chunk_index for chunk in chunks] == list(range(len(chunks)))
+    assert all(chunk.total_chunks == len(chunks) for chunk in chunks)
+    # Chunks are ordered, non-overlapping slices of the source
+    assert all(a.end <= b.start for a, b in zip(chunks, chunks[1:]))
+    assert chunks[0].to_dict()['content'] == content[chunks[0].start:chunks[0].end]
+
+
+def test_chunk_document_smart_keeps_small_documents_whole(manager):
+    doc = {'filename': 'short.txt', 'content': "A short note."}
+    (chunk,) = manager.chunk_document_smart(doc)
+    assert chunk.content == doc['content']
+    assert chunk['filename'] == 'short.txt'
@@ -27,6 +27,7 @@ from .custom_tools import (
 
     # Vector search & planning/eval/reporting tools
     AdvancedPineconeVectorSearchTool,
+    pinecone_multi_vector_search,
     project_management_tool,
     markdown_editor_tool,
     monte_carlo_simulation_tool,
@@ -77,6 +78,7 @@ __all__ = [
 
     # Vector/search/planning/evaluation
     "AdvancedPineconeVectorSearchTool",
+    "pinecone_multi_vector_search",
     "project_management_tool",
     "markdown_editor_tool",
     "monte_carlo_simulation_tool",
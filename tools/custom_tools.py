@@ -3,7 +3,6 @@ import numpy as np
 import pandas as pd
 import requests
 from typing import Dict, List, Any, Optional, Type
-import streamlit as st
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 try:
@@ -18,6 +17,7 @@ except Exception:
     sns = None
 import matplotlib as mpl  
 from utils.vector_store import VectorStore
+from utils.state_backend import session_state
 from config import config
 
 # CrewAI imports
@@ -45,12 +45,10 @@ class SessionDirectoryReadTool(BaseTool):
     def _run(self) -> str:
         try:
             # Get the documents from the session state
-            import streamlit as st
-            
-            if 'workflow_state' not in st.session_state or 'documents' not in st.session_state.workflow_state:
+            if 'workflow_state' not in session_state or 'documents' not in session_state.workflow_state:
                 return "No documents found in the current session."
                 
-            documents = st.session_state.workflow_state.get('documents', [])
+            documents = session_state.workflow_state.get('documents', [])
             if not documents:
                 return "No documents have been uploaded in the current session."
             
@@ -84,12 +82,10 @@ class SessionFileReadTool(BaseTool):
     
     def _run(self, filename: str) -> str:
         try:
-            import streamlit as st
-            
-            if 'workflow_state' not in st.session_state or 'documents' not in st.session_state.workflow_state:
+            if 'workflow_state' not in session_state or 'documents' not in session_state.workflow_state:
                 return f"No documents found in the current session."
             
-            documents = st.session_state.workflow_state.get('documents', [])
+            documents = session_state.workflow_state.get('documents', [])
             if not documents:
                 return f"No documents have been uploaded in the current session."
             
@@ -1082,6 +1078,46 @@ Result {i}:
         return f"Vector search failed: {str(e)}"
 
 
+@tool("pinecone_multi_vector_search")
+def pinecone_multi_vector_search(queries: List[str], limit: int = 5) -> str:
+    """Run several searches against the Pinecone vector database in one call.
+    
+    Prefer this over repeated single searches when researching multiple angles
+    (e.g. market size, risks, competitors): all queries are embedded together
+    and searched concurrently.
+    
+    Args:
+        queries: List of search queries
+        limit: Maximum number of results to return per query (default: 5)
+    
+    Returns:
+        String containing results grouped by query, with similarity scores and content
+    """
+    try:
+        if isinstance(queries, str):
+            queries = [queries]
+        vector_store = VectorStore()
+        grouped = vector_store.search_many(queries, limit=limit)
+        
+        sections = []
+        for query, results in grouped.items():
+            if not results:
+                sections.append(f"## Query: {query}\nNo similar content found.")
+                continue
+            lines = [f"## Query: {query}"]
+            for i, result in enumerate(results, 1):
+                lines.append(f"""
+Result {i}:
+- Source: {result['filename']} ({result['file_type']})
+- Similarity Score: {result['score']:.3f}
+- Content: {result['chunk_text'][:500]}...
+""")
+            sections.append("\n".join(lines))
+        return "\n\n".join(sections) if sections else "No queries provided."
+    except Exception as e:
+        return f"Multi-query vector search failed: {str(e)}"
+
+
 @tool("project_management_planner")
 def project_management_tool(option_title: str, phases: str, timeline_weeks: int = 12) -> str:
     """Generate a comprehensive project management plan.
@@ -1736,6 +1772,7 @@ def get_simple_expected_output_template() -> str:
 # Function-based tools list - ADD execute_python_code HERE
 FUNCTION_TOOLS = [
     pinecone_vector_search,
+    pinecone_multi_vector_search,
     project_management_tool,
     markdown_editor_tool,
     serper_search_tool,
@@ -1764,6 +1801,7 @@ def get_strategic_analysis_tools():
     """Get tools specifically for strategic analysis workflows"""
     return [
         pinecone_vector_search,
+        pinecone_multi_vector_search,
         project_management_tool,
         monte_carlo_simulation_tool,
         monte_carlo_results_explainer,  # NEW: Layman explanation tool
@@ -2,11 +2,19 @@
 
 from .auth import AuthManager
 from .document_processor import DocumentProcessor
+from .document_cache import DocumentCache, get_document_cache
 from .vector_store import VectorStore
+from .embedding_cache import EmbeddingCache, get_embedding_cache
+from .query_cache import QueryCache, get_query_cache
 from .session_manager import SessionManager
+from .token_counter import TokenCounter, get_token_counter
 from .token_batch_manager import TokenBatchManager
 from .anthropic_rate_limiter import AnthropicRateLimiter, get_anthropic_rate_limiter
+from .admission_controller import TokenBucket, get_admission_controller
+from .phase_cache import PhaseCache, get_phase_cache
+from .state_backend import DictState, set_state_backend, use_state_backend
 from .enhanced_workflow_manager import EnhancedWorkflowManager
+from .ingestion_pipeline import IngestionPipeline
 
 try:
     from .pdf_generator import PDFGenerator
@@ -17,12 +25,28 @@ except Exception as e:
 __all__ = [
     "AuthManager",
     "DocumentProcessor",
+    "DocumentCache",
+    "get_document_cache",
     "VectorStore",
+    "EmbeddingCache",
+    "get_embedding_cache",
+    "QueryCache",
+    "get_query_cache",
     "SessionManager",
     "PDFGenerator",
+    "TokenCounter",
+    "get_token_counter",
     "TokenBatchManager",
     "AnthropicRateLimiter",
     "get_anthropic_rate_limiter",
+    "TokenBucket",
+    "get_admission_controller",
+    "PhaseCache",
+    "get_phase_cache",
+    "DictState",
+    "set_state_backend",
+    "use_state_backend",
     "EnhancedWorkflowManager",
+    "IngestionPipeline",
 ]
 
@@ -0,0 +1,141 @@
+"""
+Admission Controller - Token-bucket rate admission shared by all providers
+GCRA (generic cell rate algorithm) bucket that blocks only when the token budget is exhausted
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token bucket implemented with GCRA
+
+    The bucket holds up to `burst` tokens and refills continuously at
+    tokens_per_minute / 60 per second. State is a single theoretical arrival
+    time (TAT): the moment the bucket would be full again. A request is
+    admitted as soon as enough tokens have refilled, so callers only wait when
+    the bucket is actually empty, and the wait is the exact refill time.
+
+    Tokens are reserved when acquire() is called, before sleeping, so
+    concurrent callers queue in arrival order instead of all waking on the same
+    refill. A request larger than the burst is admitted once the bucket is full
+    and leaves it in debt, which later requests wait out.
+    """
+
+    def __init__(self, tokens_per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the bucket (starts full)
+
+        Args:
+            tokens_per_minute: Sustained admission rate
+            burst: Bucket capacity in tokens (default: one minute of tokens)
+            clock: Monotonic time source in seconds
+            sleep: Sleep function, replaceable for simulations
+        """
+        if tokens_per_minute <= 0:
+            raise ValueError("tokens_per_minute must be positive")
+        self.tokens_per_minute = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.burst = burst if burst is not None else tokens_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.tat = clock()
+
+        self.stats = {
+            'admitted': 0,
+            'tokens_admitted': 0,
+            'rejected': 0,
+            'blocked': 0,
+            'blocked_seconds': 0.0,
+            'max_blocked_seconds': 0.0,
+            'tokens_released': 0
+        }
+
+    def _reserve_locked(self, tokens: float, now: float) -> float:
+        """Admission time for tokens given the current TAT (no state change)"""
+        tolerance = self.burst / self.rate
+        start = max(self.tat, now)
+        return start + min(tokens, self.burst) / self.rate - tolerance
+
+    def wait_time(self, tokens: float) -> float:
+        """Seconds until tokens could be admitted (0 when available now)"""
+        with self.lock:
+            now = self.clock()
+            return max(0.0, self._reserve_locked(tokens, now) - now)
+
+    def available_tokens(self) -> float:
+        """Tokens currently in the bucket"""
+        with self.lock:
+            debt = max(0.0, self.tat - self.clock()) * self.rate
+            return max(0.0, self.burst - debt)
+
+    def acquire(self, tokens: float, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take tokens from the bucket, blocking until they have refilled
+
+        Args:
+            tokens: Tokens to admit
+            max_wait: Give up (without taking tokens) if the wait would exceed this many seconds
+
+        Returns:
+            Seconds spent blocked, or None if the wait would have exceeded max_wait
+        """
+        with self.lock:
+            now = self.clock()
+            wait = max(0.0, self._reserve_locked(tokens, now) - now)
+            if max_wait is not None and wait > max_wait:
+                self.stats['rejected'] += 1
+                return None
+            self.tat = max(self.tat, now) + tokens / self.rate
+            self.stats['admitted'] += 1
+            self.stats['tokens_admitted'] += tokens
+            if wait > 0:
+                self.stats['blocked'] += 1
+                self.stats['blocked_seconds'] += wait
+                self.stats['max_blocked_seconds'] = max(self.stats['max_blocked_seconds'], wait)
+
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def release(self, tokens: float):
+        """Return admitted tokens that were never spent (e.g. the phase output came from cache)"""
+        with self.lock:
+            self.tat = max(self.clock(), self.tat - tokens / self.rate)
+            self.stats['tokens_released'] += tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get admission statistics"""
+        available = self.available_tokens()
+        with self.lock:
+            return {
+                **self.stats,
+                'tokens_per_minute': self.tokens_per_minute,
+                'burst': self.burst,
+                'available_tokens': int(available)
+            }
+
+    def reset_stats(self):
+        """Reset statistics (the bucket level is kept)"""
+        with self.lock:
+            for key in self.stats:
+                self.stats[key] = 0.0 if isinstance(self.stats[key], float) else 0
+
+
+# Global admission controllers, one per provider and rate
+_global_admission_controllers: Dict[tuple, TokenBucket] = {}
+_global_admission_controllers_lock = threading.Lock()
+
+def get_admission_controller(provider: str, tokens_per_minute: int) -> TokenBucket:
+    """Get or create the shared token bucket for a provider's token budget"""
+    key = (provider, tokens_per_minute)
+    with _global_admission_controllers_lock:
+        bucket = _global_admission_controllers.get(key)
+        if bucket is None:
+            bucket = _global_admission_controllers[key] = TokenBucket(tokens_per_minute)
+    return bucket
@@ -3,14 +3,16 @@ Anthropic Rate Limiter - Specialized rate limiting for Anthropic Claude models
 Handles the specific rate limits and retry logic for Anthropic API calls
 """
 
+import re
 import time
 import asyncio
 import threading
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable
 from datetime import datetime, timedelta
 from functools import wraps
 import streamlit as st
 from config import config
+from utils.token_counter import get_token_counter
 
 
 class AnthropicRateLimiter:
@@ -19,21 +21,27 @@ class AnthropicRateLimiter:
     Handles the 20,000 tokens per minute limit with intelligent backoff and queueing
     """
     
+    # With tokenizer-based counts the margin only has to cover response tokens
+    EXACT_SAFETY_MARGIN = 0.9
+    HEURISTIC_SAFETY_MARGIN = 0.8
+    
     def __init__(self, 
                  tokens_per_minute: int = 20000,
-                 safety_margin: float = 0.8,
+                 safety_margin: Optional[float] = None,
                  max_tokens_per_request: int = 15000):
         """
         Initialize Anthropic rate limiter
         
         Args:
             tokens_per_minute: Anthropic TPM limit (default: 20,000)
-            safety_margin: Safety factor to avoid hitting limits (0.8 = 80% of limit)
+            safety_margin: Safety factor to avoid hitting limits (default: 0.9 with tokenizer
+                counts, 0.8 with heuristic estimates)
             max_tokens_per_request: Maximum tokens per single request
         """
+        self.token_counter = get_token_counter()
+        # Resolved on first use; checking the tokenizer here would load it at construction
+        self._safety_margin = safety_margin
         self.TPM_LIMIT = tokens_per_minute
-        self.SAFETY_MARGIN = safety_margin
-        self.EFFECTIVE_TPM = int(tokens_per_minute * safety_margin)
         self.MAX_TOKENS_PER_REQUEST = max_tokens_per_request
         
         # Token usage tracking with sliding window
@@ -53,11 +61,26 @@ class AnthropicRateLimiter:
         # Request queue for managing concurrent requests
         self.request_queue = []
         
+    @property
+    def SAFETY_MARGIN(self) -> float:
+        if self._safety_margin is None:
+            self._safety_margin = (self.EXACT_SAFETY_MARGIN if self.token_counter.is_exact
+                                   else self.HEURISTIC_SAFETY_MARGIN)
+        return self._safety_margin
+    
+    @property
+    def EFFECTIVE_TPM(self) -> int:
+        return int(self.TPM_LIMIT * self.SAFETY_MARGIN)
+    
     def estimate_tokens_anthropic(self, text: str, include_system_prompt: bool = True) -> int:
         """
         Estimate tokens for Anthropic Claude models
         Claude tokenization is slightly different from OpenAI
         
+        Counts come from the shared token counter's BPE encoding scaled by
+        config.ANTHROPIC_TOKEN_RATIO, or from the previous heuristic (with its
+        safety buffer) when no tokenizer is available.
+        
         Args:
             text: Input text to estimate tokens for
             include_system_prompt: Whether to include system prompt overhead
@@ -67,26 +90,31 @@ class AnthropicRateLimiter:
         """
         if not text:
             return 0
-        
-        # Basic estimation - Claude tends to use slightly more tokens than GPT-4
+        return self.estimate_tokens_many([text], include_system_prompt)[0]
+    
+    def estimate_tokens_many(self, texts: List[str], include_system_prompt: bool = True) -> List[int]:
+        """Batched estimate_tokens_anthropic (one tokenizer call for all texts)"""
+        overhead = 500 if include_system_prompt else 0  # Typical system prompt overhead
+        if self.token_counter.is_exact:
+            counts = self.token_counter.count_many(texts)
+            return [
+                max(1, int(count * config.ANTHROPIC_TOKEN_RATIO) + overhead) if text else 0
+                for text, count in zip(texts, counts)
+            ]
+        return [self._heuristic_tokens(text, overhead) if text else 0 for text in texts]
+    
+    @staticmethod
+    def _heuristic_tokens(text: str, overhead: int) -> int:
+        """Previous Claude heuristic: slightly above the GPT-4 estimate, plus a 10% buffer"""
         char_count = len(text)
-        
-        # Anthropic tokenization estimation (slightly higher than OpenAI)
         if char_count < 1000:
             estimated_tokens = char_count / 3.5  # Slightly conservative
         else:
             # For longer texts, use word-based estimation
-            import re
             word_count = len(re.findall(r'\b\w+\b', text))
             punct_count = len(re.findall(r'[^\w\s]', text))
             estimated_tokens = word_count * 1.3 + punct_count * 0.6 + char_count * 0.06
-        
-        # Add system prompt overhead if requested
-        if include_system_prompt:
-            estimated_tokens += 500  # Typical system prompt overhead
-        
-        # Add safety buffer for Claude's tokenization
-        return max(1, int(estimated_tokens * 1.1))
+        return max(1, int((estimated_tokens + overhead) * 1.1))
     
     def get_current_usage(self) -> Dict[str, int]:
         """Get current token usage in the last minute"""
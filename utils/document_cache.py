@@ -0,0 +1,59 @@
+"""
+Document Cache - Persistent cache of parsed documents
+Keyed by file content hash, file type and parser version, stored compressed in SQLite
+"""
+
+import json
+import zlib
+from typing import Any, Dict, Optional
+
+from config import config
+from utils.sqlite_cache import SQLiteLRUCache
+
+
+class DocumentCache(SQLiteLRUCache):
+    """
+    On-disk parsed-document cache with least-recently-used eviction
+
+    Re-uploading a file, or re-running the Streamlit script over the same
+    uploads, returns the stored text and metadata instead of parsing again.
+    Entries written by an older parser version are never matched, because the
+    version is part of the key.
+    """
+
+    TABLE = "documents"
+    DEFAULT_FILENAME = "document_cache.sqlite"
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the document cache
+
+        Args:
+            path: SQLite file path (default: <DATA_DIR>/document_cache.sqlite)
+            max_bytes: Size bound for stored (compressed) documents; oldest entries are evicted beyond it
+        """
+        super().__init__(
+            path,
+            max_bytes if max_bytes is not None else config.DOCUMENT_CACHE_MAX_MB * 1024 * 1024,
+            config.DATA_DIR
+        )
+
+    @staticmethod
+    def make_key(file_hash: str, file_type: str, parser_version: str) -> str:
+        return f"{file_hash}:{file_type}:{parser_version}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached document for key, or None"""
+        payload = self._fetch([key]).get(key)
+        return json.loads(zlib.decompress(payload).decode('utf-8')) if payload is not None else None
+
+    def put(self, key: str, document: Dict[str, Any]):
+        """Store a parsed document and enforce the size bound"""
+        self._store([(key, zlib.compress(json.dumps(document).encode('utf-8')))])
+
+
+def get_document_cache() -> Optional[DocumentCache]:
+    """Get or create the global document cache (None when disabled in config)"""
+    if not config.DOCUMENT_CACHE_ENABLED:
+        return None
+    return DocumentCache.shared()
@@ -1,16 +1,52 @@
 import os
+import io
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 import pandas as pd
 import PyPDF2
 import docx
-from typing import List, Dict, Any, Optional
+from docx.table import Table as DocxTable
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple
 import streamlit as st
 from datetime import datetime
-import hashlib
 from config import config
+from utils.table_profiler import TableProfiler, iter_excel_sheets
+from utils.document_cache import DocumentCache, get_document_cache
+from utils.upload_spool import SpooledUpload, hash_file
+from utils.text_cleaner import clean_text
+
+
+# Part of every parsed-document cache key; bump whenever a parser's output changes
+PARSER_VERSION = "5"
+
+
+# Per-process PDF reader for page-range workers, opened once by the pool initializer
+_pdf_worker_reader = None
+
+def _init_pdf_worker(source):
+    global _pdf_worker_reader
+    # A SpooledUpload arrives as its path and is re-mapped here; anything else arrives as bytes
+    _pdf_worker_reader = PyPDF2.PdfReader(source if isinstance(source, SpooledUpload) else io.BytesIO(source))
+
+def _extract_pdf_range(start: int, end: int) -> str:
+    """Process-pool entry point: cleaned text of pages [start, end)"""
+    return DocumentProcessor()._extract_pdf_pages(_pdf_worker_reader, start, end)
+
 
 class DocumentProcessor:
     """Handles document ingestion, processing and cleaning"""
     
+    # PDFs with at least this many pages are extracted in parallel, PDF_PAGES_PER_TASK pages per task
+    PDF_PARALLEL_MIN_PAGES = 32
+    PDF_PAGES_PER_TASK = 8
+    PDF_MAX_WORKERS = 4
+    # Cleaning collapses each page to one line; a blank line between pages gives
+    # chunkers a paragraph boundary to stream on
+    PDF_PAGE_BREAK = "\n\n"
+    # Rows read per chunk when profiling CSV/Excel files
+    TABLE_CHUNK_ROWS = 50000
+    
     def __init__(self):
         self.supported_types = {
             '.pdf': self._process_pdf,
@@ -45,87 +81,305 @@ class DocumentProcessor:
             return None
         
         try:
-            file_ext = os.path.splitext(file.name)[1].lower()
-            processor = self.supported_types.get(file_ext)
-            
-            if not processor:
-                st.error(f"No processor available for {file_ext}")
-                return None
-            
-            # Generate file hash for deduplication
-            file_hash = hashlib.md5(file.getvalue()).hexdigest()
-            
-            # Process content
-            content = processor(file)
-            
-            return {
-                'filename': file.name,
-                'file_type': file_ext,
-                'file_hash': file_hash,
-                'file_size': file.size,
-                'content': content,
-                'processed_at': datetime.now().isoformat(),
-                'word_count': len(content.split()) if isinstance(content, str) else 0
-            }
-        
+            return self.extract(file)
         except Exception as e:
             st.error(f"Error processing {file.name}: {str(e)}")
             return None
     
+    def extract(self, file) -> Dict[str, Any]:
+        """
+        Extract content and metadata from an already validated file
+        
+        Raises on failure instead of reporting through Streamlit, so it can run
+        in worker processes (see utils.ingestion_pipeline). In-memory uploads
+        are spooled to TEMP_DIR for the duration of the parse, so parsers read
+        from a memory-mapped file instead of copies of the payload.
+        """
+        file_ext = os.path.splitext(file.name)[1].lower()
+        processor = self.supported_types.get(file_ext)
+        
+        if not processor:
+            raise ValueError(f"No processor available for {file_ext}")
+        
+        # Generate file hash for deduplication (streamed, or taken from the spool)
+        file_hash = hash_file(file)
+        
+        cached = self._get_cached_document(file_hash, file_ext)
+        if cached is not None:
+            return {**cached, 'filename': file.name}
+        
+        # Process content
+        spooled = file if isinstance(file, SpooledUpload) else SpooledUpload.spool(file)
+        try:
+            content = processor(spooled)
+        finally:
+            if spooled is not file:
+                spooled.remove()
+        
+        document = self._new_document(file, file_hash, content)
+        self._cache_document(document)
+        return document
+    
+    def extract_pdf_streaming(self, file,
+                              consume: Optional[Callable[[Dict[str, Any], Iterator[str]], Any]] = None
+                              ) -> Tuple[Dict[str, Any], Any]:
+        """
+        Extract a PDF in this process while consume reads its text as it is produced
+        
+        Meant for large PDFs (see is_large_pdf): their page ranges are extracted
+        by iter_pdf_text's process pool instead of by a single worker, and no
+        text is pickled between processes. consume(document, pieces) receives
+        the document before its content is filled in, and the iter_pdf_text
+        pieces, e.g. to chunk and embed them with
+        VectorStore.prepare_document_vectors(document, source=pieces); pieces it
+        leaves unread are drained afterwards. The cache is not consulted (see
+        get_cached), but the finished document is stored in it.
+        
+        Returns:
+            The document and consume's result (None without consume)
+        """
+        document = self._new_document(file, hash_file(file), "")
+        pieces = []
+        
+        def text() -> Iterator[str]:
+            for piece in self.iter_pdf_text(file):
+                pieces.append(piece)
+                yield piece
+        
+        stream = text()
+        result = consume(document, stream) if consume else None
+        for _ in stream:
+            pass
+        
+        # The workflow reads the full text from the document, so it is joined once here
+        content = "".join(pieces)
+        document.update(content=content, word_count=len(content.split()))
+        self._cache_document(document)
+        return document, result
+    
+    def is_large_pdf(self, file) -> bool:
+        """True for PDFs with enough pages for iter_pdf_text to extract page ranges in parallel"""
+        if os.path.splitext(file.name)[1].lower() != '.pdf':
+            return False
+        try:
+            file.seek(0)
+            return len(PyPDF2.PdfReader(file).pages) >= self.PDF_PARALLEL_MIN_PAGES
+        except Exception:
+            # Unreadable PDFs take the regular path, which reports the error
+            return False
+        finally:
+            file.seek(0)
+    
+    def _new_document(self, file, file_hash: str, content: str) -> Dict[str, Any]:
+        return {
+            'filename': file.name,
+            'file_type': os.path.splitext(file.name)[1].lower(),
+            'file_hash': file_hash,
+            'file_size': file.size,
+            'content': content,
+            'processed_at': datetime.now().isoformat(),
+            'word_count': len(content.split()) if isinstance(content, str) else 0
+        }
+    
+    def get_cached(self, file) -> Optional[Dict[str, Any]]:
+        """Return the parsed document for file from the document cache, or None on a miss"""
+        file_ext = os.path.splitext(file.name)[1].lower()
+        cached = self._get_cached_document(hash_file(file), file_ext)
+        return {**cached, 'filename': file.name} if cached is not None else None
+    
+    def _get_cached_document(self, file_hash: str, file_ext: str) -> Optional[Dict[str, Any]]:
+        try:
+            cache = get_document_cache()
+            return cache.get(DocumentCache.make_key(file_hash, file_ext, PARSER_VERSION)) if cache else None
+        except Exception as e:
+            # The cache only saves work; fall back to parsing
+            print(f"Document cache lookup failed: {e}")
+            return None
+    
+    def _cache_document(self, document: Dict[str, Any]):
+        try:
+            cache = get_document_cache()
+            if cache:
+                key = DocumentCache.make_key(document['file_hash'], document['file_type'], PARSER_VERSION)
+                cache.put(key, document)
+        except Exception as e:
+            print(f"Document cache write failed: {e}")
+    
     def _process_pdf(self, file) -> str:
         """Extract text from PDF file"""
         try:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            
-            return self._clean_text(text)
+            return "".join(self.iter_pdf_text(file))
         
         except Exception as e:
             raise Exception(f"Failed to process PDF: {str(e)}")
     
+    def iter_pdf_text(self, file) -> Iterator[str]:
+        """
+        Lazily yield cleaned PDF text in page order
+        
+        Large PDFs are split into page ranges extracted by a process pool, with a
+        bounded number of ranges in flight; small PDFs, and PDFs opened inside a
+        worker process, are read page by page on the calling thread (the
+        ingestion pipeline therefore parses large PDFs in its own process, see
+        extract_pdf_streaming). Empty pages are skipped, and consecutive pages
+        are separated by PDF_PAGE_BREAK. The output can be fed straight to
+        SemanticChunker.chunks.
+        """
+        first = True
+        for text in self._iter_pdf_ranges(file):
+            if not first:
+                yield self.PDF_PAGE_BREAK
+            first = False
+            yield text
+    
+    def _iter_pdf_ranges(self, file) -> Iterator[str]:
+        """Yield the non-empty cleaned text of each page (serial) or page range (parallel)"""
+        pdf_reader = PyPDF2.PdfReader(file)
+        page_count = len(pdf_reader.pages)
+        ranges = [
+            (start, min(start + self.PDF_PAGES_PER_TASK, page_count))
+            for start in range(0, page_count, self.PDF_PAGES_PER_TASK)
+        ]
+        
+        pool = None
+        workers = min(self.PDF_MAX_WORKERS, os.cpu_count() or 1, len(ranges))
+        if (workers > 1 and page_count >= self.PDF_PARALLEL_MIN_PAGES
+                and multiprocessing.parent_process() is None):
+            try:
+                file.seek(0)
+                pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_pdf_worker,
+                    initargs=(file if isinstance(file, SpooledUpload) else file.read(),)
+                )
+            except (OSError, NotImplementedError):
+                pool = None
+        
+        if pool is None:
+            for page in pdf_reader.pages:
+                text = self._clean_text(page.extract_text() or "")
+                if text:
+                    yield text
+            return
+        
+        try:
+            in_flight = 2 * workers
+            futures = []
+            for i in range(len(ranges)):
+                try:
+                    # Keep up to in_flight ranges submitted ahead of the one being yielded
+                    while len(futures) < min(len(ranges), i + in_flight):
+                        futures.append(pool.submit(_extract_pdf_range, *ranges[len(futures)]))
+                    text = futures[i].result()
+                except BrokenProcessPool:
+                    # Workers could not start or died; finish serially from this range on
+                    futures[i:] = [None] * (len(futures) - i)
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = None
+                    for start, end in ranges[i:]:
+                        text = self._extract_pdf_pages(pdf_reader, start, end)
+                        if text:
+                            yield text
+                    return
+                futures[i] = None  # drop the finished result
+                if text:
+                    yield text
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _extract_pdf_pages(self, pdf_reader, start: int, end: int) -> str:
+        """Cleaned text of pages [start, end), joined with PDF_PAGE_BREAK"""
+        texts = (self._clean_text(pdf_reader.pages[i].extract_text() or "") for i in range(start, end))
+        return self.PDF_PAGE_BREAK.join(text for text in texts if text)
+    
     def _process_docx(self, file) -> str:
         """Extract text from Word document"""
         try:
-            doc = docx.Document(file)
-            text = ""
-            
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            
-            return self._clean_text(text)
+            return "".join(self.iter_docx_text(file)).strip()
         
         except Exception as e:
             raise Exception(f"Failed to process Word document: {str(e)}")
     
+    def iter_docx_text(self, file) -> Iterator[str]:
+        """
+        Lazily yield the body of a Word document in document order
+        
+        Paragraphs are cleaned individually and separated by blank lines;
+        headings become markdown headings and list items bullets, and tables
+        are emitted as markdown tables where they appear, so the structure
+        survives for SemanticChunker.
+        """
+        doc = docx.Document(file)
+        for block in doc.iter_inner_content():
+            if isinstance(block, DocxTable):
+                table = self._docx_table_markdown(block)
+                if table:
+                    yield table + "\n\n"
+                continue
+            
+            text = self._clean_text(block.text)
+            if not text:
+                continue
+            style = block.style.name if block.style is not None else ""
+            if style == "Title":
+                text = f"# {text}"
+            elif style.startswith("Heading"):
+                level = style.rsplit(" ", 1)[-1]
+                text = f"{'#' * min(int(level), 6) if level.isdigit() else '#'} {text}"
+            elif style.startswith("List"):
+                text = f"- {text}"
+            yield text + "\n\n"
+    
+    def _docx_table_markdown(self, table) -> str:
+        """Render a Word table as a markdown table (first row as header)"""
+        rows = []
+        for row in table.rows:
+            cells = [self._markdown_cell(cell.text) for cell in row.cells]
+            if any(cells):
+                rows.append(cells)
+        if not rows:
+            return ""
+        lines = ["| " + " | ".join(cells) + " |" for cells in rows]
+        lines.insert(1, "|" + " --- |" * len(rows[0]))
+        return "\n".join(lines)
+    
+    def _markdown_cell(self, text: str) -> str:
+        """Cell text for a markdown table: lines cleaned and joined with <br>, pipes escaped"""
+        lines = (self._clean_text(line) for line in text.splitlines())
+        return "<br>".join(line for line in lines if line).replace("|", "\\|")
+    
     def _process_csv(self, file) -> str:
         """Process CSV file"""
         try:
-            df = pd.read_csv(file)
+            # Profile in chunks so memory stays bounded regardless of row count
+            profiler = TableProfiler(sample_rows=5).consume(
+                pd.read_csv(file, chunksize=self.TABLE_CHUNK_ROWS)
+            )
             
             # Convert to text representation
             text = f"CSV Data Summary:\n"
-            text += f"Rows: {len(df)}, Columns: {len(df.columns)}\n\n"
-            text += f"Column names: {', '.join(df.columns)}\n\n"
+            text += f"Rows: {profiler.rows}, Columns: {len(profiler.columns)}\n\n"
+            text += f"Column names: {', '.join(profiler.column_names)}\n\n"
             
             # Add sample data (first 5 rows)
             text += "Sample data (first 5 rows):\n"
-            text += df.head().to_string()
+            text += profiler.head_text()
             
             # Add data types and basic statistics
-            text += f"\n\nData types:\n{df.dtypes.to_string()}"
+            text += f"\n\nData types:\n{profiler.dtypes_text()}"
             
-            if len(df.select_dtypes(include='number').columns) > 0:
-                text += f"\n\nNumerical summary:\n{df.describe().to_string()}"
+            numeric = profiler.numeric_text()
+            if numeric:
+                text += f"\n\nNumerical summary:\n{numeric}"
+            
+            nulls = profiler.nulls_text()
+            if nulls:
+                text += f"\n\nMissing values:\n{nulls}"
+            
+            categories = profiler.categories_text()
+            if categories:
+                text += f"\n\nTop categories:\n{categories}"
             
             return text
         
@@ -135,40 +389,33 @@ class DocumentProcessor:
     def _process_excel(self, file) -> str:
         """Process Excel file"""
         try:
-            excel_file = pd.ExcelFile(file)
-            text = f"Excel file with {len(excel_file.sheet_names)} sheet(s):\n"
-            
-            for sheet_name in excel_file.sheet_names:
-                df = pd.read_excel(file, sheet_name=sheet_name)
-                text += f"\n--- Sheet: {sheet_name} ---\n"
-                text += f"Rows: {len(df)}, Columns: {len(df.columns)}\n"
-                text += f"Columns: {', '.join(df.columns)}\n"
+            # Each workbook is opened once and every sheet is streamed in row chunks
+            sheets = []
+            for sheet_name, chunks in iter_excel_sheets(file, self.TABLE_CHUNK_ROWS):
+                profiler = TableProfiler(sample_rows=3).consume(chunks)
+                sheet_text = f"\n--- Sheet: {sheet_name} ---\n"
+                sheet_text += f"Rows: {profiler.rows}, Columns: {len(profiler.columns)}\n"
+                sheet_text += f"Columns: {', '.join(profiler.column_names)}\n"
                 
                 # Add sample data
-                if not df.empty:
-                    text += f"Sample data:\n{df.head(3).to_string()}\n"
+                if profiler.rows:
+                    sheet_text += f"Sample data:\n{profiler.head_text()}\n"
+                    numeric = profiler.numeric_text()
+                    if numeric:
+                        sheet_text += f"Numerical summary:\n{numeric}\n"
+                    categories = profiler.categories_text(limit=3)
+                    if categories:
+                        sheet_text += f"Top categories:\n{categories}\n"
+                sheets.append(sheet_text)
             
-            return text
+            return f"Excel file with {len(sheets)} sheet(s):\n" + "".join(sheets)
         
         except Exception as e:
             raise Exception(f"Failed to process Excel: {str(e)}")
     
     def _clean_text(self, text: str) -> str:
-        """Clean and normalize text content"""
-        if not text:
-            return ""
-        
-        # Remove excessive whitespace
-        text = ' '.join(text.split())
-        
-        # Remove special characters but keep basic punctuation
-        import re
-        text = re.sub(r'[^\w\s\.\,\!\?\;\:\-\(\)]', ' ', text)
-        
-        # Remove multiple spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        """Clean and normalize text content (single pass, see utils.text_cleaner)"""
+        return clean_text(text)
     
     def get_document_stats(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Get statistics about processed documents"""
@@ -0,0 +1,71 @@
+"""
+Embedding Cache - Persistent, content-addressed cache of OpenAI embeddings
+Keyed by model name plus a hash of the normalized chunk text, stored in SQLite
+"""
+
+import re
+import hashlib
+from array import array
+from typing import List, Optional
+
+from config import config
+from utils.sqlite_cache import SQLiteLRUCache
+
+
+class EmbeddingCache(SQLiteLRUCache):
+    """
+    On-disk embedding cache with least-recently-used eviction
+
+    Vectors are stored as float32 blobs. The cache survives index clears and
+    app restarts, so re-ingesting a known corpus costs no embedding requests.
+    """
+
+    TABLE = "embeddings"
+    PAYLOAD_COLUMN = "vector"
+    DEFAULT_FILENAME = "embedding_cache.sqlite"
+
+    _WHITESPACE = re.compile(r'\s+')
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the embedding cache
+
+        Args:
+            path: SQLite file path (default: <DATA_DIR>/embedding_cache.sqlite)
+            max_bytes: Size bound for stored vectors; oldest entries are evicted beyond it
+        """
+        super().__init__(
+            path,
+            max_bytes if max_bytes is not None else config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+            config.DATA_DIR
+        )
+
+    @classmethod
+    def make_key(cls, model: str, text: str) -> str:
+        """Content address for a chunk: model plus SHA-256 of whitespace-normalized text"""
+        normalized = cls._WHITESPACE.sub(' ', text).strip()
+        return hashlib.sha256(f"{model}\0{normalized}".encode('utf-8')).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings for texts; missing entries are None"""
+        keys = [self.make_key(model, text) for text in texts]
+        found = self._fetch(keys)
+        results = []
+        for key in keys:
+            blob = found.get(key)
+            results.append(array('f', blob).tolist() if blob is not None else None)
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Store embeddings for texts (empty vectors are skipped) and enforce the size bound"""
+        self._store([
+            (self.make_key(model, text), array('f', vector).tobytes())
+            for text, vector in zip(texts, vectors) if vector
+        ])
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Get or create the global embedding cache (None when disabled in config)"""
+    if not config.EMBEDDING_CACHE_ENABLED:
+        return None
+    return EmbeddingCache.shared()
@@ -1,12 +1,33 @@
 import time
+import threading
+import concurrent.futures
 from typing import Dict, List, Any, Optional, Callable
 from datetime import datetime
 import streamlit as st
 from config import config
 from utils.anthropic_rate_limiter import get_anthropic_rate_limiter, AnthropicRateLimiter
+from utils.admission_controller import get_admission_controller
+from utils.phase_cache import get_phase_cache
+from utils.state_backend import session_state
 from utils.token_batch_manager import TokenBatchManager
 
 
+def _with_script_context(func: Callable) -> Callable:
+    """Wrap func so a worker thread running it can use st.* and st.session_state"""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        return func
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return func
+    
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func()
+    return run
+
+
 class EnhancedWorkflowManager:
     def __init__(self, workflow_instance):
         self.workflow = workflow_instance
@@ -28,15 +49,25 @@ class EnhancedWorkflowManager:
 
         if self.provider == 'anthropic':
             self.anthropic_limiter = get_anthropic_rate_limiter()
+            effective_tpm = self.anthropic_limiter.EFFECTIVE_TPM
         else:
             self.openai_token_manager = TokenBatchManager()
+            effective_tpm = self.openai_token_manager.MAX_TOKENS_PER_MIN
+
+        # Token bucket shared by every workflow on this provider's budget
+        self.admission = get_admission_controller(self.provider, effective_tpm)
 
+        # Phases are admitted and run on worker threads, which all update execution_stats
+        self.stats_lock = threading.Lock()
         self.execution_stats = {
             'start_time': None,
             'end_time': None,
             'phases_completed': [],
+            'phases_resumed': [],
+            'phases_cached': [],
             'phases_failed': [],
             'total_wait_time': 0,
+            'admission_wait_time': 0,
             'rate_limit_hits': 0,
             'provider': self.provider,
             'model': self.current_model
@@ -45,9 +76,9 @@ class EnhancedWorkflowManager:
         # ✅ AHORA _get_phase_settings devuelve un dict
         self.phase_settings = self._get_phase_settings()
 
-        ws = st.session_state.setdefault("workflow_state", {})
+        ws = session_state.setdefault("workflow_state", {})
         if "language_tag" not in ws:
-            ws["language_tag"] = st.session_state.get("language_tag", "en")
+            ws["language_tag"] = session_state.get("language_tag", "en")
 
     def _get_phase_settings(self) -> Dict[str, Dict[str, Any]]:
         """Get phase execution settings based on provider using central config"""
@@ -59,7 +90,6 @@ class EnhancedWorkflowManager:
 
         if self.provider == 'anthropic':
             return {
-                'inter_phase_delay': rl.get('inter_phase_delay', 15),
                 'max_retries': rl.get('max_retries', 3),
                 'retry_delay': rl.get('retry_delay', 30),
                 'timeout_per_phase': 120,
@@ -69,7 +99,6 @@ class EnhancedWorkflowManager:
             }
         else:  # openai / default
             return {
-                'inter_phase_delay': rl.get('inter_phase_delay', 5),
                 'max_retries': rl.get('max_retries', 2),
                 'retry_delay': rl.get('retry_delay', 15),
                 'timeout_per_phase': 180,
@@ -98,6 +127,7 @@ class EnhancedWorkflowManager:
             'implementation': 10000,
             'simulation': 8000,
             'evaluation': 6000,
+            'simulation_explainers': 0,  # Local templating, no model calls
             'report': 14000  # High because it synthesizes all phases
         }
         
@@ -110,36 +140,39 @@ class EnhancedWorkflowManager:
         else:
             return base_estimate
     
-    def wait_between_phases(self, next_phase_name: str, estimated_tokens: int):
+    def admit_phase(self, phase_name: str, estimated_tokens: int) -> bool:
         """
-        Wait appropriate time between phases based on provider and rate limits
+        Admit a phase against the provider's token bucket
+        
+        Blocks only while the bucket lacks estimated_tokens, for exactly the
+        refill time, and records the usage with the provider tracker.
         
         Args:
-            next_phase_name: Name of the next phase to execute
-            estimated_tokens: Estimated tokens for next phase
+            phase_name: Name of the phase
+            estimated_tokens: Estimated tokens for the phase
+            
+        Returns:
+            True if admitted, False if the wait would exceed the phase timeout
         """
-        delay = self.phase_settings['inter_phase_delay']
+        wait_needed = self.admission.wait_time(estimated_tokens)
+        if wait_needed > 0 and st:
+            st.info(
+                f"⏳ Rate limit protection: waiting {wait_needed:.1f}s for {estimated_tokens:,} tokens "
+                f"before {phase_name} ({self.admission.available_tokens():,.0f} available)"
+            )
         
-        if self.provider == 'anthropic' and self.anthropic_limiter:
-            # Check if we need additional wait time for Anthropic
-            usage = self.anthropic_limiter.get_current_usage()
-            
-            if usage['tokens_last_minute'] > (self.anthropic_limiter.EFFECTIVE_TPM * 0.6):
-                # We're using more than 60% of our limit, be more cautious
-                additional_delay = min(30, (usage['tokens_last_minute'] / self.anthropic_limiter.EFFECTIVE_TPM) * 60)
-                delay = max(delay, additional_delay)
-                
-                if st:
-                    st.info(
-                        f"🛡️ Rate limit protection: Extended delay {delay:.1f}s before {next_phase_name} "
-                        f"(current usage: {usage['tokens_last_minute']:,}/{self.anthropic_limiter.EFFECTIVE_TPM:,})"
-                    )
+        waited = self.admission.acquire(estimated_tokens, max_wait=self.phase_settings['timeout_per_phase'])
+        if waited is None:
+            return False
         
-        if delay > 0:
-            if st:
-                st.info(f"⏸️ Waiting {delay:.1f}s before starting {next_phase_name} phase...")
-            time.sleep(delay)
-            self.execution_stats['total_wait_time'] += delay
+        with self.stats_lock:
+            self.execution_stats['admission_wait_time'] += waited
+            self.execution_stats['total_wait_time'] += waited
+        if self.anthropic_limiter:
+            self.anthropic_limiter.record_request(estimated_tokens)
+        elif self.openai_token_manager:
+            self.openai_token_manager.add_token_usage(estimated_tokens)
+        return True
     
     def execute_phase_with_rate_limiting(self, phase_name: str, phase_function: Callable) -> Dict[str, Any]:
         """
@@ -161,50 +194,25 @@ class EnhancedWorkflowManager:
         
         for attempt in range(max_retries + 1):
             try:
-                if self.provider == 'anthropic' and self.anthropic_limiter:
-                    # Use Anthropic rate limiter
-                    if not self.anthropic_limiter.wait_for_availability(
-                        estimated_tokens, 
-                        max_wait=self.phase_settings['timeout_per_phase']
-                    ):
-                        raise Exception(f"Rate limit timeout for {phase_name} phase")
-                    
-                    # Execute the phase
-                    start_time = time.time()
-                    result = phase_function()
-                    execution_time = time.time() - start_time
-                    
-                    # Record the request
-                    self.anthropic_limiter.record_request(estimated_tokens)
-                    
-                    if st:
-                        st.success(f"✅ {phase_name} phase completed in {execution_time:.1f}s")
-                    
-                    return result
+                if estimated_tokens and not self.admit_phase(phase_name, estimated_tokens):
+                    raise Exception(f"Rate limit timeout for {phase_name} phase")
                 
-                elif self.provider == 'openai' and self.openai_token_manager:
-                    # Use OpenAI token manager
-                    if not self.openai_token_manager.wait_for_rate_limit_window(estimated_tokens):
-                        if st:
-                            st.warning(f"⚠️ Rate limit timeout for {phase_name}, proceeding with caution...")
-                    
-                    # Execute the phase
-                    start_time = time.time()
-                    result = phase_function()
-                    execution_time = time.time() - start_time
-                    
-                    # Record token usage
-                    self.openai_token_manager.add_token_usage(estimated_tokens)
-                    
+                # Execute the phase
+                start_time = time.time()
+                result = phase_function()
+                execution_time = time.time() - start_time
+                
+                if phase_name in getattr(self.workflow, 'cached_phases', ()):
+                    # Output came from the phase cache: no model tokens were spent
+                    self.admission.release(estimated_tokens)
+                    with self.stats_lock:
+                        self.execution_stats['phases_cached'].append(phase_name)
                     if st:
-                        st.success(f"✅ {phase_name} phase completed in {execution_time:.1f}s")
-                    
-                    return result
+                        st.success(f"♻️ {phase_name} phase reused its cached output (inputs unchanged)")
+                elif st:
+                    st.success(f"✅ {phase_name} phase completed in {execution_time:.1f}s")
                 
-                else:
-                    # Fallback: just execute with basic delay
-                    time.sleep(5)  # Basic delay
-                    return phase_function()
+                return result
             
             except Exception as e:
                 error_str = str(e).lower()
@@ -214,7 +222,8 @@ class EnhancedWorkflowManager:
                 ])
                 
                 if is_rate_limit_error and attempt < max_retries:
-                    self.execution_stats['rate_limit_hits'] += 1
+                    with self.stats_lock:
+                        self.execution_stats['rate_limit_hits'] += 1
                     wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
                     
                     if st:
@@ -224,7 +233,8 @@ class EnhancedWorkflowManager:
                         )
                     
                     time.sleep(wait_time)
-                    self.execution_stats['total_wait_time'] += wait_time
+                    with self.stats_lock:
+                        self.execution_stats['total_wait_time'] += wait_time
                     continue
                 else:
                     # Non-rate-limit error or max retries exceeded
@@ -234,10 +244,13 @@ class EnhancedWorkflowManager:
         
         raise Exception(f"Max retries exceeded for {phase_name} phase")
     
-    def run_enhanced_workflow(self) -> Dict[str, Any]:
+    def run_enhanced_workflow(self, completed_results: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Run the complete DECIDE workflow with enhanced rate limiting
         
+        Args:
+            completed_results: Results of phases restored from a checkpoint, which are not run again
+        
         Returns:
             Workflow execution result
         """
@@ -249,97 +262,25 @@ class EnhancedWorkflowManager:
             # Show rate limiting settings
             settings = self.phase_settings
             st.info(
-                f"📊 Rate limiting settings: {settings['inter_phase_delay']}s between phases, "
+                f"📊 Rate limiting settings: token-bucket admission at {self.admission.tokens_per_minute:,} TPM, "
                 f"{settings['max_retries']} max retries, {settings['safety_margin']} safety margin"
             )
         
-        # Define the sequential phases
-        phases = [
-            ('collection', self.workflow.run_collection_phase),
-            ('analysis', self.workflow.run_multidisciplinary_analysis_phase),
-            ('definition', self.workflow.run_define_phase),
-            ('exploration', self.workflow.run_explore_phase),
-            ('creation', self.workflow.run_create_phase),
-            ('implementation', self.workflow.run_implement_phase),
-            ('simulation', self.workflow.run_simulate_phase),
-            ('evaluation', self.workflow.run_evaluate_phase),
-            ('report', self.workflow.run_report_phase)
-        ]
-        
-        all_results = {}
+        all_results = dict(completed_results or {})
+        with self.stats_lock:
+            self.execution_stats['phases_resumed'] = list(all_results)
+        if all_results and st:
+            st.info(f"⏯️ Resuming from checkpoint: skipping {', '.join(all_results)}")
         
         try:
-            for i, (phase_name, phase_function) in enumerate(phases):
-                # Wait between phases (except for the first one)
-                if i > 0:
-                    estimated_tokens = self.estimate_phase_tokens(phase_name, phase_function)
-                    self.wait_between_phases(phase_name, estimated_tokens)
-                
-                # Update session state
-                if hasattr(st, 'session_state') and hasattr(st.session_state, 'workflow_state'):
-                    try:
-                        from utils.session_manager import SessionManager
-                        SessionManager.update_phase(phase_name, 'in_progress')
-                    except ImportError:
-                        pass  # SessionManager not available
-                
-                # Execute phase with rate limiting
-                try:
-                    phase_result = self.execute_phase_with_rate_limiting(phase_name, phase_function)
-                    
-                    if not isinstance(phase_result, dict):
-                        phase_result = {
-                            'success': True,           
-                            'phase': phase_name,
-                            'output': phase_result
-                        }
-
-                    if phase_result.get('success'):
-                        all_results[phase_name] = phase_result
-                        self.execution_stats['phases_completed'].append(phase_name)
-                        
-                        # Update session state
-                        if hasattr(st, 'session_state') and hasattr(st.session_state, 'workflow_state'):
-                            try:
-                                from utils.session_manager import SessionManager
-                                SessionManager.update_phase(phase_name, 'completed')
-                                
-                            except ImportError:
-                                pass  # SessionManager not available
-                    else:
-                        error_msg = f"Phase {phase_name} failed: {phase_result.get('error', 'Unknown error')}"
-                        self.execution_stats['phases_failed'].append(phase_name)
-                        return {
-                            'success': False,
-                            'error': error_msg,
-                            'completed_phases': self.execution_stats['phases_completed'],
-                            'failed_phase': phase_name,
-                            'execution_stats': self.get_execution_stats()
-                        }
-                
-                except Exception as e:
-                    error_msg = f"Exception in {phase_name} phase: {str(e)}"
-                    self.execution_stats['phases_failed'].append(phase_name)
-                    
-                    if hasattr(st, 'session_state') and hasattr(st.session_state, 'workflow_state'):
-                        try:
-                            from utils.session_manager import SessionManager
-                            SessionManager.add_log("ERROR", error_msg)
-                        except ImportError:
-                            pass  # SessionManager not available
-                    
-                    return {
-                        'success': False,
-                        'error': error_msg,
-                        'completed_phases': self.execution_stats['phases_completed'],
-                        'failed_phase': phase_name,
-                        'execution_stats': self.get_execution_stats()
-                    }
+            failure = self._run_phase_graph(self.workflow.get_phase_graph(), all_results)
+            if failure:
+                return failure
             
             # Workflow completed successfully
             self.execution_stats['end_time'] = datetime.now()
             
-            if hasattr(st, 'session_state') and hasattr(st.session_state, 'workflow_state'):
+            if 'workflow_state' in session_state:
                 try:
                     from utils.session_manager import SessionManager
                     SessionManager.update_phase('completed', 'completed')
@@ -358,7 +299,7 @@ class EnhancedWorkflowManager:
             return {
                 'success': True,
                 'workflow_id': self.workflow.workflow_id,
-                'completed_phases': self.execution_stats['phases_completed'],
+                'completed_phases': self._all_completed_phases(),
                 'phase_results': all_results,
                 'execution_stats': self.get_execution_stats(),
                 'summary': self.workflow.generate_workflow_summary(all_results)
@@ -368,7 +309,7 @@ class EnhancedWorkflowManager:
             self.execution_stats['end_time'] = datetime.now()
             error_msg = f"Workflow execution failed: {str(e)}"
             
-            if hasattr(st, 'session_state') and hasattr(st.session_state, 'workflow_state'):
+            if 'workflow_state' in session_state:
                 try:
                     from utils.session_manager import SessionManager
                     SessionManager.add_log("ERROR", error_msg)
@@ -379,19 +320,150 @@ class EnhancedWorkflowManager:
                 'success': False,
                 'error': error_msg,
                 'workflow_id': self.workflow.workflow_id,
-                'completed_phases': self.execution_stats['phases_completed'],
+                'completed_phases': self._all_completed_phases(),
                 'execution_stats': self.get_execution_stats()
             }
     
+    def _run_phase_graph(self, graph: List[tuple], all_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Run workflow phases in dependency order
+        
+        Each phase starts once all of its input phases have completed, up to
+        config.WORKFLOW_MAX_PARALLEL_PHASES at a time. Token-bucket admission
+        (including any wait for capacity) and the phase itself run on a worker
+        thread bound to the Streamlit session, so execution_stats updates take
+        stats_lock; scheduling and session phase updates stay on the calling
+        thread. Each successful phase is checkpointed before its dependents
+        start. After a failure no further phases start, and running ones are
+        allowed to finish.
+        
+        Args:
+            graph: [(phase_name, phase_function, input_phase_names), ...] in canonical order
+            all_results: Results of already completed phases (skipped); filled with each
+                successful phase's result
+            
+        Returns:
+            The failure result of the first phase that failed, or None on success
+        """
+        functions = {name: function for name, function, _ in graph}
+        inputs = {name: set(deps) for name, _, deps in graph}
+        completed = set(all_results)
+        pending = [name for name, _, _ in graph if name not in completed]
+        running: Dict[concurrent.futures.Future, str] = {}
+        failure = None
+        max_parallel = max(1, config.WORKFLOW_MAX_PARALLEL_PHASES)
+        
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            while running or (pending and failure is None):
+                # Start every phase whose inputs are complete, in canonical order
+                for phase_name in [p for p in pending if inputs[p] <= completed]:
+                    if failure is not None or len(running) >= max_parallel:
+                        break
+                    phase_function = functions[phase_name]
+                    self._update_session_phase(phase_name, 'in_progress')
+                    future = executor.submit(_with_script_context(
+                        lambda name=phase_name, function=phase_function:
+                            self.execute_phase_with_rate_limiting(name, function)
+                    ))
+                    running[future] = phase_name
+                    pending.remove(phase_name)
+                
+                if not running:
+                    blocked = pending[0]
+                    missing = sorted(inputs[blocked] - completed)
+                    failure = self._phase_failure(blocked, f"Phase {blocked} has unmet inputs: {', '.join(missing)}")
+                    break
+                
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    phase_name = running.pop(future)
+                    try:
+                        phase_result = future.result()
+                    except Exception as e:
+                        error_msg = f"Exception in {phase_name} phase: {str(e)}"
+                        with self.stats_lock:
+                            self.execution_stats['phases_failed'].append(phase_name)
+                        self._log_session("ERROR", error_msg)
+                        failure = failure or self._phase_failure(phase_name, error_msg)
+                        continue
+                    
+                    if not isinstance(phase_result, dict):
+                        phase_result = {
+                            'success': True,           
+                            'phase': phase_name,
+                            'output': phase_result
+                        }
+                    
+                    if phase_result.get('success'):
+                        all_results[phase_name] = phase_result
+                        self._checkpoint_phase(phase_name, phase_result)
+                        completed.add(phase_name)
+                        with self.stats_lock:
+                            self.execution_stats['phases_completed'].append(phase_name)
+                        self._update_session_phase(phase_name, 'completed')
+                    else:
+                        error_msg = f"Phase {phase_name} failed: {phase_result.get('error', 'Unknown error')}"
+                        with self.stats_lock:
+                            self.execution_stats['phases_failed'].append(phase_name)
+                        failure = failure or self._phase_failure(phase_name, error_msg)
+        
+        return failure
+    
+    def _phase_failure(self, phase_name: str, error_msg: str) -> Dict[str, Any]:
+        return {
+            'success': False,
+            'error': error_msg,
+            'completed_phases': self._all_completed_phases(),
+            'failed_phase': phase_name,
+            'execution_stats': self.get_execution_stats()
+        }
+    
+    def _all_completed_phases(self) -> List[str]:
+        with self.stats_lock:
+            return self.execution_stats['phases_resumed'] + self.execution_stats['phases_completed']
+    
+    def _checkpoint_phase(self, phase_name: str, phase_result: Dict[str, Any]):
+        try:
+            self.workflow.checkpoint_phase(phase_name, phase_result)
+        except Exception as e:
+            # A lost checkpoint only costs a re-run on resume; never fail the phase for it
+            self._log_session("WARNING", f"Failed to checkpoint {phase_name} phase: {str(e)}")
+    
+    def _update_session_phase(self, phase_name: str, status: str):
+        if 'workflow_state' in session_state:
+            try:
+                from utils.session_manager import SessionManager
+                SessionManager.update_phase(phase_name, status)
+            except ImportError:
+                pass  # SessionManager not available
+    
+    def _log_session(self, level: str, message: str):
+        if 'workflow_state' in session_state:
+            try:
+                from utils.session_manager import SessionManager
+                SessionManager.add_log(level, message)
+            except ImportError:
+                pass  # SessionManager not available
+    
     def get_execution_stats(self) -> Dict[str, Any]:
         """Get comprehensive execution statistics"""
-        stats = {**self.execution_stats}
+        # Copy the phase lists too; phases still running may append to them
+        with self.stats_lock:
+            stats = {
+                key: list(value) if isinstance(value, list) else value
+                for key, value in self.execution_stats.items()
+            }
         
         if stats['start_time'] and stats['end_time']:
             duration = stats['end_time'] - stats['start_time']
             stats['total_duration_seconds'] = duration.total_seconds()
             stats['total_duration_minutes'] = duration.total_seconds() / 60
         
+        stats['admission'] = self.admission.get_stats()
+        phase_cache = get_phase_cache()
+        if phase_cache is not None:
+            stats['phase_cache'] = phase_cache.get_stats()
+        
         # Add provider-specific stats
         if self.provider == 'anthropic' and self.anthropic_limiter:
             anthropic_stats = self.anthropic_limiter.get_stats()
@@ -408,17 +480,22 @@ class EnhancedWorkflowManager:
 
     def reset_stats(self):
         """Reset execution statistics"""
-        self.execution_stats = {
-            'start_time': None,
-            'end_time': None,
-            'phases_completed': [],
-            'phases_failed': [],
-            'total_wait_time': 0,
-            'rate_limit_hits': 0,
-            'provider': self.provider,
-            'model': self.current_model
-        }
+        with self.stats_lock:
+            self.execution_stats = {
+                'start_time': None,
+                'end_time': None,
+                'phases_completed': [],
+                'phases_resumed': [],
+                'phases_cached': [],
+                'phases_failed': [],
+                'total_wait_time': 0,
+                'admission_wait_time': 0,
+                'rate_limit_hits': 0,
+                'provider': self.provider,
+                'model': self.current_model
+            }
         
+        self.admission.reset_stats()
         if self.anthropic_limiter:
             self.anthropic_limiter.reset_stats()
         if self.openai_token_manager:
@@ -0,0 +1,240 @@
+"""
+Ingestion Pipeline - Concurrent multi-file document processing and vectorization
+Overlaps parsing (process pool) with chunking, embedding and upsert (I/O thread pool)
+"""
+
+import os
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Callable
+
+from utils.document_processor import DocumentProcessor
+from utils.upload_spool import SpooledUpload
+
+
+def _parse_upload(upload: SpooledUpload) -> Dict[str, Any]:
+    """Process-pool entry point: extract one spooled upload (pickled as its path)"""
+    try:
+        return DocumentProcessor().extract(upload)
+    finally:
+        upload.close()
+
+
+class IngestionPipeline:
+    """
+    Pipelined ingestion of many uploaded files
+
+    Each file moves through parse -> chunk/embed -> upsert. Parsing is CPU bound and
+    runs in a process pool; embedding and upsert are network bound and run in a
+    thread pool. Uploads are spooled to TEMP_DIR before parsing, so workers map
+    the file from disk instead of receiving pickled bytes. Large PDFs skip the
+    process pool: they are parsed one at a time in this process, page ranges in
+    parallel, and their chunks are embedded as pages arrive. At most max_in_flight
+    files are held between stages, which bounds memory while keeping every stage
+    busy. All progress callbacks are invoked from
+    the calling thread, so they may safely update Streamlit widgets.
+    """
+
+    STAGES = ('parse', 'embed', 'upsert')
+
+    def __init__(self,
+                 doc_processor: DocumentProcessor,
+                 vector_store=None,
+                 parse_workers: Optional[int] = None,
+                 io_workers: int = 4,
+                 max_in_flight: int = 8):
+        """
+        Initialize the ingestion pipeline
+
+        Args:
+            doc_processor: Processor used for validation (and parsing if the process pool is unavailable)
+            vector_store: VectorStore to embed into; if None documents are only parsed
+            parse_workers: Process pool size (default: CPU count, capped at 8)
+            io_workers: Thread pool size for embedding and upsert requests
+            max_in_flight: Maximum files held across all stages at once
+        """
+        self.doc_processor = doc_processor
+        self.vector_store = vector_store
+        self.parse_workers = parse_workers or min(8, os.cpu_count() or 1)
+        self.io_workers = io_workers
+        self.max_in_flight = max(1, max_in_flight)
+
+    def run(self, uploaded_files: List[Any],
+            on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Ingest uploaded files and return one result per file, in upload order
+
+        Each result has 'filename', 'document' (the processed document or None),
+        'vectorized' (bool), 'chunks', 'failed_chunks', 'error' and 'failed_stage'.
+        Progress events are dicts with 'filename', 'stage', 'status',
+        'completed_steps', 'total_steps' and 'message'.
+        """
+        results = [{
+            'filename': f.name, 'document': None, 'vectorized': False,
+            'chunks': 0, 'failed_chunks': 0, 'error': None, 'failed_stage': None
+        } for f in uploaded_files]
+
+        steps_per_file = len(self.STAGES) if self.vector_store else 1
+        progress = {'completed_steps': 0, 'total_steps': steps_per_file * len(uploaded_files)}
+
+        def emit(index: int, stage: str, status: str, message: str = "", steps: int = 1):
+            progress['completed_steps'] += steps
+            if on_progress:
+                on_progress({
+                    'filename': results[index]['filename'],
+                    'stage': stage,
+                    'status': status,
+                    'message': message,
+                    **progress
+                })
+
+        # Validation reports through Streamlit, so keep it on the calling thread
+        queued = []
+        for i, uploaded_file in enumerate(uploaded_files):
+            if self.doc_processor.validate_file(uploaded_file):
+                queued.append(i)
+            else:
+                results[i]['error'] = "File failed validation"
+                results[i]['failed_stage'] = 'validate'
+                emit(i, 'parse', 'failed', results[i]['error'], steps_per_file)
+
+        parse_pool = self._create_parse_pool()
+        io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.io_workers)
+        # Large PDFs each start their own page-range pool; one at a time bounds the worker count
+        pdf_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        pending: Dict[concurrent.futures.Future, tuple] = {}
+        spools: Dict[int, SpooledUpload] = {}
+        # Futures of the current parse pool, and whether any process pool has completed a parse
+        pool_futures = set()
+        pool_parsed = False
+
+        def submit_parse(i: int):
+            uploaded_file = uploaded_files[i]
+            cached = self.doc_processor.get_cached(uploaded_file) if i not in spools else None
+            if cached is not None:
+                # Already parsed by this parser version; skip spooling and parsing
+                future = concurrent.futures.Future()
+                future.set_result(cached)
+            else:
+                if i not in spools:
+                    spools[i] = SpooledUpload.spool(uploaded_file)
+                if self.doc_processor.is_large_pdf(spools[i]):
+                    future = pdf_pool.submit(self._stream_large_pdf, spools[i])
+                elif parse_pool is not None:
+                    future = parse_pool.submit(_parse_upload, spools[i])
+                    pool_futures.add(future)
+                else:
+                    future = io_pool.submit(self.doc_processor.extract, spools[i])
+            pending[future] = ('parse', i)
+
+        def release_spool(i: int):
+            spool = spools.pop(i, None)
+            if spool is not None:
+                spool.remove()
+
+        def fail(i: int, stage: str, error: Any):
+            release_spool(i)
+            results[i]['error'] = str(error)
+            results[i]['failed_stage'] = stage
+            remaining = steps_per_file - self.STAGES.index(stage)
+            emit(i, stage, 'failed', f"{stage} failed: {error}", remaining)
+
+        def on_embedded(i: int, value: Dict[str, Any]):
+            results[i]['chunks'] = value['total_chunks']
+            results[i]['failed_chunks'] = value['failed_chunks']
+            if value['errors']:
+                results[i]['error'] = value['errors'][0]
+            emit(i, 'embed', 'completed',
+                 f"Embedded {len(value['vectors'])}/{value['total_chunks']} chunks "
+                 f"({value['skipped_chunks']} already indexed)")
+            if value['vectors']:
+                pending[io_pool.submit(self.vector_store.upsert_vectors, value['vectors'])] = ('upsert', i)
+            else:
+                # Nothing new to write; already vectorized if every chunk was found in the index
+                results[i]['vectorized'] = bool(value['skipped_chunks']) and not value['failed_chunks']
+                emit(i, 'upsert', 'skipped', "No new vectors to upsert")
+
+        def try_submit_parse(i: int):
+            try:
+                submit_parse(i)
+            except Exception as e:
+                fail(i, 'parse', e)
+
+        try:
+            while queued or pending:
+                while queued and len(pending) < self.max_in_flight:
+                    try_submit_parse(queued.pop(0))
+
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    stage, i = pending.pop(future)
+                    from_pool = future in pool_futures
+                    pool_futures.discard(future)
+                    try:
+                        value = future.result()
+                        if stage == 'parse':
+                            pool_parsed = pool_parsed or from_pool
+                            release_spool(i)
+                    except BrokenProcessPool:
+                        if not pool_parsed:
+                            # Process pool could not start (e.g. restricted host); parse in threads instead
+                            if parse_pool is not None:
+                                parse_pool.shutdown(wait=False)
+                                parse_pool = None
+                            try_submit_parse(i)
+                            continue
+                        # A worker died mid-parse (e.g. out of memory on a huge file). The file
+                        # that killed it cannot be told apart from the others in flight, so each
+                        # of them fails instead of being re-parsed in this process; files not yet
+                        # submitted get a fresh pool
+                        if from_pool:
+                            parse_pool.shutdown(wait=False)
+                            parse_pool = self._create_parse_pool()
+                            pool_futures.clear()
+                        fail(i, 'parse', "parse worker process died (e.g. out of memory)")
+                        continue
+                    except Exception as e:
+                        fail(i, stage, e)
+                        continue
+
+                    if stage == 'parse':
+                        prepared = None
+                        if isinstance(value, tuple):
+                            # Large PDF: parsed and embedded in one streaming pass
+                            value, prepared = value
+                        results[i]['document'] = value
+                        emit(i, 'parse', 'completed', "Parsed")
+                        if prepared is not None:
+                            on_embedded(i, prepared)
+                        elif self.vector_store:
+                            pending[io_pool.submit(self.vector_store.prepare_document_vectors, value)] = ('embed', i)
+                    elif stage == 'embed':
+                        on_embedded(i, value)
+                    else:
+                        results[i]['vectorized'] = True
+                        emit(i, 'upsert', 'completed', f"Stored {value} vectors")
+        finally:
+            pdf_pool.shutdown(wait=True)
+            io_pool.shutdown(wait=True)
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True)
+            for i in list(spools):
+                release_spool(i)
+
+        return results
+
+    def _stream_large_pdf(self, spool: SpooledUpload) -> tuple:
+        """Parse a large PDF in this process; with a vector store, chunk and embed it as its pages arrive"""
+        consume = None
+        if self.vector_store:
+            consume = lambda document, pieces: self.vector_store.prepare_document_vectors(document, source=pieces)
+        return self.doc_processor.extract_pdf_streaming(spool, consume)
+
+    def _create_parse_pool(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        """Create the parsing process pool, or None to parse on the I/O threads"""
+        if self.parse_workers <= 1:
+            return None
+        try:
+            return concurrent.futures.ProcessPoolExecutor(max_workers=self.parse_workers)
+        except (OSError, NotImplementedError):
+            return None
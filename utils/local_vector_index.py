@@ -0,0 +1,288 @@
+"""
+Local Vector Index - In-process, numpy-backed drop-in for a Pinecone index
+Persists vectors to a memory-mapped .npy file and ids/metadata to a JSON snapshot plus an append-only log
+"""
+
+import os
+import json
+import shutil
+import threading
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+
+class LocalMatch:
+    """Query match with the attributes VectorStore reads from Pinecone matches"""
+
+    __slots__ = ('id', 'score', 'metadata', 'values')
+
+    def __init__(self, id: str, score: float, metadata: Optional[Dict[str, Any]] = None,
+                 values: Optional[List[float]] = None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+        self.values = values
+
+
+class LocalQueryResponse:
+    """Container mirroring Pinecone's QueryResponse (.matches)"""
+
+    def __init__(self, matches: List[LocalMatch]):
+        self.matches = matches
+
+
+class LocalFetchResponse:
+    """Container mirroring Pinecone's FetchResponse (.vectors keyed by id)"""
+
+    def __init__(self, vectors: Dict[str, LocalMatch]):
+        self.vectors = vectors
+
+
+class LocalVectorIndex:
+    """
+    Exact cosine-similarity index kept in process
+
+    Implements the subset of the Pinecone Index API used by VectorStore:
+    upsert, query, fetch, delete and describe_index_stats. Vectors are stored
+    L2-normalized in a float32 memory-mapped matrix, so a query is a single
+    matrix-vector product over the live rows.
+
+    Metadata changes are appended to a JSON-lines log instead of rewriting the
+    whole snapshot on every upsert; the log is replayed on open and folded
+    into the snapshot once it holds more entries than the index has rows.
+    """
+
+    VECTORS_FILE = "vectors.npy"
+    META_FILE = "meta.json"
+    META_LOG_FILE = "meta.log"
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, name: str, dimension: int, base_dir: str):
+        """
+        Open (or create) a local index
+
+        Args:
+            name: Index name; data lives in <base_dir>/<name>/
+            dimension: Vector dimension
+            base_dir: Directory holding all local indexes
+        """
+        self.name = name
+        self.dimension = dimension
+        self.path = os.path.join(base_dir, name)
+        self.lock = threading.RLock()
+        os.makedirs(self.path, exist_ok=True)
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        self.rows: Dict[str, int] = {}
+        # Metadata log entries not yet written, and entries in the log file
+        self._pending_log: List[Dict[str, Any]] = []
+        self._log_entries = 0
+        self._load()
+
+    @staticmethod
+    def exists(name: str, base_dir: str) -> bool:
+        """Check whether a local index has been created"""
+        return os.path.isdir(os.path.join(base_dir, name))
+
+    @staticmethod
+    def destroy(name: str, base_dir: str) -> bool:
+        """Delete a local index and its files"""
+        path = os.path.join(base_dir, name)
+        if not os.path.isdir(path):
+            return False
+        shutil.rmtree(path)
+        return True
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        """Load ids/metadata (snapshot, then log) and memory-map the vector matrix"""
+        vectors_path = os.path.join(self.path, self.VECTORS_FILE)
+        meta_path = os.path.join(self.path, self.META_FILE)
+
+        if os.path.exists(meta_path) and os.path.exists(vectors_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.ids = meta.get('ids', [])
+            self.metadata = meta.get('metadata', [])
+            self.rows = {vector_id: row for row, vector_id in enumerate(self.ids)}
+            self._replay_log()
+            self.vectors = np.load(vectors_path, mmap_mode='r+')
+        else:
+            self.vectors = self._allocate(self.INITIAL_CAPACITY)
+            self._save_meta()
+
+    def _replay_log(self):
+        """Apply logged metadata changes on top of the snapshot"""
+        log_path = os.path.join(self.path, self.META_LOG_FILE)
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted write; rewrite the snapshot
+                    # so later appends do not land behind it
+                    self._save_meta()
+                    return
+                if 'delete' in entry:
+                    self._remove_row(entry['delete'], move_vector=False)
+                else:
+                    self._assign_row(entry['put'], entry.get('metadata') or {})
+                self._log_entries += 1
+
+    def _allocate(self, capacity: int) -> np.memmap:
+        """Create a fresh memory-mapped matrix with room for capacity vectors"""
+        return np.lib.format.open_memmap(
+            os.path.join(self.path, self.VECTORS_FILE),
+            mode='w+', dtype=np.float32, shape=(capacity, self.dimension)
+        )
+
+    def _grow(self, needed: int):
+        """Double capacity until needed rows fit, copying live rows to the new file"""
+        capacity = self.vectors.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        live = np.array(self.vectors[:len(self.ids)])
+        del self.vectors
+        self.vectors = self._allocate(capacity)
+        self.vectors[:len(live)] = live
+
+    def _save_meta(self):
+        """Atomically write the ids/metadata snapshot next to the vector file and drop the log"""
+        meta_path = os.path.join(self.path, self.META_FILE)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({'dimension': self.dimension, 'ids': self.ids, 'metadata': self.metadata}, f)
+        os.replace(tmp_path, meta_path)
+        log_path = os.path.join(self.path, self.META_LOG_FILE)
+        if os.path.exists(log_path):
+            os.remove(log_path)
+        self._pending_log = []
+        self._log_entries = 0
+
+    def _flush(self):
+        """Persist vectors, then append pending metadata changes (compacting an oversized log)"""
+        self.vectors.flush()
+        if self._log_entries + len(self._pending_log) > max(len(self.ids), self.INITIAL_CAPACITY):
+            self._save_meta()
+            return
+        if self._pending_log:
+            with open(os.path.join(self.path, self.META_LOG_FILE), "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry) + "\n" for entry in self._pending_log))
+            self._log_entries += len(self._pending_log)
+            self._pending_log = []
+
+    def _assign_row(self, vector_id: str, metadata: Dict[str, Any]) -> int:
+        """Row of vector_id, appended if new, with its metadata replaced"""
+        row = self.rows.get(vector_id)
+        if row is None:
+            row = len(self.ids)
+            self.ids.append(vector_id)
+            self.metadata.append(metadata)
+            self.rows[vector_id] = row
+        else:
+            self.metadata[row] = metadata
+        return row
+
+    def _remove_row(self, vector_id: str, move_vector: bool = True):
+        """Drop vector_id, moving the last live row into its hole to keep rows contiguous"""
+        row = self.rows.pop(vector_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            if move_vector:
+                self.vectors[row] = self.vectors[last]
+            self.ids[row] = self.ids[last]
+            self.metadata[row] = self.metadata[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        self.metadata.pop()
+
+    # ------------------------------------------------------------------
+    # Pinecone-compatible API
+    # ------------------------------------------------------------------
+
+    def upsert(self, vectors: List[tuple], **kwargs) -> Dict[str, int]:
+        """Insert or overwrite (id, values, metadata) tuples"""
+        with self.lock:
+            new_ids = {item[0] for item in vectors if item[0] not in self.rows}
+            self._grow(len(self.ids) + len(new_ids))
+            for item in vectors:
+                vector_id, values = item[0], item[1]
+                metadata = item[2] if len(item) > 2 else {}
+                vector = np.asarray(values, dtype=np.float32)
+                norm = np.linalg.norm(vector)
+                row = self._assign_row(vector_id, metadata)
+                self._pending_log.append({'put': vector_id, 'metadata': metadata})
+                self.vectors[row] = vector / norm if norm else vector
+            self._flush()
+            return {'upserted_count': len(vectors)}
+
+    def query(self, vector: List[float], top_k: int = 10, include_metadata: bool = False,
+              include_values: bool = False, **kwargs) -> LocalQueryResponse:
+        """Return the top_k rows by cosine similarity"""
+        with self.lock:
+            count = len(self.ids)
+            if count == 0 or top_k <= 0:
+                return LocalQueryResponse([])
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            if norm:
+                query = query / norm
+            scores = self.vectors[:count] @ query
+            k = min(top_k, count)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return LocalQueryResponse([
+                LocalMatch(
+                    self.ids[row],
+                    float(scores[row]),
+                    self.metadata[row] if include_metadata else None,
+                    self.vectors[row].tolist() if include_values else None
+                )
+                for row in top
+            ])
+
+    def fetch(self, ids: List[str], **kwargs) -> LocalFetchResponse:
+        """Return stored vectors for the ids that exist"""
+        with self.lock:
+            return LocalFetchResponse({
+                vector_id: LocalMatch(vector_id, 1.0, self.metadata[row], self.vectors[row].tolist())
+                for vector_id in ids
+                for row in [self.rows.get(vector_id)]
+                if row is not None
+            })
+
+    def delete(self, ids: Optional[List[str]] = None, delete_all: bool = False, **kwargs):
+        """Delete the given ids, or every vector when delete_all is set"""
+        with self.lock:
+            if delete_all:
+                self.ids, self.metadata, self.rows = [], [], {}
+                del self.vectors
+                self.vectors = self._allocate(self.INITIAL_CAPACITY)
+                self._save_meta()
+                return {}
+            for vector_id in ids or []:
+                if vector_id in self.rows:
+                    self._remove_row(vector_id)
+                    self._pending_log.append({'delete': vector_id})
+            self._flush()
+            return {}
+
+    def describe_index_stats(self, **kwargs) -> Dict[str, Any]:
+        """Index statistics in the shape VectorStore reads from Pinecone"""
+        with self.lock:
+            return {
+                'dimension': self.dimension,
+                'total_vector_count': len(self.ids),
+                'index_fullness': len(self.ids) / max(1, self.vectors.shape[0])
+            }
@@ -0,0 +1,109 @@
+"""
+Phase Cache - Persistent cache of workflow phase outputs
+Keyed by a fingerprint of the phase's prompts, upstream outputs, model and temperature, stored compressed in SQLite
+"""
+
+import re
+import json
+import time
+import zlib
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from config import config
+from utils.sqlite_cache import SQLiteLRUCache
+
+
+class PhaseCache(SQLiteLRUCache):
+    """
+    On-disk phase output cache with least-recently-used eviction
+
+    A phase whose fingerprint matches a stored entry returns the stored output
+    instead of running its crew again. The fingerprint covers everything that
+    reaches the model: each task's description and expected output, each
+    agent's role, goal, backstory, model and temperature, and the outputs of
+    the phase's upstream phases. Changing any of them is a miss, so only
+    unchanged phases are reused. The run time that agents stamp into their
+    task descriptions is masked, or no rerun would ever match.
+    """
+
+    TABLE = "phase_outputs"
+    EXTRA_COLUMNS = ("phase TEXT NOT NULL", "created REAL NOT NULL")
+    DEFAULT_FILENAME = "phase_cache.sqlite"
+
+    # Bump to invalidate every stored output (e.g. after changing the fingerprint)
+    VERSION = "1"
+
+    # "%Y-%m-%d %H:%M:%S" and "%A, %B %d, %Y", as written by the agents' create_task
+    _RUN_TIME = re.compile(
+        r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}'
+        r'|(?:Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), [A-Z][a-z]+ \d{2}, \d{4}'
+    )
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the phase cache
+
+        Args:
+            path: SQLite file path (default: <DATA_DIR>/phase_cache.sqlite)
+            max_bytes: Size bound for stored (compressed) outputs; oldest entries are evicted beyond it
+        """
+        super().__init__(
+            path,
+            max_bytes if max_bytes is not None else config.PHASE_CACHE_MAX_MB * 1024 * 1024,
+            config.DATA_DIR
+        )
+
+    @classmethod
+    def fingerprint(cls, phase: str, tasks: List[Dict[str, Any]], agents: List[Dict[str, Any]],
+                    upstream_outputs: Dict[str, str]) -> str:
+        """
+        Fingerprint of a phase's inputs
+
+        Args:
+            phase: Phase name
+            tasks: Per task: description and expected output
+            agents: Per agent: role, goal, backstory, model and temperature
+            upstream_outputs: Output text of each input phase
+
+        Returns:
+            SHA-256 hex digest
+        """
+        tasks = [
+            {k: cls._RUN_TIME.sub('<run-time>', v) if isinstance(v, str) else v for k, v in task.items()}
+            for task in tasks
+        ]
+        payload = json.dumps(
+            {
+                'version': cls.VERSION,
+                'phase': phase,
+                'tasks': tasks,
+                'agents': agents,
+                'upstream': upstream_outputs
+            },
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for key, or None"""
+        payload = self._fetch([key]).get(key)
+        return zlib.decompress(payload).decode('utf-8') if payload is not None else None
+
+    def put(self, key: str, phase: str, output: str):
+        """Store a phase output and enforce the size bound"""
+        self._store([(key, phase, time.time(), zlib.compress(output.encode('utf-8')))])
+
+    def clear(self, phase: Optional[str] = None):
+        """Remove cached outputs (all phases, or only the given one)"""
+        if phase is None:
+            self._delete_where()
+        else:
+            self._delete_where("phase = ?", (phase,))
+
+
+def get_phase_cache() -> Optional[PhaseCache]:
+    """Get or create the global phase cache (None when disabled in config)"""
+    if not config.PHASE_CACHE_ENABLED:
+        return None
+    return PhaseCache.shared()
@@ -0,0 +1,135 @@
+"""
+Query Cache - In-memory LRU + TTL cache for vector search queries
+Holds query embeddings and search results so agents repeating a query skip both network round-trips
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from config import config
+
+
+class TTLCache:
+    """
+    Thread-safe least-recently-used cache whose entries expire after ttl seconds
+
+    Lookups refresh recency but not age, so an entry is never served more than
+    ttl seconds after it was stored.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of entries before the least recently used is evicted
+            ttl: Seconds an entry stays valid after being stored
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self.entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a value, evicting the least recently used entries beyond max_entries"""
+        with self.lock:
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def clear(self):
+        """Remove every entry"""
+        with self.lock:
+            self.entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self.lock:
+            return {**self.stats, 'entries': len(self.entries), 'max_entries': self.max_entries, 'ttl': self.ttl}
+
+
+class QueryCache:
+    """
+    Caches for query embeddings and search results
+
+    Result keys include the index version, so any upsert or clear (which bumps
+    the version) makes earlier results unreachable without an explicit purge;
+    stale entries simply age out of the LRU.
+    """
+
+    _WHITESPACE = re.compile(r'\s+')
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        max_entries = max_entries if max_entries is not None else config.QUERY_CACHE_MAX_ENTRIES
+        ttl = ttl if ttl is not None else config.QUERY_CACHE_TTL_SECONDS
+        self.embeddings = TTLCache(max_entries, ttl)
+        self.results = TTLCache(max_entries, ttl)
+
+    @classmethod
+    def normalize(cls, query: str) -> str:
+        """
+        Collapse whitespace so trivially different queries share an entry
+
+        Case is kept: embeddings are case-sensitive ("US" is not "us"), and
+        results are derived from the embedding.
+        """
+        return cls._WHITESPACE.sub(' ', query).strip()
+
+    def get_embedding(self, model: str, query: str):
+        return self.embeddings.get((model, self.normalize(query)))
+
+    def put_embedding(self, model: str, query: str, embedding):
+        if embedding:
+            self.embeddings.put((model, self.normalize(query)), embedding)
+
+    def get_results(self, index_key: tuple, version: int, query: str, limit: int):
+        return self.results.get((index_key, version, self.normalize(query), limit))
+
+    def put_results(self, index_key: tuple, version: int, query: str, limit: int, results):
+        self.results.put((index_key, version, self.normalize(query), limit), results)
+
+    def clear(self):
+        self.embeddings.clear()
+        self.results.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics for both caches"""
+        return {'embeddings': self.embeddings.get_stats(), 'results': self.results.get_stats()}
+
+
+# Global query cache instance
+_global_query_cache = None
+_global_query_cache_lock = threading.Lock()
+
+def get_query_cache() -> Optional[QueryCache]:
+    """Get or create the global query cache (None when disabled in config)"""
+    global _global_query_cache
+    if not config.QUERY_CACHE_ENABLED:
+        return None
+    with _global_query_cache_lock:
+        if _global_query_cache is None:
+            _global_query_cache = QueryCache()
+    return _global_query_cache
@@ -0,0 +1,255 @@
+"""
+Semantic Chunker - Streaming, token-aware text chunking that respects document structure
+Shared by vector ingestion (VectorStore) and LLM batching (TokenBatchManager)
+"""
+
+import re
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from config import config
+
+
+# Part of every vector ID; bump whenever chunk boundaries change so re-ingestion
+# never mistakes a differently chunked document for one that is already indexed
+CHUNKER_VERSION = "sc2"
+
+
+class Chunk(NamedTuple):
+    """A chunk of source text; start/end are character offsets into the full source"""
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap default token estimate (~4 characters per token)"""
+    return (len(text) + 3) // 4 if text.strip() else 0
+
+
+class _SourceBuffer:
+    """
+    Sliding window over streamed text, addressed by absolute character offset
+
+    Appended pieces are kept in a list and only joined into the searchable text
+    up to their last newline, so a long run of pieces without line breaks costs
+    one join instead of a copy per piece. find and slice only see that text,
+    plus the tail once flush is called at the end of the source.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.base = 0
+        self.pending: List[str] = []
+        self.pending_len = 0
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.text) + self.pending_len
+
+    def append(self, piece: str):
+        cut = piece.rfind('\n') + 1
+        if cut:
+            self.pending.append(piece[:cut])
+            self.text += "".join(self.pending)
+            self.pending, self.pending_len = [], 0
+            piece = piece[cut:]
+        if piece:
+            self.pending.append(piece)
+            self.pending_len += len(piece)
+
+    def flush(self):
+        """Make the text after the last newline searchable"""
+        if self.pending:
+            self.text += "".join(self.pending)
+            self.pending, self.pending_len = [], 0
+
+    def find(self, sub: str, start: int) -> int:
+        index = self.text.find(sub, start - self.base)
+        return -1 if index == -1 else index + self.base
+
+    def slice(self, start: int, end: int) -> str:
+        return self.text[start - self.base:end - self.base]
+
+    def release(self, offset: int):
+        """Forget text before offset (compacted lazily to keep trimming amortized O(n))"""
+        drop = offset - self.base
+        if drop > 0 and drop * 2 >= len(self.text):
+            self.text = self.text[drop:]
+            self.base = offset
+
+
+class SemanticChunker:
+    """
+    Splits text into chunks of at most max_tokens along structural boundaries
+
+    The source is segmented into units (headings, table rows, sentences), which
+    are packed greedily into chunks. A chunk is closed early at a heading or at
+    the start/end of a table once it is reasonably full, and at a paragraph
+    break once it is nearly full, so chunks tend to hold whole sections. Tables
+    are only ever split between rows. Consecutive chunks within a section share
+    up to overlap_tokens of trailing sentences.
+
+    Chunks are contiguous slices of the source and are yielded lazily, so the
+    input may be a string or an iterable of text pieces (e.g. pages) that is
+    never materialized in full.
+    """
+
+    _HEADING = re.compile(r'^\s*(?:#{1,6}\s+\S|-{3}\s*\S.*-{3}\s*$|={3}\s*\S.*={3}\s*$)')
+    _TABLE_ROW = re.compile(r'^\s*\||\t|\S {2,}\S.*\S {2,}\S')
+    _SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+(?=[A-ZÀ-ÖØ-Þ0-9"\'(\[¿¡])')
+    MAX_STRUCTURAL_LINE = 2000
+
+    def __init__(self,
+                 max_tokens: Optional[int] = None,
+                 overlap_tokens: Optional[int] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        Initialize the chunker
+
+        Args:
+            max_tokens: Token budget per chunk (default: config.CHUNK_MAX_TOKENS)
+            overlap_tokens: Tokens of trailing context repeated in the next chunk (default: config.CHUNK_OVERLAP_TOKENS)
+            count_tokens: Token counter applied to each unit (default: ~4 characters per token)
+        """
+        self.max_tokens = max(1, max_tokens or config.CHUNK_MAX_TOKENS)
+        self.overlap_tokens = config.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+        self.overlap_tokens = min(self.overlap_tokens, self.max_tokens // 2)
+        self.count_tokens = count_tokens or estimate_tokens
+        # Fill levels at which a structural boundary closes the current chunk
+        self.section_min_tokens = self.max_tokens // 4
+        self.paragraph_min_tokens = self.max_tokens * 3 // 4
+
+    def split(self, source: Union[str, Iterable[str]]) -> List[str]:
+        """Chunk source and return the chunk texts"""
+        return [chunk.text for chunk in self.chunks(source)]
+
+    def chunks(self, source: Union[str, Iterable[str]]) -> Iterator[Chunk]:
+        """Lazily yield chunks of source"""
+        buffer = _SourceBuffer()
+        units: List[tuple] = []
+        unit_tokens = 0
+        last_kind = None
+
+        for start, end, kind, tokens in self._iter_units(source, buffer):
+            if kind == 'break':
+                if units and unit_tokens >= self.paragraph_min_tokens:
+                    yield self._make_chunk(buffer, units, unit_tokens)
+                    units, unit_tokens = [], 0
+                last_kind = kind
+                continue
+
+            entering_table = kind == 'row' and last_kind != 'row'
+            leaving_table = kind != 'row' and last_kind == 'row'
+            structural = kind == 'heading' or entering_table or leaving_table
+            if units and (unit_tokens + tokens > self.max_tokens
+                          or (structural and unit_tokens >= self.section_min_tokens)):
+                yield self._make_chunk(buffer, units, unit_tokens)
+                units, unit_tokens = ([], 0) if structural else self._overlap(units, tokens)
+
+            buffer.release(units[0][0] if units else start)
+            units.append((start, end, tokens))
+            unit_tokens += tokens
+            last_kind = kind
+
+        if units:
+            yield self._make_chunk(buffer, units, unit_tokens)
+
+    def _overlap(self, units: List[tuple], next_tokens: int) -> tuple:
+        """Trailing units of the closed chunk to repeat at the start of the next one"""
+        carried, total = [], 0
+        for unit in reversed(units):
+            tokens = unit[2]
+            if total + tokens > self.overlap_tokens or total + tokens + next_tokens > self.max_tokens:
+                break
+            carried.append(unit)
+            total += tokens
+        carried.reverse()
+        return carried, total
+
+    def _make_chunk(self, buffer: _SourceBuffer, units: List[tuple], tokens: int) -> Chunk:
+        start, end = units[0][0], units[-1][1]
+        raw = buffer.slice(start, end)
+        text = raw.strip()
+        if text:
+            start += len(raw) - len(raw.lstrip())
+        return Chunk(text, start, start + len(text), tokens)
+
+    # ------------------------------------------------------------------
+    # Segmentation
+    # ------------------------------------------------------------------
+
+    def _iter_units(self, source: Union[str, Iterable[str]], buffer: _SourceBuffer) -> Iterator[tuple]:
+        """Yield (start, end, kind, tokens) units covering the source in order"""
+        pieces = [source] if isinstance(source, str) else source
+        position = 0
+        paragraph = [None, None]  # start, end of the pending run of prose lines
+
+        for piece in pieces:
+            if not piece:
+                continue
+            buffer.append(piece)
+            while True:
+                newline = buffer.find('\n', position)
+                if newline == -1:
+                    break
+                yield from self._line_units(buffer, position, newline + 1, paragraph)
+                position = newline + 1
+
+        buffer.flush()
+        if position < buffer.end:
+            yield from self._line_units(buffer, position, buffer.end, paragraph)
+        yield from self._paragraph_units(buffer, paragraph)
+
+    def _line_units(self, buffer: _SourceBuffer, start: int, end: int, paragraph: list) -> Iterator[tuple]:
+        # Headings and table rows are short; long lines (e.g. whitespace-collapsed text) are prose
+        line = buffer.slice(start, end) if end - start <= self.MAX_STRUCTURAL_LINE else None
+        if line is not None and not line.strip():
+            kind = 'break'
+        elif line is not None and self._HEADING.match(line):
+            kind = 'heading'
+        elif line is not None and self._TABLE_ROW.search(line):
+            kind = 'row'
+        else:
+            # Prose lines accumulate until the paragraph ends, since sentences wrap across lines
+            if paragraph[0] is None:
+                paragraph[0] = start
+            paragraph[1] = end
+            return
+
+        yield from self._paragraph_units(buffer, paragraph)
+        yield from self._sized_units(line, start, kind)
+
+    def _paragraph_units(self, buffer: _SourceBuffer, paragraph: list) -> Iterator[tuple]:
+        """Split the pending paragraph into sentence units"""
+        start, end = paragraph
+        if start is None:
+            return
+        paragraph[0] = paragraph[1] = None
+        text = buffer.slice(start, end)
+        sentence_start = 0
+        for match in self._SENTENCE_END.finditer(text):
+            yield from self._sized_units(text[sentence_start:match.end()], start + sentence_start, 'sentence')
+            sentence_start = match.end()
+        if sentence_start < len(text):
+            yield from self._sized_units(text[sentence_start:], start + sentence_start, 'sentence')
+
+    def _sized_units(self, text: str, start: int, kind: str) -> Iterator[tuple]:
+        """Yield text as one unit, or as whitespace-aligned pieces if it exceeds max_tokens"""
+        tokens = self.count_tokens(text)
+        if tokens <= self.max_tokens or len(text) < 2:
+            yield (start, start + len(text), kind, tokens)
+            return
+
+        pieces = -(-tokens // self.max_tokens)
+        target = max(1, len(text) // pieces)
+        offset = 0
+        while offset < len(text):
+            cut = min(len(text), offset + target)
+            if cut < len(text):
+                # Back up to the nearest whitespace so words stay whole
+                space = text.rfind(' ', offset + target // 2, cut)
+                if space != -1:
+                    cut = space + 1
+            yield from self._sized_units(text[offset:cut], start + offset, kind)
+            offset = cut
@@ -4,6 +4,8 @@ from datetime import datetime
 
 import streamlit as st
 
+from utils.state_backend import session_state
+
 
 class SessionManager:
     """Manages session state and workflow progress"""
@@ -11,8 +13,8 @@ class SessionManager:
     @staticmethod
     def init_session():
         """Initialize session state variables"""
-        if 'workflow_state' not in st.session_state:
-            st.session_state.workflow_state = {
+        if 'workflow_state' not in session_state:
+            session_state.workflow_state = {
                 'current_phase': 'setup',
                 'completed_phases': [],
                 'phase_outputs': {},
@@ -20,30 +22,30 @@ class SessionManager:
                 'workflow_id': f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             }
         
-        if 'agent_progress' not in st.session_state:
-            st.session_state.agent_progress = {}
+        if 'agent_progress' not in session_state:
+            session_state.agent_progress = {}
         
-        if 'logs' not in st.session_state:
-            st.session_state.logs = []
+        if 'logs' not in session_state:
+            session_state.logs = []
         
         # Initialize agent communications storage
-        if 'agent_communications' not in st.session_state:
-            st.session_state.agent_communications = []
+        if 'agent_communications' not in session_state:
+            session_state.agent_communications = []
         
         # Initialize agent communication logger
-        if 'agent_comm_logger' not in st.session_state:
+        if 'agent_comm_logger' not in session_state:
             try:
                 from utils.agent_communication_logger import AgentCommunicationLogger
-                st.session_state.agent_comm_logger = AgentCommunicationLogger()
+                session_state.agent_comm_logger = AgentCommunicationLogger()
             except ImportError:
-                st.session_state.agent_comm_logger = None
+                session_state.agent_comm_logger = None
     
     @staticmethod
     def update_phase(phase: str, status: str = 'in_progress'):
         """Update current workflow phase"""
-        st.session_state.workflow_state['current_phase'] = phase
-        if status == 'completed' and phase not in st.session_state.workflow_state['completed_phases']:
-            st.session_state.workflow_state['completed_phases'].append(phase)
+        session_state.workflow_state['current_phase'] = phase
+        if status == 'completed' and phase not in session_state.workflow_state['completed_phases']:
+            session_state.workflow_state['completed_phases'].append(phase)
             
             # Check if all phases are completed
             SessionManager.check_workflow_completion()
@@ -56,13 +58,13 @@ class SessionManager:
             'creation', 'implementation', 'simulation', 'evaluation', 'report'
         ]
         
-        completed_phases = st.session_state.workflow_state.get('completed_phases', [])
+        completed_phases = session_state.workflow_state.get('completed_phases', [])
         
         # Check if all required phases are completed
         if all(phase in completed_phases for phase in required_phases):
-            if not st.session_state.workflow_state.get('workflow_completed', False):
-                st.session_state.workflow_state['workflow_completed'] = True
-                st.session_state.workflow_state['workflow_completion_time'] = datetime.now().isoformat()
+            if not session_state.workflow_state.get('workflow_completed', False):
+                session_state.workflow_state['workflow_completed'] = True
+                session_state.workflow_state['workflow_completion_time'] = datetime.now().isoformat()
                 SessionManager.add_log("INFO", "Complete DECIDE workflow execution finished successfully")
     
     @staticmethod
@@ -78,14 +80,14 @@ class SessionManager:
             else:
                 serializable_output = str(output)
             
-            st.session_state.workflow_state['phase_outputs'][phase] = {
+            session_state.workflow_state['phase_outputs'][phase] = {
                 'output': serializable_output,
                 'timestamp': datetime.now().isoformat()
             }
         except Exception as e:
             st.error(f"Error serializing phase output: {str(e)}")
             # Fallback to string representation
-            st.session_state.workflow_state['phase_outputs'][phase] = {
+            session_state.workflow_state['phase_outputs'][phase] = {
                 'output': str(output),
                 'timestamp': datetime.now().isoformat(),
                 'serialization_error': str(e)
@@ -94,12 +96,12 @@ class SessionManager:
     @staticmethod
     def get_phase_output(phase: str) -> Optional[Dict[str, Any]]:
         """Get output from a specific phase"""
-        return st.session_state.workflow_state['phase_outputs'].get(phase)
+        return session_state.workflow_state['phase_outputs'].get(phase)
     
     @staticmethod
     def update_agent_progress(agent_name: str, progress: float, status: str, message: str = ""):
         """Update individual agent progress"""
-        st.session_state.agent_progress[agent_name] = {
+        session_state.agent_progress[agent_name] = {
             'progress': progress,
             'status': status,
             'message': message,
@@ -115,30 +117,30 @@ class SessionManager:
             'message': message,
             'agent': agent
         }
-        st.session_state.logs.append(log_entry)
+        session_state.logs.append(log_entry)
         
         # Keep only last 1000 logs
-        if len(st.session_state.logs) > 1000:
-            st.session_state.logs = st.session_state.logs[-1000:]
+        if len(session_state.logs) > 1000:
+            del session_state.logs[:-1000]
     
     @staticmethod
     def get_agent_comm_logger():
         """Get the agent communication logger instance"""
-        return st.session_state.get('agent_comm_logger')
+        return session_state.get('agent_comm_logger')
     
     @staticmethod
     def add_agent_communication(source: str, message: str, comm_type: str = "general", phase: str = None):
         """Add agent communication entry"""
         communication = {
             'timestamp': datetime.now().isoformat(),
-            'phase': phase or st.session_state.workflow_state.get('current_phase'),
+            'phase': phase or session_state.workflow_state.get('current_phase'),
             'source': source,
             'message': message,
             'type': comm_type,
-            'id': len(st.session_state.agent_communications) + 1
+            'id': len(session_state.agent_communications) + 1
         }
         
-        st.session_state.agent_communications.append(communication)
+        session_state.agent_communications.append(communication)
         
         # Also use the logger if available
         logger = SessionManager.get_agent_comm_logger()
@@ -148,7 +150,7 @@ class SessionManager:
     @staticmethod
     def get_agent_communications() -> list:
         """Get all agent communications"""
-        return st.session_state.get('agent_communications', [])
+        return session_state.get('agent_communications', [])
     
     @staticmethod
     def get_agent_communications_by_phase(phase_name: str) -> list:
@@ -159,7 +161,7 @@ class SessionManager:
     @staticmethod
     def clear_agent_communications():
         """Clear all agent communications"""
-        st.session_state.agent_communications = []
+        session_state.agent_communications = []
         logger = SessionManager.get_agent_comm_logger()
         if logger:
             logger.clear_communications()
@@ -191,20 +193,20 @@ class SessionManager:
     def get_workflow_summary() -> Dict[str, Any]:
         """Get complete workflow state summary"""
         return {
-            'workflow_id': st.session_state.workflow_state['workflow_id'],
-            'current_phase': st.session_state.workflow_state['current_phase'],
-            'completed_phases': st.session_state.workflow_state['completed_phases'],
-            'total_documents': len(st.session_state.workflow_state['documents']),
-            'agent_progress': st.session_state.agent_progress,
-            'workflow_completed': st.session_state.workflow_state.get('workflow_completed', False),
-            'workflow_completion_time': st.session_state.workflow_state.get('workflow_completion_time'),
+            'workflow_id': session_state.workflow_state['workflow_id'],
+            'current_phase': session_state.workflow_state['current_phase'],
+            'completed_phases': session_state.workflow_state['completed_phases'],
+            'total_documents': len(session_state.workflow_state['documents']),
+            'agent_progress': session_state.agent_progress,
+            'workflow_completed': session_state.workflow_state.get('workflow_completed', False),
+            'workflow_completion_time': session_state.workflow_state.get('workflow_completion_time'),
             'last_updated': datetime.now().isoformat()
         }
     
     @staticmethod
     def is_workflow_completed() -> bool:
         """Check if the workflow is completed"""
-        return st.session_state.workflow_state.get('workflow_completed', False)
+        return session_state.workflow_state.get('workflow_completed', False)
     
     @staticmethod
     def reset_workflow():
@@ -216,19 +218,19 @@ class SessionManager:
         except ImportError:
             pass  # VectorStore not available
         
-        if 'workflow_state' in st.session_state:
-            del st.session_state.workflow_state
-        if 'agent_progress' in st.session_state:
-            del st.session_state.agent_progress
-        if 'logs' in st.session_state:
-            del st.session_state.logs
-        if 'agent_communications' in st.session_state:
-            del st.session_state.agent_communications
-        if 'agent_comm_logger' in st.session_state:
-            del st.session_state.agent_comm_logger
+        if 'workflow_state' in session_state:
+            del session_state.workflow_state
+        if 'agent_progress' in session_state:
+            del session_state.agent_progress
+        if 'logs' in session_state:
+            del session_state.logs
+        if 'agent_communications' in session_state:
+            del session_state.agent_communications
+        if 'agent_comm_logger' in session_state:
+            del session_state.agent_comm_logger
         
         # Also clear workflow instance to force fresh initialization
-        if 'workflow_instance' in st.session_state:
-            del st.session_state.workflow_instance
+        if 'workflow_instance' in session_state:
+            del session_state.workflow_instance
         
         SessionManager.init_session()
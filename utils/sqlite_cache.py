@@ -0,0 +1,169 @@
+"""
+SQLite Cache - Shared base of the persistent on-disk caches
+One SQLite table per cache of (key, payload, size, last_used) rows with least-recently-used eviction
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class SQLiteLRUCache:
+    """
+    Size-bounded key/blob store in SQLite with least-recently-used eviction
+
+    Subclasses declare their table: TABLE, the payload column name and any
+    extra columns stored with each row, plus the default file name. They build
+    their own keys and payload encoding on top of _fetch and _store.
+
+    The stored size is tracked as a running total instead of being summed on
+    every write. Other processes (e.g. forked parse workers) write to the same
+    file, so the total is only an estimate; it is recounted exactly whenever it
+    crosses max_bytes, and entries are evicted only if the exact total does too.
+    """
+
+    TABLE = ""
+    PAYLOAD_COLUMN = "payload"
+    # Column definitions stored between key and payload, e.g. ("phase TEXT NOT NULL",)
+    EXTRA_COLUMNS: Tuple[str, ...] = ()
+    DEFAULT_FILENAME = ""
+
+    def __init__(self, path: Optional[str], max_bytes: int, data_dir: str):
+        """
+        Open (creating if needed) the cache table
+
+        Args:
+            path: SQLite file path (default: <data_dir>/<DEFAULT_FILENAME>)
+            max_bytes: Size bound for stored payloads; oldest entries are evicted beyond it
+            data_dir: Directory of the default path
+        """
+        self.path = path or os.path.join(data_dir, self.DEFAULT_FILENAME)
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self.lock = threading.Lock()
+        # Other processes share the file; wait on their locks instead of failing
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = ["key TEXT PRIMARY KEY", *self.EXTRA_COLUMNS,
+                   f"{self.PAYLOAD_COLUMN} BLOB NOT NULL", "size INTEGER NOT NULL", "last_used REAL NOT NULL"]
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({', '.join(columns)})")
+        self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.TABLE}_last_used ON {self.TABLE}(last_used)")
+        self.conn.commit()
+
+        self.size_bytes = self._count_size_locked()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def _fetch(self, keys: Sequence[str]) -> Dict[str, bytes]:
+        """Payloads of the stored keys (missing keys are absent), marking them as used"""
+        found = {}
+        with self.lock:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 500):
+                part = list(keys[start:start + 500])
+                placeholders = ",".join("?" * len(part))
+                found.update(self.conn.execute(
+                    f"SELECT key, {self.PAYLOAD_COLUMN} FROM {self.TABLE} WHERE key IN ({placeholders})", part
+                ).fetchall())
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    f"UPDATE {self.TABLE} SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self.conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.stats['hits'] += hits
+            self.stats['misses'] += len(keys) - hits
+        return found
+
+    def _store(self, rows: List[tuple]):
+        """
+        Insert or replace rows of (key, *extra column values, payload) and enforce the size bound
+
+        Payloads larger than the whole bound are skipped.
+        """
+        now = time.time()
+        rows = [(*row, len(row[-1]), now) for row in rows if len(row[-1]) <= self.max_bytes]
+        if not rows:
+            return
+        columns = ["key", *(column.split()[0] for column in self.EXTRA_COLUMNS),
+                   self.PAYLOAD_COLUMN, "size", "last_used"]
+        with self.lock:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(columns)})"
+                f" VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+            # Replaced rows are counted twice; that only triggers an earlier recount
+            self.size_bytes += sum(row[-2] for row in rows)
+            if self.size_bytes > self.max_bytes:
+                self._evict_locked()
+            self.conn.commit()
+
+    def _count_size_locked(self) -> int:
+        return self.conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+
+    def _evict_locked(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        total = self._count_size_locked()
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            freed = 0
+            victims = []
+            for key, size in self.conn.execute(f"SELECT key, size FROM {self.TABLE} ORDER BY last_used ASC"):
+                victims.append((key,))
+                freed += size
+                if freed >= excess:
+                    break
+            self.conn.executemany(f"DELETE FROM {self.TABLE} WHERE key = ?", victims)
+            self.stats['evictions'] += len(victims)
+            total -= freed
+        self.size_bytes = total
+
+    def _delete_where(self, condition: str = "", params: tuple = ()):
+        with self.lock:
+            self.conn.execute(f"DELETE FROM {self.TABLE}" + (f" WHERE {condition}" if condition else ""), params)
+            self.conn.commit()
+            self.size_bytes = self._count_size_locked()
+
+    def clear(self):
+        """Remove every cached entry"""
+        self._delete_where()
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        with self.lock:
+            entries, size = self.conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.TABLE}"
+            ).fetchone()
+        return {**self.stats, 'entries': entries, 'size_bytes': size, 'max_bytes': self.max_bytes}
+
+    @classmethod
+    def shared(cls) -> "SQLiteLRUCache":
+        """Get or create the process-wide instance of this cache"""
+        with _shared_caches_lock:
+            cache = _shared_caches.get(cls)
+            if cache is None:
+                cache = _shared_caches[cls] = cls()
+        return cache
+
+
+# Process-wide cache instances, one per cache class
+_shared_caches: Dict[type, SQLiteLRUCache] = {}
+_shared_caches_lock = threading.Lock()
+_inherited_caches: List[SQLiteLRUCache] = []
+
+def _reset_after_fork():
+    """Give forked children (e.g. parse workers) their own caches instead of the parent's connections"""
+    global _shared_caches_lock
+    # Keep the inherited instances referenced: closing their connections in the
+    # child could checkpoint or drop the WAL that the parent is still using
+    _inherited_caches.extend(_shared_caches.values())
+    _shared_caches.clear()
+    _shared_caches_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
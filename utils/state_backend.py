@@ -0,0 +1,109 @@
+"""
+State Backend - Where workflow session state lives
+Streamlit's st.session_state inside the app, or a plain in-memory dict for headless runs (CLI, batch workers)
+"""
+
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+
+class DictState(dict):
+    """
+    In-memory session state with st.session_state's access style
+
+    Supports both item access (state['key']) and attribute access
+    (state.key), and raises AttributeError for missing attributes, so code
+    written against st.session_state runs unchanged without Streamlit.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any):
+        self[name] = value
+
+    def __delattr__(self, name: str):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+# Active backend for this process; None means st.session_state
+_state_backend: Optional[MutableMapping] = None
+_state_backend_lock = threading.Lock()
+
+
+def set_state_backend(state: Optional[MutableMapping]):
+    """
+    Select the session state used by the workflow, SessionManager and tools
+
+    The backend is process-wide, so the workflow's phase worker threads see the
+    same state as the thread that started the run.
+
+    Args:
+        state: A DictState (or any mapping with attribute access), or None for st.session_state
+    """
+    global _state_backend
+    with _state_backend_lock:
+        _state_backend = state
+
+
+def get_state_backend() -> MutableMapping:
+    """Get the active session state (st.session_state unless a backend was set)"""
+    state = _state_backend
+    if state is not None:
+        return state
+    import streamlit as st
+    return st.session_state
+
+
+@contextmanager
+def use_state_backend(state: MutableMapping) -> Iterator[MutableMapping]:
+    """Run a block against the given session state, restoring the previous backend afterwards"""
+    previous = _state_backend
+    set_state_backend(state)
+    try:
+        yield state
+    finally:
+        set_state_backend(previous)
+
+
+class _SessionStateProxy(MutableMapping):
+    """Forwards item and attribute access to the active backend"""
+
+    def __getitem__(self, key: str) -> Any:
+        return get_state_backend()[key]
+
+    def __setitem__(self, key: str, value: Any):
+        get_state_backend()[key] = value
+
+    def __delitem__(self, key: str):
+        del get_state_backend()[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in get_state_backend()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(get_state_backend().keys()))
+
+    def __len__(self) -> int:
+        return len(get_state_backend())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_state_backend(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(get_state_backend(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(get_state_backend(), name)
+
+
+# Drop-in replacement for st.session_state in modules that also run headless
+session_state = _SessionStateProxy()
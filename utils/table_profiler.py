@@ -0,0 +1,238 @@
+"""
+Table Profiler - Streaming, memory-bounded summaries of CSV and Excel data
+Computes running column statistics chunk by chunk instead of loading whole tables
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnProfile:
+    """
+    Running statistics for one column
+
+    Counts, mean/std (merged per chunk with Chan's parallel update), min and
+    max are exact. Quantiles come from a fixed-size uniform reservoir sample and
+    category frequencies from a pruned counter, so memory per column is bounded
+    regardless of row count.
+    """
+
+    SAMPLE_SIZE = 10000
+    CATEGORY_CAPACITY = 1000
+
+    def __init__(self, name: str, rng: np.random.Generator):
+        self.name = name
+        self.rng = rng
+        self.dtype: Optional[str] = None
+        self.count = 0
+        self.nulls = 0
+        self.numeric_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sample = np.empty(0)
+        self.sample_keys = np.empty(0)
+        self.categories: Dict[Any, int] = {}
+
+    def update(self, series: pd.Series):
+        self.dtype = self._merge_dtype(self.dtype, series.dtype)
+        non_null = series.dropna()
+        self.count += len(series)
+        self.nulls += len(series) - len(non_null)
+        if non_null.empty:
+            return
+
+        if pd.api.types.is_numeric_dtype(non_null) and not pd.api.types.is_bool_dtype(non_null):
+            self._update_numeric(non_null.to_numpy(dtype=float))
+        else:
+            self._update_categories(non_null.astype(str))
+
+    def _update_numeric(self, values: np.ndarray):
+        n = len(values)
+        chunk_mean = values.mean()
+        chunk_m2 = ((values - chunk_mean) ** 2).sum()
+        total = self.numeric_count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta ** 2 * self.numeric_count * n / total
+        self.numeric_count = total
+
+        chunk_min, chunk_max = values.min(), values.max()
+        self.min = chunk_min if self.min is None else min(self.min, chunk_min)
+        self.max = chunk_max if self.max is None else max(self.max, chunk_max)
+
+        # Keep the SAMPLE_SIZE values with the smallest random keys: a uniform sample of everything seen
+        keys = self.rng.random(n)
+        self.sample = np.concatenate([self.sample, values])
+        self.sample_keys = np.concatenate([self.sample_keys, keys])
+        if len(self.sample) > self.SAMPLE_SIZE:
+            keep = np.argpartition(self.sample_keys, self.SAMPLE_SIZE)[:self.SAMPLE_SIZE]
+            self.sample = self.sample[keep]
+            self.sample_keys = self.sample_keys[keep]
+
+    def _update_categories(self, values: pd.Series):
+        for value, count in values.value_counts().items():
+            self.categories[value] = self.categories.get(value, 0) + count
+        if len(self.categories) > self.CATEGORY_CAPACITY:
+            # Prune to the most frequent half; counts for rare values become approximate
+            top = sorted(self.categories.items(), key=lambda item: item[1], reverse=True)
+            self.categories = dict(top[:self.CATEGORY_CAPACITY // 2])
+
+    @staticmethod
+    def _merge_dtype(current: Optional[str], new) -> str:
+        new = str(new)
+        if current is None or current == new:
+            return new
+        numeric = ('int', 'float', 'uint')
+        if current.startswith(numeric) and new.startswith(numeric):
+            return 'float64'
+        return 'object'
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.numeric_count > 0
+
+    def numeric_summary(self) -> Dict[str, float]:
+        """describe()-style statistics; quantiles are approximate beyond SAMPLE_SIZE values"""
+        q25, q50, q75 = np.quantile(self.sample, [0.25, 0.5, 0.75])
+        std = (self.m2 / (self.numeric_count - 1)) ** 0.5 if self.numeric_count > 1 else float('nan')
+        return {
+            'count': float(self.numeric_count), 'mean': self.mean, 'std': std, 'min': self.min,
+            '25%': q25, '50%': q50, '75%': q75, 'max': self.max
+        }
+
+    def top_categories(self, limit: int = 5) -> List[tuple]:
+        return sorted(self.categories.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class TableProfiler:
+    """Profiles a table fed as a stream of DataFrame chunks"""
+
+    def __init__(self, sample_rows: int = 5, seed: int = 0):
+        """
+        Initialize the profiler
+
+        Args:
+            sample_rows: Number of leading rows kept for the sample preview
+            seed: Seed for the quantile reservoir sampling (keeps summaries reproducible)
+        """
+        self.sample_rows = sample_rows
+        self.rng = np.random.default_rng(seed)
+        self.rows = 0
+        self.columns: Dict[str, ColumnProfile] = {}
+        self.head: Optional[pd.DataFrame] = None
+
+    def update(self, chunk: pd.DataFrame):
+        """Fold one chunk of rows into the running statistics"""
+        if self.head is None:
+            self.head = chunk.head(self.sample_rows)
+        elif len(self.head) < self.sample_rows:
+            self.head = pd.concat([self.head, chunk.head(self.sample_rows - len(self.head))])
+        self.rows += len(chunk)
+        for name in chunk.columns:
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = ColumnProfile(str(name), self.rng)
+            column.update(chunk[name])
+
+    def consume(self, chunks: Iterable[pd.DataFrame]) -> "TableProfiler":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    @property
+    def column_names(self) -> List[str]:
+        return [str(name) for name in self.columns]
+
+    def head_text(self, rows: Optional[int] = None) -> str:
+        if self.head is None or self.head.empty:
+            return ""
+        return self.head.head(rows or self.sample_rows).to_string()
+
+    def dtypes_text(self) -> str:
+        return pd.Series({name: column.dtype for name, column in self.columns.items()}, dtype=object).to_string()
+
+    def numeric_text(self) -> str:
+        summaries = {name: column.numeric_summary() for name, column in self.columns.items() if column.is_numeric}
+        return pd.DataFrame(summaries).to_string() if summaries else ""
+
+    def nulls_text(self) -> str:
+        nulls = {name: column.nulls for name, column in self.columns.items() if column.nulls}
+        return pd.Series(nulls, dtype=int).to_string() if nulls else ""
+
+    def categories_text(self, limit: int = 5) -> str:
+        lines = []
+        for name, column in self.columns.items():
+            top = column.top_categories(limit)
+            if top:
+                lines.append(f"{name}: " + ", ".join(f"{value} ({count})" for value, count in top))
+        return "\n".join(lines)
+
+
+def iter_excel_sheets(file, chunk_rows: int) -> Iterator[tuple]:
+    """
+    Yield (sheet_name, chunk_iterator) for each sheet, opening the workbook once
+
+    .xlsx files are streamed row by row with openpyxl's read-only mode; other
+    formats fall back to one pandas read per sheet of the single open workbook.
+    """
+    try:
+        from openpyxl import load_workbook
+        file.seek(0)
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception:
+        workbook = None
+
+    if workbook is None:
+        file.seek(0)
+        excel_file = pd.ExcelFile(file)
+        for sheet_name in excel_file.sheet_names:
+            yield sheet_name, iter([excel_file.parse(sheet_name)])
+        return
+
+    try:
+        for sheet in workbook.worksheets:
+            yield sheet.title, _iter_sheet_chunks(sheet, chunk_rows)
+    finally:
+        workbook.close()
+
+
+def _iter_sheet_chunks(sheet, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    rows = sheet.iter_rows(values_only=True)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = []
+    for i, value in enumerate(header):
+        name = str(value) if value is not None else f"Unnamed: {i}"
+        # Mangle duplicate headers the way pandas does ("a", "a.1", ...)
+        base, suffix = name, 1
+        while name in columns:
+            name = f"{base}.{suffix}"
+            suffix += 1
+        columns.append(name)
+    width = len(columns)
+    batch = []
+    for row in rows:
+        row = tuple(row[:width]) + (None,) * (width - len(row))
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            yield _typed_frame(batch, columns)
+            batch = []
+    if batch:
+        yield _typed_frame(batch, columns)
+
+
+def _typed_frame(rows: List[tuple], columns: List[str]) -> pd.DataFrame:
+    """Build a DataFrame from raw cell values, converting columns that are entirely numeric"""
+    frame = pd.DataFrame(rows, columns=columns)
+    for name in frame.columns:
+        column = frame[name]
+        if column.dtype == object:
+            converted = pd.to_numeric(column, errors='coerce')
+            if converted.notna().sum() == column.notna().sum():
+                frame[name] = converted
+    return frame
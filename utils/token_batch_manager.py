@@ -1,24 +1,227 @@
 """
 Token Batch Manager - Intelligent document chunking and batching for OpenAI API rate limits
 Handles document processing, token estimation, and batch creation for optimal API usage
+
+Run `python -m utils.token_batch_manager` for a bin-packing benchmark against the previous packer.
 """
 
+import os
 import time
+import threading
+import multiprocessing
 import streamlit as st
-from typing import Dict, List, Any, Tuple, Optional, Set
+from typing import Dict, List, Any, Tuple, Optional, Callable
 from datetime import datetime
 import concurrent.futures
-import re
-from functools import lru_cache
-import threading
+from concurrent.futures.process import BrokenProcessPool
+import random
+from bisect import bisect_left, insort
+
+from utils.semantic_chunker import SemanticChunker
+from utils.token_counter import get_token_counter
+
+
+def count_tokens(text: str) -> int:
+    """Token count from the process-wide token counter (0 for blank text)"""
+    if not text or not text.strip():
+        return 0
+    return get_token_counter().count(text)
+
+
+def chunk_spans(content: str, max_tokens: int) -> Tuple[int, Optional[List[Tuple[int, int, int]]]]:
+    """
+    Token-count and split document text into compact chunk descriptors
+    
+    Runs in chunking worker processes, so it takes and returns only plain data.
+    
+    Args:
+        content: Document text
+        max_tokens: Token budget per chunk
+        
+    Returns:
+        (total_tokens, spans): spans is None when the document fits in one
+        request, else a list of (start, end, tokens) character offsets into content
+    """
+    total_tokens = count_tokens(content)
+    if total_tokens <= max_tokens:
+        return total_tokens, None
+    # Split along sentence, heading and table boundaries within the request budget
+    chunker = SemanticChunker(max_tokens=max_tokens, overlap_tokens=0, count_tokens=count_tokens)
+    return total_tokens, [(chunk.start, chunk.end, chunk.tokens) for chunk in chunker.chunks(content)]
+
+
+def document_key(doc: Dict[str, Any]) -> Any:
+    """Identity of a source document: its id, else its content hash, else its filename (None if none)"""
+    return doc.get('id') or doc.get('file_hash') or doc.get('filename')
+
+
+class DocumentChunk:
+    """
+    Compact chunk record: a reference to the source document plus offsets
+    
+    Holds the document dict itself (not a copy) and the chunk's character
+    range, so building thousands of chunks copies neither metadata nor text;
+    content is sliced from the document only when read. Supports the
+    read-only dict access chunk dictionaries had (chunk['content'],
+    chunk.get('estimated_tokens'), ...), falling through to the document's own
+    metadata for other keys. to_dict() materializes the old dictionary form.
+    """
+    
+    __slots__ = ('doc', 'start', 'end', 'estimated_tokens', 'chunk_index', 'total_chunks')
+    
+    def __init__(self, doc: Dict[str, Any], start: int, end: int, estimated_tokens: int,
+                 chunk_index: int = 0, total_chunks: int = 1):
+        self.doc = doc
+        self.start = start
+        self.end = end
+        self.estimated_tokens = estimated_tokens
+        self.chunk_index = chunk_index
+        self.total_chunks = total_chunks
+    
+    @property
+    def content(self) -> str:
+        return self.doc.get('content', '')[self.start:self.end]
+    
+    @property
+    def chunk_id(self) -> str:
+        return f"{document_key(self.doc) or 'doc'}_{self.chunk_index}"
+    
+    @property
+    def original_doc_id(self) -> Any:
+        return document_key(self.doc) or 'unknown'
+    
+    _FIELDS = frozenset(('content', 'chunk_id', 'chunk_index', 'total_chunks',
+                         'estimated_tokens', 'original_doc_id'))
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELDS:
+            return getattr(self, key)
+        return self.doc[key]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._FIELDS:
+            return getattr(self, key)
+        return self.doc.get(key, default)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._FIELDS or key in self.doc
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """The chunk as a standalone dictionary (copies metadata and text)"""
+        return {**self.doc, **{key: getattr(self, key) for key in self._FIELDS}}
+    
+    def __repr__(self) -> str:
+        return (f"DocumentChunk({self.chunk_id!r}, start={self.start}, end={self.end}, "
+                f"tokens={self.estimated_tokens})")
+
+
+def best_fit_decreasing(sizes: List[int], capacity: int) -> List[List[int]]:
+    """
+    Best-fit-decreasing bin packing
+    
+    Items are placed largest first into the fullest bin that still has room.
+    Bins' remaining capacities are kept in a sorted list, so finding the best
+    bin is a binary search rather than a scan of every bin. Ties go to the
+    oldest bin, matching the previous linear scan.
+    
+    Args:
+        sizes: Item sizes (each at most capacity)
+        capacity: Bin capacity
+        
+    Returns:
+        Bins as lists of item indices
+    """
+    bins: List[List[int]] = []
+    free: List[Tuple[int, int]] = []  # (remaining capacity, bin index), ascending
+    for i in sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True):
+        size = sizes[i]
+        pos = bisect_left(free, (size, -1))
+        if pos == len(free):
+            bins.append([i])
+            insort(free, (capacity - size, len(bins) - 1))
+        else:
+            remaining, b = free.pop(pos)
+            bins[b].append(i)
+            insort(free, (remaining - size, b))
+    return bins
+
+
+def pack_groups_contiguous(groups: List[List[int]], sizes: List[int], capacity: int) -> List[List[int]]:
+    """
+    Bin packing that keeps each group's items together and in order
+    
+    Groups that fit in one bin are placed whole, largest first, by best fit.
+    Larger groups are laid out in order across consecutive new bins, and the
+    space left in their last bin is offered to the groups that follow.
+    
+    Args:
+        groups: Item indices per group, in the order they must stay in
+        sizes: Item sizes (each at most capacity)
+        capacity: Bin capacity
+        
+    Returns:
+        Bins as lists of item indices
+    """
+    totals = [sum(sizes[i] for i in group) for group in groups]
+    bins: List[List[int]] = []
+    free: List[Tuple[int, int]] = []
+    for g in sorted(range(len(groups)), key=lambda g: totals[g], reverse=True):
+        group, total = groups[g], totals[g]
+        if total <= capacity:
+            pos = bisect_left(free, (total, -1))
+            if pos == len(free):
+                bins.append(list(group))
+                insort(free, (capacity - total, len(bins) - 1))
+            else:
+                remaining, b = free.pop(pos)
+                bins[b].extend(group)
+                insort(free, (remaining - total, b))
+            continue
+        
+        # Spans several bins: next fit in order
+        current, used = [], 0
+        for i in group:
+            if current and used + sizes[i] > capacity:
+                bins.append(current)
+                current, used = [], 0
+            current.append(i)
+            used += sizes[i]
+        bins.append(current)
+        insort(free, (capacity - used, len(bins) - 1))
+    return bins
+
+
+def _legacy_best_fit(sizes: List[int], capacity: int) -> List[List[int]]:
+    """Previous O(n·b) best-fit scan from create_smart_batches, kept for benchmarking"""
+    bins: List[List[int]] = []
+    bin_tokens: List[int] = []
+    for i in sorted(range(len(sizes)), key=lambda i: sizes[i], reverse=True):
+        size = sizes[i]
+        best, min_remaining = -1, capacity + 1
+        for b, tokens in enumerate(bin_tokens):
+            remaining = capacity - tokens
+            if size <= remaining < min_remaining:
+                min_remaining, best = remaining, b
+        if best == -1:
+            bins.append([i])
+            bin_tokens.append(size)
+        else:
+            bins[best].append(i)
+            bin_tokens[best] += size
+    return bins
 
 
 class TokenBatchManager:
     """Manages document chunking and batching to respect OpenAI rate limits"""
     
+    # With tokenizer-exact counts the margin only has to cover response tokens
+    EXACT_SAFETY_MARGIN = 0.95
+    HEURISTIC_SAFETY_MARGIN = 0.85
+    CHUNK_MAX_WORKERS = 8
+    
     def __init__(self, 
                  tpm_limit: int = 200000,
-                 safety_margin: float = 0.85,  # Increased from 0.7 to 0.85
+                 safety_margin: Optional[float] = None,
                  max_tokens_per_request: int = 120000,  # Increased from 100000
                  min_chunk_size: int = 100,
                  max_chunk_size: int = 1000):
@@ -27,20 +230,23 @@ class TokenBatchManager:
         
         Args:
             tpm_limit: Tokens per minute limit for the API
-            safety_margin: Safety factor (0.0-1.0) to apply to limits - optimized to 0.85
+            safety_margin: Safety factor (0.0-1.0) to apply to limits; defaults to 0.95 with
+                exact tokenizer counts and 0.85 with heuristic estimates
             max_tokens_per_request: Maximum tokens per single API request
             min_chunk_size: Minimum words per chunk
             max_chunk_size: Maximum words per chunk
         """
+        self.token_counter = get_token_counter()
+        # Resolved on first use; checking the tokenizer here would load it at construction
+        self._safety_margin = safety_margin
         self.TPM_LIMIT = tpm_limit
-        self.SAFETY_MARGIN = safety_margin
-        self.MAX_TOKENS_PER_MIN = int(tpm_limit * safety_margin)
         self.MAX_TOKENS_PER_REQUEST = max_tokens_per_request
         self.MIN_CHUNK_SIZE = min_chunk_size
         self.MAX_CHUNK_SIZE = max_chunk_size
         
-        # Token usage tracking
+        # Token usage tracking; concurrently running workflow phases record usage
         self.token_usage_history = []
+        self.lock = threading.RLock()
         
         # Batch processing stats
         self.processing_stats = {
@@ -54,10 +260,23 @@ class TokenBatchManager:
             'end_time': None
         }
     
-    @lru_cache(maxsize=10000)
+    @property
+    def SAFETY_MARGIN(self) -> float:
+        if self._safety_margin is None:
+            self._safety_margin = (self.EXACT_SAFETY_MARGIN if self.token_counter.is_exact
+                                   else self.HEURISTIC_SAFETY_MARGIN)
+        return self._safety_margin
+    
+    @property
+    def MAX_TOKENS_PER_MIN(self) -> int:
+        return int(self.TPM_LIMIT * self.SAFETY_MARGIN)
+    
     def estimate_tokens_accurate(self, text: str) -> int:
         """
-        Optimized token estimation with improved accuracy and reduced buffer
+        Token count from the shared token counter (BPE-exact when tiktoken is available)
+        
+        Counts are cached module-wide by text digest in utils.token_counter rather
+        than per instance, so managers do not keep texts alive.
         
         Args:
             text: Input text to estimate tokens for
@@ -65,31 +284,13 @@ class TokenBatchManager:
         Returns:
             Estimated token count
         """
-        if not text or not text.strip():
-            return 0
-        
-        # Quick estimation for very short texts
-        if len(text) < 100:
-            return max(1, int(len(text) / 3.5))  # Slightly more accurate ratio
-        
-        # Optimized single-pass token estimation
-        char_count = len(text)
-        
-        # More accurate GPT-4 tokenization estimate
-        # Based on empirical analysis of GPT-4 tokenizer behavior
-        if char_count < 1000:
-            # For short texts, use more precise character-based estimate
-            estimated_tokens = char_count / 3.8
-        else:
-            # For longer texts, use optimized word + punctuation estimate
-            word_count = len(re.findall(r'\b\w+\b', text))
-            punct_count = len(re.findall(r'[^\w\s]', text))
-            estimated_tokens = word_count * 1.25 + punct_count * 0.5 + char_count * 0.05
-        
-        # Reduced buffer from 1.05 to 1.02 for better accuracy
-        return max(1, int(estimated_tokens * 1.02))
+        return count_tokens(text)
+    
+    def estimate_tokens_many(self, texts: List[str]) -> List[int]:
+        """Token counts for many texts in one batched tokenizer call"""
+        return self.token_counter.count_many(texts)
     
-    def chunk_document_smart(self, doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def chunk_document_smart(self, doc: Dict[str, Any]) -> List[DocumentChunk]:
         """
         Smart document chunking with token-aware splitting
         
@@ -97,142 +298,38 @@ class TokenBatchManager:
             doc: Document dictionary with content and metadata
             
         Returns:
-            List of document chunks
+            List of DocumentChunk records referencing doc (or [doc] when it has no text)
         """
         content = doc.get('content', '')
         if not content or not content.strip():
             return [doc]
         
-        # Estimate total tokens in document
-        total_tokens = self.estimate_tokens_accurate(content)
-        
-        # If document is small enough, return as-is
-        if total_tokens <= self.MAX_TOKENS_PER_REQUEST:
-            doc_copy = doc.copy()
-            doc_copy['estimated_tokens'] = total_tokens
-            doc_copy['chunk_id'] = f"{doc.get('id', 'doc')}_0"
-            doc_copy['total_chunks'] = 1
-            return [doc_copy]
-        
-        # Split document into sentences for better context preservation
-        sentences = self._split_into_sentences(content)
-        chunks = []
-        current_chunk = []
-        current_tokens = 0
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            
-            sentence_tokens = self.estimate_tokens_accurate(sentence)
-            
-            # Handle oversized sentences
-            if sentence_tokens > self.MAX_TOKENS_PER_REQUEST:
-                # Save current chunk if it exists
-                if current_chunk:
-                    self._save_current_chunk(doc, current_chunk, chunks, current_tokens)
-                    current_chunk = []
-                    current_tokens = 0
-                
-                # Split oversized sentence into word chunks
-                word_chunks = self._split_sentence_by_words(sentence, self.MAX_TOKENS_PER_REQUEST)
-                for word_chunk in word_chunks:
-                    chunks.append(self._create_chunk(doc, word_chunk, len(chunks)))
-                continue
-            
-            # Check if adding this sentence would exceed limit
-            if current_tokens + sentence_tokens > self.MAX_TOKENS_PER_REQUEST and current_chunk:
-                # Save current chunk
-                self._save_current_chunk(doc, current_chunk, chunks, current_tokens)
-                current_chunk = [sentence]
-                current_tokens = sentence_tokens
-            else:
-                current_chunk.append(sentence)
-                current_tokens += sentence_tokens
-        
-        # Add remaining content
-        if current_chunk:
-            self._save_current_chunk(doc, current_chunk, chunks, current_tokens)
-        
-        # Update total chunks count for all chunks
-        for chunk in chunks:
-            chunk['total_chunks'] = len(chunks)
-        
-        return chunks if chunks else [doc]  # Fallback to original document
+        total_tokens, spans = chunk_spans(content, self.MAX_TOKENS_PER_REQUEST)
+        return self._chunks_from_spans(doc, total_tokens, spans)
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """
-        Split text into sentences using regex for better performance
-        """
-        if not text:
-            return []
-            
-        # Efficient regex-based sentence splitting
-        sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])|(?<=[.!?])\s*[\n\r]+\s*(?=[A-Z])'
-        sentences = re.split(sentence_pattern, text)
-        
-        # Filter and clean in a single pass
-        return [s.strip() for s in sentences if s and len(s.strip()) > 10]
-    
-    def _split_sentence_by_words(self, sentence: str, max_tokens: int) -> List[str]:
-        """Split an oversized sentence into word-based chunks"""
-        words = sentence.split()
-        word_chunks = []
-        current_word_chunk = []
-        current_word_tokens = 0
-        
-        for word in words:
-            word_tokens = self.estimate_tokens_accurate(word + " ")
-            
-            if current_word_tokens + word_tokens > max_tokens and current_word_chunk:
-                word_chunks.append(" ".join(current_word_chunk))
-                current_word_chunk = [word]
-                current_word_tokens = word_tokens
-            else:
-                current_word_chunk.append(word)
-                current_word_tokens += word_tokens
-        
-        if current_word_chunk:
-            word_chunks.append(" ".join(current_word_chunk))
-        
-        return word_chunks
-    
-    def _save_current_chunk(self, original_doc: Dict[str, Any], 
-                           sentences: List[str], 
-                           chunks: List[Dict[str, Any]], 
-                           token_count: int):
-        """Save current sentence chunk to chunks list"""
-        chunk_content = ". ".join(sentences)
-        chunk = self._create_chunk(original_doc, chunk_content, len(chunks), token_count)
-        chunks.append(chunk)
-    
-    def _create_chunk(self, original_doc: Dict[str, Any], 
-                     content: str, 
-                     chunk_index: int, 
-                     token_count: Optional[int] = None) -> Dict[str, Any]:
-        """Create a chunk dictionary from original document and content"""
-        if token_count is None:
-            token_count = self.estimate_tokens_accurate(content)
-        
-        return {
-            **original_doc,
-            'content': content,
-            'chunk_id': f"{original_doc.get('id', 'doc')}_{chunk_index}",
-            'chunk_index': chunk_index,
-            'total_chunks': 0,  # Will be updated later
-            'estimated_tokens': token_count,
-            'original_doc_id': original_doc.get('id', 'unknown')
-        }
+    def _chunks_from_spans(self, doc: Dict[str, Any], total_tokens: int,
+                           spans: Optional[List[Tuple[int, int, int]]]) -> List[DocumentChunk]:
+        """Build chunk records from chunk_spans output"""
+        # If document is small enough, it is its own single chunk
+        if spans is None:
+            return [DocumentChunk(doc, 0, len(doc['content']), total_tokens)]
+        
+        return [
+            DocumentChunk(doc, start, end, tokens, i, len(spans))
+            for i, (start, end, tokens) in enumerate(spans)
+        ] or [doc]  # Fallback to original document
     
     def create_smart_batches(self, docs: List[Dict[str, Any]], 
-                           max_tokens_per_batch: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+                           max_tokens_per_batch: Optional[int] = None,
+                           keep_documents_together: bool = False) -> List[List[Dict[str, Any]]]:
         """
-        Create optimally packed batches using an improved bin packing algorithm
+        Create optimally packed batches with best-fit-decreasing bin packing
         
         Args:
             docs: List of document chunks
             max_tokens_per_batch: Override default batch token limit
+            keep_documents_together: Keep each document's chunks in order and in
+                consecutive batches instead of packing chunks independently
             
         Returns:
             List of document batches
@@ -245,48 +342,54 @@ class TokenBatchManager:
         if not docs:
             return []
         
-        # Use dynamic list instead of pre-allocated arrays
-        batches = []
-        batch_tokens = []
-        
-        # Sort docs by token count in descending order for better packing
-        sorted_docs = sorted(docs, key=lambda x: x.get('estimated_tokens', 0), reverse=True)
-        
-        for doc in sorted_docs:
+        packable = []
+        for doc in docs:
             doc_tokens = doc.get('estimated_tokens', 0)
-            
             if doc_tokens > max_tokens_per_batch:
                 if st:
                     st.warning(f"⚠️ Skipping oversized chunk: {doc_tokens:,} tokens (ID: {doc.get('chunk_id', 'unknown')})")
                 continue
-            
-            # Find the best batch for this document using optimized best-fit algorithm
-            best_batch_idx = -1
-            min_remaining_space = max_tokens_per_batch + 1
-            
-            for i, tokens in enumerate(batch_tokens):
-                remaining_space = max_tokens_per_batch - tokens
-                if doc_tokens <= remaining_space < min_remaining_space:
-                    min_remaining_space = remaining_space
-                    best_batch_idx = i
-            
-            # If no existing batch fits, create a new one
-            if best_batch_idx == -1:
-                batches.append([doc])
-                batch_tokens.append(doc_tokens)
-            else:
-                batches[best_batch_idx].append(doc)
-                batch_tokens[best_batch_idx] += doc_tokens
+            packable.append(doc)
+        
+        sizes = [doc.get('estimated_tokens', 0) for doc in packable]
+        if keep_documents_together:
+            # Group by source document; chunks of unidentified documents group by the source object
+            groups: Dict[Any, List[int]] = {}
+            for i, doc in enumerate(packable):
+                if isinstance(doc, DocumentChunk):
+                    key = document_key(doc.doc) or id(doc.doc)
+                else:
+                    key = doc.get('original_doc_id') or document_key(doc) or id(doc)
+                groups.setdefault(key, []).append(i)
+            ordered_groups = [
+                sorted(indices, key=lambda i: packable[i].get('chunk_index', 0))
+                for indices in groups.values()
+            ]
+            bins = pack_groups_contiguous(ordered_groups, sizes, max_tokens_per_batch)
+        else:
+            bins = best_fit_decreasing(sizes, max_tokens_per_batch)
         
-        # Return non-empty batches
-        return [batch for batch in batches if batch]
+        return [[packable[i] for i in indices] for indices in bins]
     
-    def process_documents_with_batching(self, documents: List[Dict[str, Any]]) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]:
+    def process_documents_with_batching(self, documents: List[Dict[str, Any]],
+                                        use_processes: Optional[bool] = None,
+                                        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                                        ) -> Tuple[List[List[Dict[str, Any]]], Dict[str, Any]]:
         """
         Complete document processing pipeline with parallel processing
         
+        Token counting and splitting run in a process pool by default, since
+        they are pure-Python string work that threads would serialize on the
+        GIL. Workers receive only document text and return chunk_spans
+        descriptors; chunk dictionaries are built, and progress reported, on the
+        calling thread.
+        
         Args:
             documents: List of original documents
+            use_processes: Chunk in a process pool (default: when several documents
+                and CPUs are available); False uses a thread pool
+            on_progress: Called on the calling thread after each document with a dict
+                of 'filename', 'completed' and 'total' (default: Streamlit messages)
             
         Returns:
             Tuple of (batches, processing_info)
@@ -297,24 +400,54 @@ class TokenBatchManager:
         if st:
             st.info(f"📄 Processing {len(documents)} documents for batching...")
         
-        # Parallel document chunking
+        # Only documents with text go to the workers
+        pending = [
+            i for i, doc in enumerate(documents)
+            if doc.get('content') and doc['content'].strip()
+        ]
+        results: Dict[int, Tuple[int, Optional[List[Tuple[int, int, int]]]]] = {}
+        completed = 0
+        
+        def report(i: int):
+            nonlocal completed
+            completed += 1
+            filename = documents[i].get('filename', 'Unknown')
+            if on_progress:
+                on_progress({'filename': filename, 'completed': completed, 'total': len(pending)})
+            elif st:
+                st.info(f"📋 Chunked document {completed}/{len(pending)}: {filename}")
+        
+        executor = self._create_chunk_pool(len(pending), use_processes)
+        try:
+            if executor is not None:
+                futures = {
+                    executor.submit(chunk_spans, documents[i]['content'], self.MAX_TOKENS_PER_REQUEST): i
+                    for i in pending
+                }
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        i = futures[future]
+                        results[i] = future.result()
+                        report(i)
+                except BrokenProcessPool:
+                    # Workers could not start; chunk the rest on this thread
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    executor = None
+            for i in pending:
+                if i not in results:
+                    results[i] = chunk_spans(documents[i]['content'], self.MAX_TOKENS_PER_REQUEST)
+                    report(i)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        
+        # Assemble chunks in document order
         chunked_docs = []
-        chunk_lock = threading.Lock()
-        
-        def process_doc(doc_tuple):
-            i, doc = doc_tuple
-            if st:
-                st.info(f"📋 Chunking document {i+1}/{len(documents)}: {doc.get('filename', 'Unknown')}")
-            
-            doc_chunks = self.chunk_document_smart(doc)
-            with chunk_lock:
-                chunked_docs.extend(doc_chunks)
-        
-        # Use ThreadPoolExecutor for parallel processing with optimized worker count
-        optimal_workers = min(16, max(4, len(documents)))  # Reduced from 32 to 16 max workers
-        with concurrent.futures.ThreadPoolExecutor(max_workers=optimal_workers) as executor:
-            # Process documents in parallel
-            list(executor.map(process_doc, enumerate(documents)))
+        for i, doc in enumerate(documents):
+            if i in results:
+                chunked_docs.extend(self._chunks_from_spans(doc, *results[i]))
+            else:
+                chunked_docs.append(doc)
         
         self.processing_stats['total_chunks'] = len(chunked_docs)
         
@@ -348,28 +481,48 @@ class TokenBatchManager:
         
         return batches, processing_info
     
+    def _create_chunk_pool(self, document_count: int,
+                           use_processes: Optional[bool]) -> Optional[concurrent.futures.Executor]:
+        """Create the chunking pool, or None to chunk on the calling thread"""
+        cpus = os.cpu_count() or 1
+        if use_processes is None:
+            use_processes = cpus > 1 and document_count > 1
+        # Never nest pools inside a worker process (e.g. the ingestion parse pool)
+        if use_processes and multiprocessing.parent_process() is None:
+            try:
+                return concurrent.futures.ProcessPoolExecutor(
+                    max_workers=min(self.CHUNK_MAX_WORKERS, cpus, document_count)
+                )
+            except (OSError, NotImplementedError):
+                pass
+        if document_count <= 1:
+            return None
+        return concurrent.futures.ThreadPoolExecutor(max_workers=min(self.CHUNK_MAX_WORKERS, document_count))
+    
     def add_token_usage(self, tokens_used: int):
         """Track token usage with sliding window"""
-        current_time = time.time()
-        self.token_usage_history.append((current_time, tokens_used))
-        
-        # Keep only last 60 seconds of history
-        cutoff_time = current_time - 60
-        self.token_usage_history = [
-            (t, tokens) for t, tokens in self.token_usage_history 
-            if t > cutoff_time
-        ]
-        
-        self.processing_stats['total_tokens_processed'] += tokens_used
+        with self.lock:
+            current_time = time.time()
+            self.token_usage_history.append((current_time, tokens_used))
+            
+            # Keep only last 60 seconds of history
+            cutoff_time = current_time - 60
+            self.token_usage_history = [
+                (t, tokens) for t, tokens in self.token_usage_history 
+                if t > cutoff_time
+            ]
+            
+            self.processing_stats['total_tokens_processed'] += tokens_used
     
     def get_current_token_usage(self) -> int:
         """Get current token usage in the last minute"""
-        current_time = time.time()
-        cutoff_time = current_time - 60
-        return sum(
-            tokens for t, tokens in self.token_usage_history 
-            if t > cutoff_time
-        )
+        with self.lock:
+            current_time = time.time()
+            cutoff_time = current_time - 60
+            return sum(
+                tokens for t, tokens in self.token_usage_history 
+                if t > cutoff_time
+            )
     
     def wait_for_rate_limit_window(self, required_tokens: int) -> bool:
         """
@@ -420,36 +573,84 @@ class TokenBatchManager:
     
     def get_processing_summary(self) -> Dict[str, Any]:
         """Get comprehensive processing summary"""
-        self.processing_stats['end_time'] = datetime.now()
-        
-        if self.processing_stats['start_time']:
-            duration = self.processing_stats['end_time'] - self.processing_stats['start_time']
-            self.processing_stats['total_duration_seconds'] = duration.total_seconds()
-        
-        success_rate = 0
-        if self.processing_stats['total_batches'] > 0:
-            success_rate = (self.processing_stats['successful_batches'] / 
-                          self.processing_stats['total_batches']) * 100
-        
-        return {
-            **self.processing_stats,
-            'success_rate': success_rate,
-            'average_tokens_per_minute': (
-                self.processing_stats['total_tokens_processed'] / 
-                max(1, self.processing_stats.get('total_duration_seconds', 1) / 60)
-            )
-        }
+        with self.lock:
+            self.processing_stats['end_time'] = datetime.now()
+        
+            if self.processing_stats['start_time']:
+                duration = self.processing_stats['end_time'] - self.processing_stats['start_time']
+                self.processing_stats['total_duration_seconds'] = duration.total_seconds()
+        
+            success_rate = 0
+            if self.processing_stats['total_batches'] > 0:
+                success_rate = (self.processing_stats['successful_batches'] / 
+                              self.processing_stats['total_batches']) * 100
+        
+            return {
+                **self.processing_stats,
+                'success_rate': success_rate,
+                'average_tokens_per_minute': (
+                    self.processing_stats['total_tokens_processed'] / 
+                    max(1, self.processing_stats.get('total_duration_seconds', 1) / 60)
+                ),
+                # Process-wide: the token count cache is shared by every manager
+                'token_cache': self.token_counter.get_stats()
+            }
     
     def reset_stats(self):
         """Reset processing statistics"""
-        self.processing_stats = {
-            'total_documents': 0,
-            'total_chunks': 0,
-            'total_batches': 0,
-            'successful_batches': 0,
-            'failed_batches': 0,
-            'total_tokens_processed': 0,
-            'start_time': None,
-            'end_time': None
-        }
-        self.token_usage_history.clear()
\ No newline at end of file
+        with self.lock:
+            self.processing_stats = {
+                'total_documents': 0,
+                'total_chunks': 0,
+                'total_batches': 0,
+                'successful_batches': 0,
+                'failed_batches': 0,
+                'total_tokens_processed': 0,
+                'start_time': None,
+                'end_time': None
+            }
+            self.token_usage_history.clear()
+
+
+def benchmark_batching(n_chunks: int = 5000, capacity: int = 90000, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Compare packers on synthetic chunk-size distributions
+    
+    Reports batches produced (with the ceil(total/capacity) lower bound) and
+    packing time for the legacy scan, best_fit_decreasing, and the
+    document-contiguous packer (chunks grouped into documents of 1-20 chunks).
+    """
+    rng = random.Random(seed)
+    distributions = {
+        'uniform': lambda: rng.randint(100, capacity),
+        'small-heavy': lambda: min(capacity, int(rng.expovariate(1 / 4000)) + 50),
+        'bimodal': lambda: rng.randint(200, 3000) if rng.random() < 0.7 else rng.randint(40000, capacity),
+        'near-full': lambda: rng.randint(int(capacity * 0.4), int(capacity * 0.6)),
+    }
+    results = []
+    for name, draw in distributions.items():
+        sizes = [draw() for _ in range(n_chunks)]
+        groups, start = [], 0
+        while start < n_chunks:
+            length = rng.randint(1, 20)
+            groups.append(list(range(start, min(n_chunks, start + length))))
+            start += length
+        
+        row = {'distribution': name, 'chunks': n_chunks, 'lower_bound': -(-sum(sizes) // capacity)}
+        for label, pack in (('legacy', lambda: _legacy_best_fit(sizes, capacity)),
+                            ('bfd', lambda: best_fit_decreasing(sizes, capacity)),
+                            ('contiguous', lambda: pack_groups_contiguous(groups, sizes, capacity))):
+            start_time = time.perf_counter()
+            bins = pack()
+            row[f'{label}_batches'] = len(bins)
+            row[f'{label}_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+        results.append(row)
+    return results
+
+
+if __name__ == "__main__":
+    for row in benchmark_batching():
+        print(f"{row['distribution']:>11}: {row['chunks']} chunks, lower bound {row['lower_bound']} batches | "
+              f"legacy {row['legacy_batches']} in {row['legacy_ms']} ms | "
+              f"bfd {row['bfd_batches']} in {row['bfd_ms']} ms | "
+              f"contiguous {row['contiguous_batches']} in {row['contiguous_ms']} ms")
@@ -0,0 +1,210 @@
+"""
+Token Counter - Tokenizer-backed token counting with a heuristic fallback
+Counts with tiktoken's BPE encoding when it can be loaded and caches counts by text hash
+"""
+
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from config import config
+
+
+_WORD = re.compile(r'\b\w+\b')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+
+
+def heuristic_token_count(text: str) -> int:
+    """
+    Character/word based estimate used when no tokenizer is available
+    (GPT-4-tuned; the previous TokenBatchManager.estimate_tokens_accurate formula)
+    """
+    if not text or not text.strip():
+        return 0
+    char_count = len(text)
+    if char_count < 100:
+        return max(1, int(char_count / 3.5))
+    if char_count < 1000:
+        estimated_tokens = char_count / 3.8
+    else:
+        word_count = len(_WORD.findall(text))
+        punct_count = len(_PUNCTUATION.findall(text))
+        estimated_tokens = word_count * 1.25 + punct_count * 0.5 + char_count * 0.05
+    return max(1, int(estimated_tokens * 1.02))
+
+
+class TokenCounter:
+    """
+    Token counting service
+
+    Uses the tiktoken BPE encoding named in config.TOKENIZER_ENCODING. The
+    encoding is loaded lazily, on the first count (or is_exact check); if
+    tiktoken is missing, or its BPE file cannot be fetched within
+    load_timeout seconds, counts fall back to heuristic_token_count for the
+    rest of the process.
+
+    Counts are cached in an LRU keyed by a 128-bit digest of the text, so every
+    entry has the same small size no matter how long the text was and the
+    max_entries bound is also a memory bound. Texts shorter than min_chars are
+    counted directly and never cached: they are cheap to encode and would only
+    evict the long-text entries worth keeping.
+    """
+
+    def __init__(self, encoding_name: Optional[str] = None, max_entries: Optional[int] = None,
+                 min_chars: Optional[int] = None, load_timeout: Optional[float] = None):
+        """
+        Initialize the token counter
+
+        Args:
+            encoding_name: tiktoken encoding name (default: config.TOKENIZER_ENCODING)
+            max_entries: Maximum cached counts before least recently used entries are evicted
+            min_chars: Texts shorter than this bypass the cache
+            load_timeout: Seconds to wait for the encoding to load (default: config.TOKENIZER_LOAD_TIMEOUT_SECONDS)
+        """
+        self.encoding_name = encoding_name or config.TOKENIZER_ENCODING
+        self.load_timeout = load_timeout if load_timeout is not None else config.TOKENIZER_LOAD_TIMEOUT_SECONDS
+        self.max_entries = max_entries if max_entries is not None else config.TOKEN_COUNT_CACHE_MAX_ENTRIES
+        self.min_chars = min_chars if min_chars is not None else config.TOKEN_COUNT_CACHE_MIN_CHARS
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[bytes, int]" = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'uncached': 0}
+        self._encoding = None
+        self._encoding_loaded = False
+        self._encoding_lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        """The tiktoken encoding (loaded on first access), or None when falling back to the heuristic"""
+        if not self._encoding_loaded:
+            with self._encoding_lock:
+                if not self._encoding_loaded:
+                    self._encoding = self._load_encoding()
+                    self._encoding_loaded = True
+        return self._encoding
+
+    def _load_encoding(self):
+        """
+        Load the tiktoken encoding on a helper thread, waiting at most load_timeout seconds
+
+        The first load of an encoding downloads its BPE file, which can hang
+        without network access; a load that has not finished in time is
+        abandoned (its daemon thread is left to end on its own).
+        """
+        loaded: Dict[str, Any] = {}
+
+        def load():
+            try:
+                import tiktoken
+                loaded['encoding'] = tiktoken.get_encoding(self.encoding_name)
+            except Exception as e:
+                loaded['error'] = e
+
+        loader = threading.Thread(target=load, name="tokenizer-load", daemon=True)
+        loader.start()
+        loader.join(self.load_timeout)
+        if 'encoding' in loaded:
+            return loaded['encoding']
+        reason = loaded.get('error') or f"not loaded within {self.load_timeout:g}s"
+        print(f"Tokenizer unavailable, using heuristic token counts: {reason}")
+        return None
+
+    @property
+    def backend(self) -> str:
+        return "tiktoken" if self.encoding is not None else "heuristic"
+
+    @property
+    def is_exact(self) -> bool:
+        """True when counts come from the BPE tokenizer rather than the heuristic (loads the encoding)"""
+        return self.encoding is not None
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text"""
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """
+        Token counts for many texts
+
+        Cached texts are answered from the cache; the rest are encoded in one
+        batched (multi-threaded) tiktoken call.
+        """
+        counts: List[Optional[int]] = [None] * len(texts)
+        keys: Dict[int, bytes] = {}
+        with self.lock:
+            for i, text in enumerate(texts):
+                if not text:
+                    counts[i] = 0
+                    continue
+                if len(text) < self.min_chars:
+                    keys[i] = text
+                    self.stats['uncached'] += 1
+                    continue
+                key = keys[i] = self._key(text)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    self.cache.move_to_end(key)
+                    counts[i] = cached
+                    self.stats['hits'] += 1
+                else:
+                    self.stats['misses'] += 1
+
+        # Encode each distinct missing text once (short texts are keyed by themselves)
+        misses: Dict[Union[bytes, str], int] = {}
+        for i, count in enumerate(counts):
+            if count is None:
+                misses.setdefault(keys[i], i)
+        if not misses:
+            return counts
+
+        encoding = self.encoding
+        if encoding is not None:
+            tokens = encoding.encode_ordinary_batch([texts[i] for i in misses.values()])
+            fresh = dict(zip(misses, (len(t) for t in tokens)))
+        else:
+            fresh = {key: heuristic_token_count(texts[i]) for key, i in misses.items()}
+
+        with self.lock:
+            for key, count in fresh.items():
+                if isinstance(key, str):
+                    continue
+                self.cache[key] = count
+                self.cache.move_to_end(key)
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+                self.stats['evictions'] += 1
+        return [fresh[keys[i]] if count is None else count for i, count in enumerate(counts)]
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self.cache),
+                'max_entries': self.max_entries,
+                'backend': self.backend if self._encoding_loaded else 'not loaded'
+            }
+
+
+# Global token counter instance
+_global_token_counter = None
+_global_token_counter_lock = threading.Lock()
+
+def get_token_counter() -> TokenCounter:
+    """Get or create the global token counter"""
+    global _global_token_counter
+    with _global_token_counter_lock:
+        if _global_token_counter is None:
+            _global_token_counter = TokenCounter()
+    return _global_token_counter
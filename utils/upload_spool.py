@@ -0,0 +1,146 @@
+"""
+Upload Spool - Disk-backed, memory-mapped uploads
+Spools uploaded files to TEMP_DIR once, hashing while copying, and serves parsers mmap-backed reads
+"""
+
+import os
+import io
+import mmap
+import uuid
+import hashlib
+from typing import Optional
+
+from config import config
+
+
+class SpooledUpload:
+    """
+    An uploaded file spooled to a temporary file and memory-mapped
+
+    Behaves like a read-only binary file (read/seek/tell), so the PDF, DOCX,
+    CSV and Excel parsers accept it unchanged, and exposes the name, size and
+    MD5 hash that DocumentProcessor reads from uploads. Pages are served from
+    the OS page cache instead of private copies of the payload.
+
+    Pickling transfers only the path, so process-pool workers reopen the same
+    file instead of receiving the bytes.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path: str, name: str, file_hash: str):
+        """
+        Open an already spooled file
+
+        Args:
+            path: Spool file path
+            name: Original upload filename
+            file_hash: MD5 hex digest of the content
+        """
+        self.path = path
+        self.name = name
+        self.file_hash = file_hash
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # mmap rejects empty files; an empty in-memory buffer reads the same
+        self._view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else io.BytesIO(b"")
+
+    @classmethod
+    def spool(cls, uploaded_file, directory: Optional[str] = None) -> "SpooledUpload":
+        """
+        Copy an upload to disk in CHUNK_SIZE pieces, hashing as it goes
+
+        Args:
+            uploaded_file: Any readable, seekable file object with a name (e.g. a Streamlit UploadedFile)
+            directory: Spool directory (default: config.TEMP_DIR)
+        """
+        directory = directory or config.TEMP_DIR
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"upload-{uuid.uuid4().hex}{os.path.splitext(uploaded_file.name)[1]}")
+        digest = hashlib.md5()
+        try:
+            uploaded_file.seek(0)
+            with open(path, 'wb') as out:
+                while True:
+                    block = uploaded_file.read(cls.CHUNK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+                    out.write(block)
+            uploaded_file.seek(0)
+            return cls(path, uploaded_file.name, digest.hexdigest())
+        except Exception:
+            if os.path.exists(path):
+                os.remove(path)
+            raise
+
+    def __reduce__(self):
+        return (SpooledUpload, (self.path, self.name, self.file_hash))
+
+    # ------------------------------------------------------------------
+    # Read-only file interface
+    # ------------------------------------------------------------------
+
+    def read(self, size: int = -1) -> bytes:
+        return self._view.read(-1 if size is None else size)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._view.seek(offset, whence)
+        return self._view.tell()
+
+    def tell(self) -> int:
+        return self._view.tell()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def writable(self) -> bool:
+        return False
+
+    def getbuffer(self) -> memoryview:
+        """Zero-copy view of the whole content (release it before close)"""
+        return memoryview(self._view) if isinstance(self._view, mmap.mmap) else self._view.getbuffer()
+
+    def getvalue(self) -> bytes:
+        """Whole content as bytes (copies; prefer read/getbuffer)"""
+        return self._view[:] if isinstance(self._view, mmap.mmap) else self._view.getvalue()
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+    def close(self):
+        if not self._file.closed:
+            self._view.close()
+            self._file.close()
+
+    def remove(self):
+        """Close the mapping and delete the spool file"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self) -> "SpooledUpload":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def hash_file(file, chunk_size: int = SpooledUpload.CHUNK_SIZE) -> str:
+    """MD5 of a file object's content, read in chunks rather than copied whole"""
+    file_hash = getattr(file, 'file_hash', None)
+    if file_hash:
+        return file_hash
+    digest = hashlib.md5()
+    file.seek(0)
+    while True:
+        block = file.read(chunk_size)
+        if not block:
+            break
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
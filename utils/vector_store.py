@@ -1,112 +1,348 @@
 import os
-from typing import List, Dict, Any, Optional
+import time
+import threading
+import concurrent.futures
+from typing import List, Dict, Any, Tuple, Iterable, Optional, Union
 from pinecone import Pinecone, ServerlessSpec
-import openai
 from openai import OpenAI
 import streamlit as st
 from config import config
-import uuid
+from utils.embedding_cache import get_embedding_cache
+from utils.query_cache import get_query_cache
+from utils.state_backend import session_state
+from utils.local_vector_index import LocalVectorIndex
+from utils.semantic_chunker import SemanticChunker, CHUNKER_VERSION
 import hashlib
 
+class _ClientRegistry:
+    """
+    Process-wide, lazily populated cache of SDK clients and index handles
+    
+    VectorStore is constructed per tool call, per login and per workflow; the
+    registry makes every construction after the first reuse the same Pinecone
+    client, index handle and OpenAI HTTP client instead of re-listing indexes and
+    re-probing the API. Both SDK clients are safe to share across threads.
+    
+    It also keeps a per-index version counter that every write bumps; cached
+    search results are keyed by it, so they go stale as soon as the index changes.
+    """
+    
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.pinecone_clients: Dict[str, Pinecone] = {}
+        self.openai_clients: Dict[str, OpenAI] = {}
+        self.indexes: Dict[tuple, Any] = {}
+        self.versions: Dict[tuple, int] = {}
+    
+    def get_pinecone(self, api_key: str) -> Pinecone:
+        with self.lock:
+            if api_key not in self.pinecone_clients:
+                self.pinecone_clients[api_key] = Pinecone(api_key=api_key)
+            return self.pinecone_clients[api_key]
+    
+    def get_openai(self, api_key: str, verify: bool = True) -> OpenAI:
+        with self.lock:
+            if api_key not in self.openai_clients:
+                client = OpenAI(api_key=api_key)
+                if verify:
+                    # Verify OpenAI connection once per process
+                    client.models.list()
+                self.openai_clients[api_key] = client
+            return self.openai_clients[api_key]
+    
+    def get_index(self, key: tuple, factory):
+        with self.lock:
+            if key not in self.indexes:
+                self.indexes[key] = factory()
+            return self.indexes[key]
+    
+    def drop_index(self, key: tuple):
+        with self.lock:
+            self.indexes.pop(key, None)
+            self.bump_version(key)
+    
+    def get_version(self, key: tuple) -> int:
+        with self.lock:
+            return self.versions.get(key, 0)
+    
+    def bump_version(self, key: tuple) -> int:
+        with self.lock:
+            self.versions[key] = self.versions.get(key, 0) + 1
+            return self.versions[key]
+
+
+_registry = _ClientRegistry()
+
+
 class VectorStore:
-    """Manages document vectorization and similarity search using Pinecone (session-based)"""
+    """
+    Manages document vectorization and similarity search (session-based)
+    
+    The index backend is Pinecone by default; set VECTOR_BACKEND=local to use the
+    in-process LocalVectorIndex, which exposes the same index API. Clients and
+    index handles are shared process-wide, so constructing a VectorStore is cheap
+    after the first one.
+    """
+
+    # Pinecone caps request payloads at ~2MB; 100 vectors with chunk metadata stays well under
+    UPSERT_BATCH_SIZE = 100
+    FETCH_BATCH_SIZE = 1000
+    SEARCH_MAX_WORKERS = 8
 
     def __init__(self):
         self.index = None
         self.openai_client = None
-        # Use a session-unique index name
-        if 'vector_index_name' not in st.session_state:
-            # Generate a unique, valid Pinecone index name for this session
-            session_id = st.session_state.get('workflow_id') or str(uuid.uuid4())
-            # Sanitize: lowercase, replace invalid chars with hyphen
-            index_name = "mimetica"
-            st.session_state['vector_index_name'] = index_name
-        self.index_name = st.session_state['vector_index_name']
+        # The app shares one index; headless runs set their own name beforehand
+        if 'vector_index_name' not in session_state:
+            session_state['vector_index_name'] = "mimetica"
+        self.index_name = session_state['vector_index_name']
         self._initialize_clients()
     
+    @property
+    def is_local(self) -> bool:
+        """True when vectors live in the in-process LocalVectorIndex instead of Pinecone"""
+        return config.VECTOR_BACKEND == "local"
+    
+    @staticmethod
+    def _local_index_dir() -> str:
+        return os.path.join(config.DATA_DIR, "vector_indexes")
+    
+    @staticmethod
+    def _index_key(index_name: str) -> tuple:
+        return (config.VECTOR_BACKEND, index_name)
+    
+    @property
+    def index_version(self) -> int:
+        """Counter bumped on every upsert, clear or delete of this index"""
+        return _registry.get_version(self._index_key(self.index_name))
+    
+    def _bump_index_version(self):
+        _registry.bump_version(self._index_key(self.index_name))
+    
     def _initialize_clients(self):
-        """Initialize Pinecone and OpenAI clients (new SDK)"""
+        """Attach the shared index handle and OpenAI client, creating them on first use"""
         try:
-            pinecone_api_key = os.getenv("PINECONE_API_KEY", "")
-            pinecone_env = os.getenv("PINECONE_ENVIRONMENT", "")
-            if not pinecone_api_key or not pinecone_env:
-                raise Exception("PINECONE_API_KEY and PINECONE_ENVIRONMENT must be set in environment variables.")
-            
-            # Initialize Pinecone
-            pc = Pinecone(api_key=pinecone_api_key)
-            
-            # Ensure index exists
-            retries = 3
-            while retries > 0:
-                try:
-                    if self.index_name not in pc.list_indexes().names():
-                        # Create index if it doesn't exist
-                        pc.create_index(
-                            name=self.index_name,
-                            dimension=config.VECTOR_SIZE,
-                            metric="cosine",
-                            spec=ServerlessSpec(cloud="aws", region=pinecone_env)
-                        )
-                        # Wait for index to be ready
-                        import time
-                        time.sleep(5)
-                    
-                    # Try to connect to the index
-                    self.index = pc.Index(self.index_name)
-                    # Test the connection
-                    self.index.describe_index_stats()
-                    break
-                except Exception as e:
-                    retries -= 1
-                    if retries == 0:
-                        raise e
-                    time.sleep(2)
-            
-            # Initialize OpenAI client
-            self.openai_client = OpenAI(api_key=config.OPENAI_API_KEY)
-            
-            # Verify OpenAI connection
-            self.openai_client.models.list()
+            if self.is_local:
+                factory = lambda: LocalVectorIndex(self.index_name, config.VECTOR_SIZE, self._local_index_dir())
+            else:
+                factory = self._connect_pinecone_index
+            self.index = _registry.get_index(self._index_key(self.index_name), factory)
+            # The local backend must start offline; embedding calls report their own errors
+            self.openai_client = _registry.get_openai(config.OPENAI_API_KEY, verify=not self.is_local)
             
         except Exception as e:
             st.error(f"Failed to initialize vector store: {str(e)}")
             self.index = None
             self.openai_client = None
             raise e
-
     
-    # Pinecone index creation is handled in _initialize_clients
+    def _connect_pinecone_index(self):
+        """Connect to (creating if needed) the Pinecone index for this session"""
+        pinecone_api_key = os.getenv("PINECONE_API_KEY", "")
+        pinecone_env = os.getenv("PINECONE_ENVIRONMENT", "")
+        if not pinecone_api_key or not pinecone_env:
+            raise Exception("PINECONE_API_KEY and PINECONE_ENVIRONMENT must be set in environment variables.")
+        
+        pc = _registry.get_pinecone(pinecone_api_key)
+        
+        # Ensure index exists
+        retries = 3
+        while True:
+            try:
+                if self.index_name not in pc.list_indexes().names():
+                    # Create index if it doesn't exist
+                    pc.create_index(
+                        name=self.index_name,
+                        dimension=config.VECTOR_SIZE,
+                        metric="cosine",
+                        spec=ServerlessSpec(cloud="aws", region=pinecone_env)
+                    )
+                    # Wait for index to be ready
+                    time.sleep(5)
+                
+                # Try to connect to the index
+                index = pc.Index(self.index_name)
+                # Test the connection
+                index.describe_index_stats()
+                return index
+            except Exception as e:
+                retries -= 1
+                if retries == 0:
+                    raise e
+                time.sleep(2)
     
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using OpenAI"""
-        try:
-            if not self.openai_client:
-                raise Exception("OpenAI client not initialized")
-            
-            response = self.openai_client.embeddings.create(
-                model="text-embedding-ada-002",
-                input=text
-            )
-            return response.data[0].embedding
+        return self.generate_embeddings([text])[0]
+    
+    @staticmethod
+    def _estimate_embedding_tokens(text: str) -> int:
+        """Cheap token estimate used to size embedding batches (~4 chars per token)"""
+        return max(1, len(text) // 4)
+    
+    def _iter_embedding_batches(self, texts: List[str]):
+        """Yield lists of indices into texts, each sized to fit one embeddings request"""
+        batch: List[int] = []
+        batch_tokens = 0
+        for i, text in enumerate(texts):
+            tokens = self._estimate_embedding_tokens(text)
+            if batch and (batch_tokens + tokens > config.EMBEDDING_BATCH_MAX_TOKENS
+                          or len(batch) >= config.EMBEDDING_BATCH_MAX_INPUTS):
+                yield batch
+                batch = []
+                batch_tokens = 0
+            batch.append(i)
+            batch_tokens += tokens
+        if batch:
+            yield batch
+    
+    def _embed_batch(self, inputs: List[str]) -> List[List[float]]:
+        """Send one embeddings request and return vectors in input order"""
+        response = self.openai_client.embeddings.create(
+            model=config.EMBEDDING_MODEL,
+            input=inputs
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+    
+    def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts with as few OpenAI requests as possible
         
-        except Exception as e:
-            st.error(f"Failed to generate embedding: {str(e)}")
-            return []
+        Texts are grouped into requests by token budget. The result is aligned with
+        texts; an entry is an empty list when that text could not be embedded.
+        """
+        results, errors = self._generate_embeddings(texts)
+        if errors:
+            st.error(f"Failed to generate {len(errors)} embedding(s): {errors[0]}")
+        return results
+    
+    def _generate_embeddings(self, texts: List[str]) -> Tuple[List[List[float]], List[str]]:
+        """Batched embedding core; returns (aligned results, error messages) without UI calls"""
+        results: List[List[float]] = [[] for _ in texts]
+        if not texts:
+            return results, []
+        if not self.openai_client:
+            return results, ["OpenAI client not initialized"]
+        
+        # Empty strings are rejected by the API, keep them as failures
+        pending = [i for i, text in enumerate(texts) if text and text.strip()]
+        errors = []
+        
+        # Serve previously embedded chunks from the persistent cache
+        cache = get_embedding_cache()
+        if cache and pending:
+            try:
+                cached = cache.get_many(config.EMBEDDING_MODEL, [texts[i] for i in pending])
+                for i, embedding in zip(pending, cached):
+                    if embedding is not None:
+                        results[i] = embedding
+                pending = [i for i in pending if not results[i]]
+            except Exception as e:
+                print(f"Embedding cache read failed: {e}")
+        
+        for batch in self._iter_embedding_batches([texts[i] for i in pending]):
+            indices = [pending[j] for j in batch]
+            try:
+                embeddings = self._embed_batch([texts[i] for i in indices])
+                for i, embedding in zip(indices, embeddings):
+                    results[i] = embedding
+            except Exception as e:
+                if len(indices) == 1:
+                    errors.append(str(e))
+                    continue
+                # Retry item by item so one bad chunk does not sink the whole batch
+                for i in indices:
+                    try:
+                        results[i] = self._embed_batch([texts[i]])[0]
+                    except Exception as item_error:
+                        errors.append(str(item_error))
+        
+        if cache and pending:
+            try:
+                cache.put_many(config.EMBEDDING_MODEL, [texts[i] for i in pending], [results[i] for i in pending])
+            except Exception as e:
+                print(f"Embedding cache write failed: {e}")
+        
+        return results, errors
     
-    def chunk_text(self, text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-        """Split text into overlapping chunks"""
+    def chunk_text(self, text: Union[str, Iterable[str]]) -> List[str]:
+        """Split text (a string, or pieces streamed in order) into token-bounded chunks along sentence, heading and table boundaries"""
         if not text:
             return []
+        return [chunk for chunk in SemanticChunker().split(text) if chunk]
+    
+    @staticmethod
+    def make_chunk_id(document: Dict[str, Any], chunk_index: int) -> str:
+        """Deterministic vector ID from the document content hash, chunker version and chunk position"""
+        document_id = document.get('file_hash') or hashlib.md5(
+            document.get('content', '').encode('utf-8')
+        ).hexdigest()
+        return f"{document_id}-{CHUNKER_VERSION}-{chunk_index}"
+    
+    def existing_ids(self, ids: List[str]) -> set:
+        """Return the subset of ids already stored in the index"""
+        found = set()
+        for start in range(0, len(ids), self.FETCH_BATCH_SIZE):
+            response = self.index.fetch(ids=ids[start:start + self.FETCH_BATCH_SIZE])
+            found.update(response.vectors.keys())
+        return found
+    
+    def prepare_document_vectors(self, document: Dict[str, Any],
+                                 source: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Chunk and embed a document without writing to the index or the Streamlit UI
         
-        words = text.split()
-        chunks = []
+        The text is document['content'], or source when given: pieces such as
+        DocumentProcessor.iter_pdf_text output, chunked as they stream in.
+        Chunks whose deterministic IDs are already in the index are skipped before
+        embedding, so re-ingesting a document is a no-op. Returns a dict with
+        'vectors' (Pinecone upsert tuples), 'total_chunks', 'skipped_chunks',
+        'failed_chunks' and 'errors'. Safe to call from worker threads.
+        """
+        if source is None:
+            source = document.get('content', '')
+        chunks = self.chunk_text(source) if source else []
+        ids = [self.make_chunk_id(document, i) for i in range(len(chunks))]
         
-        for i in range(0, len(words), chunk_size - overlap):
-            chunk = ' '.join(words[i:i + chunk_size])
-            if chunk.strip():
-                chunks.append(chunk)
+        try:
+            present = self.existing_ids(ids) if ids else set()
+        except Exception as e:
+            # Existence check is an optimization; upserts with the same IDs stay idempotent
+            present = set()
+            print(f"Could not check existing chunks: {e}")
+        missing = [i for i, chunk_id in enumerate(ids) if chunk_id not in present]
+        
+        embeddings, errors = self._generate_embeddings([chunks[i] for i in missing])
         
-        return chunks
+        vectors = []
+        for i, embedding in zip(missing, embeddings):
+            if not embedding:
+                continue
+            chunk = chunks[i]
+            vectors.append((ids[i], embedding, {
+                'document_id': document.get('file_hash', ''),
+                'filename': document.get('filename', ''),
+                'file_type': document.get('file_type', ''),
+                'chunk_index': i,
+                'chunk_text': chunk,
+                'processed_at': document.get('processed_at', ''),
+                'word_count': len(chunk.split())
+            }))
+        
+        return {
+            'vectors': vectors,
+            'total_chunks': len(chunks),
+            'skipped_chunks': len(chunks) - len(missing),
+            'failed_chunks': len(missing) - len(vectors),
+            'errors': errors
+        }
+    
+    def upsert_vectors(self, vectors: List[tuple]) -> int:
+        """Upsert (id, values, metadata) tuples in request-sized slices; returns count written"""
+        for start in range(0, len(vectors), self.UPSERT_BATCH_SIZE):
+            self.index.upsert(vectors=vectors[start:start + self.UPSERT_BATCH_SIZE])
+            self._bump_index_version()
+        return len(vectors)
     
     def vectorize_document(self, document: Dict[str, Any]) -> bool:
         """Vectorize a document and store in Pinecone"""
@@ -114,38 +350,23 @@ class VectorStore:
             if not self.index or not self.openai_client:
                 st.error("Vector store not properly initialized")
                 return False
-            content = document.get('content', '')
-            if not content:
+            if not document.get('content', ''):
                 st.warning(f"No content to vectorize for {document.get('filename', 'unknown')}")
                 return False
-            chunks = self.chunk_text(content)
-            if not chunks:
+            prepared = self.prepare_document_vectors(document)
+            if not prepared['total_chunks']:
                 st.warning(f"No chunks created for {document.get('filename', 'unknown')}")
                 return False
-            vectors = []
-            metadata = []
-            ids = []
-            for i, chunk in enumerate(chunks):
-                embedding = self.generate_embedding(chunk)
-                if not embedding:
-                    continue
-                chunk_id = str(uuid.uuid4())
-                ids.append(chunk_id)
-                vectors.append(embedding)
-                metadata.append({
-                    'document_id': document.get('file_hash', ''),
-                    'filename': document.get('filename', ''),
-                    'file_type': document.get('file_type', ''),
-                    'chunk_index': i,
-                    'chunk_text': chunk,
-                    'processed_at': document.get('processed_at', ''),
-                    'word_count': len(chunk.split())
-                })
-            if vectors:
-                # Pinecone upsert
-                to_upsert = list(zip(ids, vectors, metadata))
-                self.index.upsert(vectors=to_upsert)
-                st.success(f"Vectorized {document.get('filename', 'unknown')}: {len(vectors)} chunks")
+            if prepared['errors']:
+                st.error(f"Failed to generate {len(prepared['errors'])} embedding(s): {prepared['errors'][0]}")
+            if prepared['failed_chunks']:
+                st.warning(f"{prepared['failed_chunks']} of {prepared['total_chunks']} chunks could not be embedded for {document.get('filename', 'unknown')}")
+            if prepared['vectors']:
+                self.upsert_vectors(prepared['vectors'])
+                st.success(f"Vectorized {document.get('filename', 'unknown')}: {len(prepared['vectors'])} chunks")
+                return True
+            elif prepared['skipped_chunks'] and not prepared['failed_chunks']:
+                st.info(f"{document.get('filename', 'unknown')} is already vectorized ({prepared['skipped_chunks']} chunks)")
                 return True
             else:
                 st.warning(f"No valid chunks to upload for {document.get('filename', 'unknown')}")
@@ -159,30 +380,108 @@ class VectorStore:
         try:
             if not self.index or not self.openai_client:
                 return []
-            query_embedding = self.generate_embedding(query)
+            cache = get_query_cache()
+            index_key, version = self._index_key(self.index_name), self.index_version
+            if cache:
+                cached = cache.get_results(index_key, version, query, limit)
+                if cached is not None:
+                    return [dict(result) for result in cached]
+            query_embedding = self._embed_queries([query])[0]
             if not query_embedding:
                 return []
-            # Pinecone query
-            search_results = self.index.query(
-                vector=query_embedding,
-                top_k=limit,
-                include_metadata=True
-            )
-            results = []
-            for match in search_results.matches:
-                meta = match.metadata or {}
-                results.append({
-                    'chunk_text': meta.get('chunk_text', ''),
-                    'filename': meta.get('filename', ''),
-                    'file_type': meta.get('file_type', ''),
-                    'score': match.score,
-                    'chunk_index': meta.get('chunk_index', 0)
-                })
+            results = self._query_index(query_embedding, limit)
+            if cache:
+                cache.put_results(index_key, version, query, limit, [dict(result) for result in results])
             return results
         except Exception as e:
             st.error(f"Search failed: {str(e)}")
             return []
     
+    def search_many(self, queries: List[str], limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search several queries at once
+        
+        All queries are embedded in a single batched request and the index
+        queries run concurrently. Queries answered from the query cache skip both
+        steps. Returns {query: results} in input order; a query that fails to
+        embed or search maps to an empty list.
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = {query: [] for query in queries}
+        if not grouped or not self.index or not self.openai_client:
+            return grouped
+        try:
+            cache = get_query_cache()
+            index_key, version = self._index_key(self.index_name), self.index_version
+            unique_queries = []
+            for query in grouped:
+                cached = cache.get_results(index_key, version, query, limit) if cache else None
+                if cached is not None:
+                    grouped[query] = [dict(result) for result in cached]
+                else:
+                    unique_queries.append(query)
+            if not unique_queries:
+                return grouped
+            
+            embeddings = self._embed_queries(unique_queries)
+            jobs = [(query, embedding) for query, embedding in zip(unique_queries, embeddings) if embedding]
+            if not jobs:
+                return grouped
+            
+            max_workers = min(self.SEARCH_MAX_WORKERS, len(jobs))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(self._query_index, embedding, limit): query
+                    for query, embedding in jobs
+                }
+                errors = []
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        query = futures[future]
+                        grouped[query] = future.result()
+                        if cache:
+                            cache.put_results(index_key, version, query, limit,
+                                              [dict(result) for result in grouped[query]])
+                    except Exception as e:
+                        errors.append(str(e))
+            if errors:
+                st.error(f"Search failed for {len(errors)} of {len(jobs)} queries: {errors[0]}")
+        except Exception as e:
+            st.error(f"Search failed: {str(e)}")
+        return grouped
+    
+    def _embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed search queries, reusing recently seen query embeddings"""
+        cache = get_query_cache()
+        if not cache:
+            return self.generate_embeddings(queries)
+        embeddings = [cache.get_embedding(config.EMBEDDING_MODEL, query) for query in queries]
+        misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if misses:
+            fresh = self.generate_embeddings([queries[i] for i in misses])
+            for i, embedding in zip(misses, fresh):
+                embeddings[i] = embedding
+                cache.put_embedding(config.EMBEDDING_MODEL, queries[i], embedding)
+        return embeddings
+    
+    def _query_index(self, query_embedding: List[float], limit: int) -> List[Dict[str, Any]]:
+        """Run one index query and flatten matches into result dicts"""
+        search_results = self.index.query(
+            vector=query_embedding,
+            top_k=limit,
+            include_metadata=True
+        )
+        results = []
+        for match in search_results.matches:
+            meta = match.metadata or {}
+            results.append({
+                'chunk_text': meta.get('chunk_text', ''),
+                'filename': meta.get('filename', ''),
+                'file_type': meta.get('file_type', ''),
+                'score': match.score,
+                'chunk_index': meta.get('chunk_index', 0)
+            })
+        return results
+    
     def get_collection_info(self) -> Dict[str, Any]:
         """Get information about the Pinecone index"""
         try:
@@ -202,7 +501,9 @@ class VectorStore:
     def collection_exists(self, name: str) -> bool:
         """Check if a collection exists"""
         try:
-            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY", ""))
+            if self.is_local:
+                return LocalVectorIndex.exists(name, self._local_index_dir())
+            pc = _registry.get_pinecone(os.getenv("PINECONE_API_KEY", ""))
             return name in pc.list_indexes().names()
         except Exception as e:
             st.error(f"Failed to check collection existence: {str(e)}")
@@ -211,7 +512,11 @@ class VectorStore:
     def delete_collection(self, name: str) -> bool:
         """Delete a collection"""
         try:
-            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY", ""))
+            # Forget the shared handle so the next VectorStore reconnects
+            _registry.drop_index(self._index_key(name))
+            if self.is_local:
+                return LocalVectorIndex.destroy(name, self._local_index_dir())
+            pc = _registry.get_pinecone(os.getenv("PINECONE_API_KEY", ""))
             if name in pc.list_indexes().names():
                 pc.delete_index(name)
                 return True
@@ -223,7 +528,12 @@ class VectorStore:
     def create_collection(self, name: str) -> bool:
         """Create a new collection"""
         try:
-            pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY", ""))
+            if self.is_local:
+                if LocalVectorIndex.exists(name, self._local_index_dir()):
+                    return False
+                LocalVectorIndex(name, config.VECTOR_SIZE, self._local_index_dir())
+                return True
+            pc = _registry.get_pinecone(os.getenv("PINECONE_API_KEY", ""))
             if name not in pc.list_indexes().names():
                 pc.create_index(
                     name=name,
@@ -232,7 +542,6 @@ class VectorStore:
                     spec=ServerlessSpec(cloud="aws", region=os.getenv("PINECONE_ENVIRONMENT", ""))
                 )
                 # Wait for a moment to ensure index is ready
-                import time
                 time.sleep(5)
                 return True
             return False
@@ -257,10 +566,11 @@ class VectorStore:
             
             # Clear all vectors
             self.index.delete(delete_all=True)
+            self._bump_index_version()
             
             # Verify clearing was successful
-            import time
-            time.sleep(1)  # Small delay to ensure operation completes
+            if not self.is_local:
+                time.sleep(1)  # Small delay to ensure the Pinecone operation completes
             new_stats = self.index.describe_index_stats()
             new_count = new_stats.get('total_vector_count', 0)
             
@@ -285,8 +595,8 @@ class VectorStore:
                     return False
                 
                 # Small delay to ensure deletion is complete
-                import time
-                time.sleep(2)
+                if not self.is_local:
+                    time.sleep(2)
             
             # Create new collection
             if self.create_collection(name):
@@ -300,27 +610,34 @@ class VectorStore:
             return False
 
     @staticmethod
-    def delete_session_index():
-        """Delete the session-specific index - for compatibility with existing code"""
+    def delete_session_index() -> bool:
+        """Delete the session-specific index; returns False if it could not be deleted"""
         try:
-            if 'vector_index_name' in st.session_state:
-                index_name = st.session_state['vector_index_name']
-                pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY", ""))
-                
-                if index_name in pc.list_indexes().names():
-                    pc.delete_index(index_name)
-                    st.info(f"Deleted vector index: {index_name}")
+            if 'vector_index_name' in session_state:
+                index_name = session_state['vector_index_name']
+                _registry.drop_index(VectorStore._index_key(index_name))
+                if config.VECTOR_BACKEND == "local":
+                    if LocalVectorIndex.destroy(index_name, VectorStore._local_index_dir()):
+                        st.info(f"Deleted vector index: {index_name}")
+                else:
+                    pc = _registry.get_pinecone(os.getenv("PINECONE_API_KEY", ""))
+                    
+                    if index_name in pc.list_indexes().names():
+                        pc.delete_index(index_name)
+                        st.info(f"Deleted vector index: {index_name}")
                     
                 # Clear the session state
-                del st.session_state['vector_index_name']
+                del session_state['vector_index_name']
+            return True
         except Exception as e:
             st.warning(f"Could not delete session index: {str(e)}")
+            return False
 
     @staticmethod 
     def clear_session_collection():
         """Clear the session collection without deleting it - preferred method"""
         try:
-            if 'vector_index_name' in st.session_state:
+            if 'vector_index_name' in session_state:
                 vector_store = VectorStore()
                 return vector_store.clear_collection()
             return True
@@ -1,12 +1,12 @@
 import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-import streamlit as st
-from crewai import Crew, Task
+from crewai import Crew
 import json
 import sys
 import io
-from contextlib import redirect_stdout, redirect_stderr
+import threading
+from contextlib import contextmanager
 
 # Import all agents
 from agents import (
@@ -22,8 +22,9 @@ from agents import (
 )
 
 # Import utilities
-from utils import SessionManager, VectorStore
+from utils import SessionManager, VectorStore, PhaseCache, get_phase_cache
 from utils.enhanced_workflow_manager import EnhancedWorkflowManager
+from utils.state_backend import session_state
 #from utils.agent_communication_logger import agent_comm_logger
 from config import config
 
@@ -31,7 +32,7 @@ from config import config
 # Context builders
 # -------------------------------------------
 def _phase_output_text(phase_key):
-    po = st.session_state.workflow_state.get('phase_outputs', {}).get(phase_key, {})
+    po = session_state.workflow_state.get('phase_outputs', {}).get(phase_key, {})
     out = po.get('output')
     if isinstance(out, dict):
         return "\n".join(f"### {k}\n{v}" for k, v in out.items())
@@ -47,8 +48,8 @@ def build_running_context(include_phases=None):
         if ph != 'collection':
             ctx.append(f"## {ph.title()} Output\n{_phase_output_text(ph)}")
     # 3) Runtime Data
-    ns = st.session_state.get('vector_namespace', 'mimetica/mixed')
-    lang = st.session_state.get('language_tag', 'en')
+    ns = session_state.get('vector_namespace', 'mimetica/mixed')
+    lang = session_state.get('language_tag', 'en')
     model = config.validate_and_fix_selected_model()
     ctx.append(
         f"\n\n### Runtime Context\n"
@@ -58,6 +59,63 @@ def build_running_context(include_phases=None):
 # -------------------------------------------
 
 
+class _ThreadOutputRouter:
+    """
+    sys.stdout/sys.stderr stand-in that routes each thread's writes to its own buffer
+
+    Phases can run concurrently, so crews must not swap the process-wide streams
+    under each other; threads without a capture write to the original stream.
+    """
+
+    def __init__(self, original):
+        self.original = original
+        self.buffers: Dict[int, io.StringIO] = {}
+
+    def _target(self):
+        return self.buffers.get(threading.get_ident()) or self.original
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.original, name)
+
+
+_output_capture_lock = threading.Lock()
+_output_routers: Optional[tuple] = None  # (stdout router, stderr router) while any thread is capturing
+
+
+@contextmanager
+def _capture_thread_output():
+    """Capture stdout/stderr written by the current thread; yields (stdout_buffer, stderr_buffer)"""
+    global _output_routers
+    ident = threading.get_ident()
+    stdout_buffer, stderr_buffer = io.StringIO(), io.StringIO()
+    with _output_capture_lock:
+        if _output_routers is None:
+            _output_routers = (_ThreadOutputRouter(sys.stdout), _ThreadOutputRouter(sys.stderr))
+            sys.stdout, sys.stderr = _output_routers
+        stdout_router, stderr_router = _output_routers
+        stdout_router.buffers[ident] = stdout_buffer
+        stderr_router.buffers[ident] = stderr_buffer
+    try:
+        yield stdout_buffer, stderr_buffer
+    finally:
+        with _output_capture_lock:
+            stdout_router.buffers.pop(ident, None)
+            stderr_router.buffers.pop(ident, None)
+            if not stdout_router.buffers:
+                # Last capture finished: put the original streams back unless someone replaced ours
+                if sys.stdout is stdout_router:
+                    sys.stdout = stdout_router.original
+                if sys.stderr is stderr_router:
+                    sys.stderr = stderr_router.original
+                _output_routers = None
+
+
 # 🔁 Reemplaza 'list[str]' por 'List[str]' para compatibilidad
 def _get_accumulated_context(phases: List[str]) -> str:
     """
@@ -65,12 +123,11 @@ def _get_accumulated_context(phases: List[str]) -> str:
     vector store metadata, and outputs from previous phases.
     """
     from utils import SessionManager
-    import streamlit as st
 
     context_blocks = []
 
     # Base project info
-    ws = st.session_state.workflow_state
+    ws = session_state.workflow_state
     project = ws.get("project_info", {})
     documents = ws.get("documents", [])
     lang = ws.get("language_tag", "en")
@@ -110,12 +167,45 @@ class DecideWorkflow:
     Implements the sequential agent execution: Define → Explore → Create → Implement → Decide/Simulate → Evaluate
     """
     
+    # Phase dependency graph: (phase, method, input phases), in canonical order.
+    # Inputs are the phases whose outputs a run_*_phase reads, directly or through
+    # the accumulated context; EnhancedWorkflowManager starts a phase as soon as its
+    # inputs have completed, so phases with disjoint inputs can run concurrently.
+    PHASE_GRAPH = [
+        ('collection', 'run_collection_phase', []),
+        ('analysis', 'run_multidisciplinary_analysis_phase', ['collection']),
+        ('definition', 'run_define_phase', ['collection', 'analysis']),
+        ('exploration', 'run_explore_phase', ['collection', 'analysis', 'definition']),
+        ('creation', 'run_create_phase', ['collection', 'analysis', 'definition', 'exploration']),
+        ('implementation', 'run_implement_phase',
+         ['collection', 'analysis', 'definition', 'exploration', 'creation']),
+        ('simulation', 'run_simulate_phase',
+         ['collection', 'analysis', 'definition', 'exploration', 'creation', 'implementation']),
+        ('simulation_explainers', 'run_simulation_explainers_phase', ['simulation']),
+        ('evaluation', 'run_evaluate_phase',
+         ['collection', 'analysis', 'definition', 'exploration', 'creation', 'implementation', 'simulation']),
+        ('report', 'run_report_phase',
+         ['collection', 'analysis', 'definition', 'exploration', 'creation', 'implementation',
+          'simulation', 'evaluation']),
+    ]
+    
+    # Phase output kept in session_state (the full output is always on disk)
+    MAX_SESSION_CHARS = 200_000
+    
+    # Structured checkpoint written next to the latest/*.md phase files
+    CHECKPOINT_FILE = "state.json"
+    
     def __init__(self):
         self._ensure_workflow_state()
-        self.workflow_id = st.session_state.workflow_state.get('workflow_id', f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.workflow_id = session_state.workflow_state.setdefault('workflow_id', f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
         self.vector_store = VectorStore()
         self.current_phase = 'collection'
         self.phase_results = {}
+        # Phase output cache: lookups bypassed for a run with use_cache=False
+        self.use_phase_cache = True
+        self.cached_phases = set()
+        # Guards the workflow_state dicts that concurrent phases write and checkpoints read
+        self.state_lock = threading.Lock()
         
         # Initialize logging
         SessionManager.add_log("INFO", f"DECIDE Workflow initialized: {self.workflow_id}")
@@ -126,98 +216,145 @@ class DecideWorkflow:
             # Create a new one if not available
             from utils.agent_communication_logger import AgentCommunicationLogger
             self.comm_logger = AgentCommunicationLogger()
-            st.session_state.agent_comm_logger = self.comm_logger
+            session_state.agent_comm_logger = self.comm_logger
     
+    def _phase_cache_key(self, crew: Crew, phase_name: str) -> str:
+        """Fingerprint of everything a phase's crew sends to the model, plus its upstream outputs"""
+        tasks = [
+            {
+                'description': getattr(task, 'description', ''),
+                'expected_output': getattr(task, 'expected_output', '')
+            }
+            for task in getattr(crew, 'tasks', [])
+        ]
+        agents = []
+        for agent in getattr(crew, 'agents', []):
+            llm = getattr(agent, 'llm', None)
+            agents.append({
+                'role': getattr(agent, 'role', ''),
+                'goal': getattr(agent, 'goal', ''),
+                'backstory': getattr(agent, 'backstory', ''),
+                'model': getattr(llm, 'model', None) or str(llm),
+                'temperature': getattr(llm, 'temperature', None)
+            })
+        phase_inputs = {phase: inputs for phase, _, inputs in self.PHASE_GRAPH}
+        upstream = {phase: _phase_output_text(phase) for phase in phase_inputs.get(phase_name, [])}
+        return PhaseCache.fingerprint(phase_name, tasks, agents, upstream)
+
     def execute_crew_with_logging(self, crew: Crew, phase_name: str, agent_name: str) -> Any:
         """Execute a CrewAI crew with comprehensive logging of all interactions"""
+        # Reuse the stored output when nothing the crew would see has changed;
+        # a bypassed run skips the lookup but still refreshes the cache
+        phase_cache = get_phase_cache()
+        cache_key = None
+        if phase_cache is not None:
+            cached_output = None
+            try:
+                cache_key = self._phase_cache_key(crew, phase_name)
+                if self.use_phase_cache:
+                    cached_output = phase_cache.get(cache_key)
+            except Exception as e:
+                SessionManager.add_log("WARNING", f"Phase cache lookup failed for {phase_name}: {str(e)}")
+            if cached_output is not None:
+                self.cached_phases.add(phase_name)
+                SessionManager.add_log("INFO", f"Reused cached {phase_name} output (inputs unchanged)")
+                SessionManager.add_agent_communication(
+                    agent_name,
+                    "♻️ Inputs unchanged since a previous run; reused the cached output",
+                    "completion",
+                    phase_name
+                )
+                return cached_output
+
         self.comm_logger.start_phase_logging(phase_name)
         self.comm_logger.start_agent_execution(agent_name, f"Executing {phase_name} phase")
         
-        # Capture stdout/stderr during execution
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        
-        stdout_buffer = io.StringIO()
-        stderr_buffer = io.StringIO()
-        
-        try:
-            # Redirect output to capture CrewAI verbose logging
-            sys.stdout = stdout_buffer
-            sys.stderr = stderr_buffer
+        # Capture this thread's stdout/stderr (CrewAI verbose logging) during execution;
+        # other concurrently running phases keep their own captures
+        with _capture_thread_output() as (stdout_buffer, stderr_buffer):
+            try:
+                # Execute the crew
+                result = crew.kickoff()
+            
+                # Get captured output
+                stdout_content = stdout_buffer.getvalue()
+                stderr_content = stderr_buffer.getvalue()
+            
+                # Log the captured output
+                if stdout_content:
+                    self.comm_logger.log_crewai_output(stdout_content)
+                    SessionManager.add_agent_communication(
+                        f"CrewAI-{agent_name}", 
+                        f"Verbose Output:\n{stdout_content[:1000]}...", 
+                        "crewai_verbose", 
+                        phase_name
+                    )
             
-            # Execute the crew
-            result = crew.kickoff()
+                if stderr_content:
+                    self.comm_logger.log_error("CrewAI", stderr_content)
+                    SessionManager.add_agent_communication(
+                        f"CrewAI-{agent_name}", 
+                        f"Error Output:\n{stderr_content}", 
+                        "error", 
+                        phase_name
+                    )
             
-            # Get captured output
-            stdout_content = stdout_buffer.getvalue()
-            stderr_content = stderr_buffer.getvalue()
+                # Log successful completion
+                result_summary = str(result)[:200] if result else "No result"
+                self.comm_logger.end_agent_execution(agent_name, result_summary)
+                self.comm_logger.end_phase_logging(phase_name, success=True)
             
-            # Log the captured output
-            if stdout_content:
-                self.comm_logger.log_crewai_output(stdout_content)
                 SessionManager.add_agent_communication(
-                    f"CrewAI-{agent_name}", 
-                    f"Verbose Output:\n{stdout_content[:1000]}...", 
-                    "crewai_verbose", 
+                    agent_name, 
+                    f"✅ Phase completed successfully\n📊 Result: {result_summary}...", 
+                    "completion", 
                     phase_name
                 )
             
-            if stderr_content:
-                self.comm_logger.log_error("CrewAI", stderr_content)
+                if cache_key is not None:
+                    try:
+                        phase_cache.put(cache_key, phase_name, str(result))
+                    except Exception as e:
+                        SessionManager.add_log("WARNING", f"Failed to cache {phase_name} output: {str(e)}")
+            
+                return result
+            
+            except Exception as e:
+                # Log the error
+                error_msg = str(e)
+                self.comm_logger.log_error(agent_name, error_msg, e)
+                self.comm_logger.end_agent_execution(agent_name, f"Failed: {error_msg}")
+                self.comm_logger.end_phase_logging(phase_name, success=False)
+            
                 SessionManager.add_agent_communication(
-                    f"CrewAI-{agent_name}", 
-                    f"Error Output:\n{stderr_content}", 
+                    agent_name, 
+                    f"❌ Phase failed\n🔍 Error: {error_msg}", 
                     "error", 
                     phase_name
                 )
             
-            # Log successful completion
-            result_summary = str(result)[:200] if result else "No result"
-            self.comm_logger.end_agent_execution(agent_name, result_summary)
-            self.comm_logger.end_phase_logging(phase_name, success=True)
-            
-            SessionManager.add_agent_communication(
-                agent_name, 
-                f"✅ Phase completed successfully\n📊 Result: {result_summary}...", 
-                "completion", 
-                phase_name
-            )
-            
-            return result
-            
-        except Exception as e:
-            # Log the error
-            error_msg = str(e)
-            self.comm_logger.log_error(agent_name, error_msg, e)
-            self.comm_logger.end_agent_execution(agent_name, f"Failed: {error_msg}")
-            self.comm_logger.end_phase_logging(phase_name, success=False)
-            
-            SessionManager.add_agent_communication(
-                agent_name, 
-                f"❌ Phase failed\n🔍 Error: {error_msg}", 
-                "error", 
-                phase_name
-            )
-            
-            raise e
-            
-        finally:
-            # Restore original stdout/stderr
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
+                raise e
     
-    def run_complete_workflow(self) -> Dict[str, Any]:
-        """Run the complete DECIDE workflow using enhanced workflow manager"""
+    def run_complete_workflow(self, use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Run the complete DECIDE workflow using enhanced workflow manager
+        
+        Args:
+            use_cache: Reuse cached outputs of phases whose inputs are unchanged (False regenerates every
+                phase and refreshes the cache)
+        """
         self._ensure_workflow_state()
+        self.use_phase_cache = use_cache
+        self.cached_phases = set()
         try:
             if self.comm_logger:
                 self.comm_logger.clear_communications()
             SessionManager.add_log("INFO", "Starting enhanced DECIDE workflow execution")
             
             # === Initialize base project context ===
-            project_info = st.session_state.workflow_state.get('project_info', {})
-            documents = st.session_state.workflow_state.get('documents', [])
-            language_tag = st.session_state.workflow_state.get('language_tag', 'en')
+            project_info = session_state.workflow_state.get('project_info', {})
+            documents = session_state.workflow_state.get('documents', [])
+            language_tag = session_state.workflow_state.get('language_tag', 'en')
             
             # Retrieve current vector store status (for cross-phase traceability)
             try:
@@ -239,7 +376,7 @@ class DecideWorkflow:
 
             # Save base context in SessionManager and workflow_state
             SessionManager.save_phase_output("context_base", base_context)
-            st.session_state.workflow_state["vector_store_status"] = vector_status
+            session_state.workflow_state["vector_store_status"] = vector_status
 
              # --- Persist also as Markdown for consistent chaining ---
             try:
@@ -254,7 +391,8 @@ class DecideWorkflow:
             except Exception as e:
                 SessionManager.add_log("WARNING", f"Failed to persist context bundle as Markdown: {str(e)}")
 
-
+            # Fresh run: start a new checkpoint with no completed phases
+            self._save_checkpoint({'completed_phases': [], 'phase_results': {}})
 
             # Create enhanced workflow manager
             enhanced_manager = EnhancedWorkflowManager(self)
@@ -279,7 +417,7 @@ class DecideWorkflow:
             SessionManager.update_agent_progress("collector_agent", 0.1, "starting", "Initializing document collection")
             
             # Get processed documents from session state
-            documents = st.session_state.workflow_state.get('documents', [])
+            documents = session_state.workflow_state.get('documents', [])
             if not documents:
                 return {
                     'success': False,
@@ -305,8 +443,8 @@ class DecideWorkflow:
             collector_task = CollectorAgent.create_task(documents_info, agent=collector_agent)
 
             # Persist active vector namespace for downstream runtime headers
-            ns = st.session_state.get('vector_namespace') or 'mimetica/mixed'
-            st.session_state['vector_namespace'] = ns
+            ns = session_state.get('vector_namespace') or 'mimetica/mixed'
+            session_state['vector_namespace'] = ns
 
 
             SessionManager.update_agent_progress("collector_agent", 0.5, "running", "Processing documents")
@@ -377,12 +515,12 @@ class DecideWorkflow:
 
             analysis_task = DecisionMultidisciplinaryAgent.create_task(context_md, agent=analysis_agent)
 
-            namespace = st.session_state.get('vector_namespace', 'mimetica/mixed')
+            namespace = session_state.get('vector_namespace', 'mimetica/mixed')
             analysis_task.description = (
                 "## RUNTIME CONTEXT\n"
                 f"- Vector namespace: {namespace}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
                 + analysis_task.description
             )
             
@@ -448,9 +586,9 @@ class DecideWorkflow:
             accumulated_context = self._get_accumulated_context(["collection", "analysis"])
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
                 "## ACCUMULATED CONTEXT\n"
                 f"{accumulated_context}\n\n"
             )
@@ -525,9 +663,9 @@ class DecideWorkflow:
             accumulated_context = self._get_accumulated_context(["collection", "analysis", "definition"])
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
                 "## ACCUMULATED CONTEXT\n"
                 f"{accumulated_context}\n\n"
             )
@@ -604,9 +742,9 @@ class DecideWorkflow:
             accumulated_context = self._get_accumulated_context(["collection", "analysis", "definition", "exploration"])
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
                 "## ACCUMULATED CONTEXT\n"
                 f"{accumulated_context}\n\n")
 
@@ -689,9 +827,9 @@ class DecideWorkflow:
 
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
                 "## ACCUMULATED CONTEXT\n"
                 f"{accumulated_context}\n\n"
             )
@@ -774,9 +912,9 @@ class DecideWorkflow:
 
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
             )
 
             simulate_task.description = (
@@ -803,38 +941,6 @@ class DecideWorkflow:
             
             result = self.execute_crew_with_logging(crew, "simulation", "simulate_agent")
             self._store_phase_output('simulation', result)
-
-
-            # Generate additional layman explanation if result contains technical analysis
-            SessionManager.update_agent_progress("simulate_agent", 0.9, "running", "Generating layman-friendly explanations")
-            
-            try:
-                from tools import monte_carlo_results_explainer
-                
-                # Extract key simulation numbers from the result for explanation
-                result_text = str(result) if not isinstance(result, str) else result
-                
-                # Generate explanation for different audiences
-                exec_explanation = monte_carlo_results_explainer(result_text, "executives")
-                manager_explanation = monte_carlo_results_explainer(result_text, "managers")
-                general_explanation = monte_carlo_results_explainer(result_text, "general")
-                
-                # Store explanations in session state for easy access
-                if 'workflow_state' in st.session_state:
-                    if 'simulation_explanations' not in st.session_state.workflow_state:
-                        st.session_state.workflow_state['simulation_explanations'] = {}
-                    
-                    st.session_state.workflow_state['simulation_explanations'] = {
-                        'executive': exec_explanation,
-                        'manager': manager_explanation,
-                        'general': general_explanation,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                
-                SessionManager.add_log("INFO", "Generated layman-friendly explanations for Monte Carlo results")
-                
-            except Exception as e:
-                SessionManager.add_log("WARNING", f"Could not generate layman explanations: {str(e)}")
             
             SessionManager.update_agent_progress("simulate_agent", 1.0, "completed", "Monte Carlo simulation completed")
             
@@ -843,8 +949,7 @@ class DecideWorkflow:
                 'phase': 'simulation',
                 'agent': 'simulate_agent',
                 'output': result,
-                'simulation_runs': config.MONTE_CARLO_RUNS,
-                'explanations_generated': True
+                'simulation_runs': config.MONTE_CARLO_RUNS
             }
         
         except Exception as e:
@@ -855,6 +960,45 @@ class DecideWorkflow:
                 'phase': 'simulation'
             }
     
+    def run_simulation_explainers_phase(self) -> Dict[str, Any]:
+        """Generate layman-friendly explanations of the simulation results (runs alongside evaluation)"""
+        explanations_generated = False
+        
+        try:
+            from tools import monte_carlo_results_explainer
+            
+            # Extract key simulation numbers from the result for explanation
+            result_text = self.get_previous_phase_output('simulation')
+            
+            # Generate explanation for different audiences
+            exec_explanation = monte_carlo_results_explainer(result_text, "executives")
+            manager_explanation = monte_carlo_results_explainer(result_text, "managers")
+            general_explanation = monte_carlo_results_explainer(result_text, "general")
+            
+            # Store explanations in session state for easy access
+            if 'workflow_state' in session_state:
+                with self.state_lock:
+                    session_state.workflow_state['simulation_explanations'] = {
+                        'executive': exec_explanation,
+                        'manager': manager_explanation,
+                        'general': general_explanation,
+                        'timestamp': datetime.now().isoformat()
+                    }
+            
+            explanations_generated = True
+            SessionManager.add_log("INFO", "Generated layman-friendly explanations for Monte Carlo results")
+            
+        except Exception as e:
+            SessionManager.add_log("WARNING", f"Could not generate layman explanations: {str(e)}")
+        
+        # Explanations are optional; a failure here never fails the workflow
+        return {
+            'success': True,
+            'phase': 'simulation_explainers',
+            'output': "Generated" if explanations_generated else "Unavailable",
+            'explanations_generated': explanations_generated
+        }
+    
     def run_evaluate_phase(self) -> Dict[str, Any]:
         """Run the evaluation framework phase"""
         try:
@@ -911,9 +1055,9 @@ class DecideWorkflow:
             #    "collection","analysis","definition","exploration","creation","implementation","simulation"])
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
             )
 
             evaluate_task.description = (
@@ -992,9 +1136,9 @@ class DecideWorkflow:
             #    "collection","analysis","definition","exploration","creation","implementation","simulation","evaluation"])
             runtime_header = (
                 "## RUNTIME CONTEXT\n"
-                f"- Vector namespace: {st.session_state.get('vector_namespace', 'mimetica/mixed')}\n"
+                f"- Vector namespace: {session_state.get('vector_namespace', 'mimetica/mixed')}\n"
                 f"- Model: {config.validate_and_fix_selected_model()}\n"
-                f"- Language: {st.session_state.get('language_tag', 'en')}\n\n"
+                f"- Language: {session_state.get('language_tag', 'en')}\n\n"
             )
 
             report_task.description = (
@@ -1031,7 +1175,7 @@ class DecideWorkflow:
                 'phase': 'report',
                 'agent': 'report_agent',
                 'output': result,
-                'includes_phases': list(st.session_state.workflow_state.get('phase_outputs', {}).keys())
+                'includes_phases': list(session_state.workflow_state.get('phase_outputs', {}).keys())
 
             }
         
@@ -1044,6 +1188,10 @@ class DecideWorkflow:
                 'phase': 'report'
             }
     
+    def get_phase_graph(self) -> List[tuple]:
+        """PHASE_GRAPH with bound phase methods: [(phase, function, input phases), ...]"""
+        return [(phase, getattr(self, method), list(inputs)) for phase, method, inputs in self.PHASE_GRAPH]
+    
     def format_documents_info(self, documents: List[Dict[str, Any]]) -> str:
         """Format document information for agent consumption"""
         if not documents:
@@ -1074,7 +1222,7 @@ class DecideWorkflow:
         context = ""
         
         # Add project information
-        project_info = st.session_state.workflow_state.get('project_info', {})
+        project_info = session_state.workflow_state.get('project_info', {})
         if project_info:
             context += f"Project Information:\n"
             context += f"- Project Name: {project_info.get('name', 'Unknown')}\n"
@@ -1091,7 +1239,7 @@ class DecideWorkflow:
             context += f"- Project Created: {project_info.get('created_at', 'Unknown')}\n\n"
         
         # Add document summary
-        documents = st.session_state.workflow_state.get('documents', [])
+        documents = session_state.workflow_state.get('documents', [])
         if documents:
             context += f"Document Summary:\n"
             context += f"- Total Documents: {len(documents)}\n"
@@ -1120,7 +1268,7 @@ class DecideWorkflow:
     
     def get_previous_phase_output(self, phase_name: str) -> str:
         """Get output from a previous phase"""
-        phase_outputs = st.session_state.workflow_state.get('phase_outputs', {})
+        phase_outputs = session_state.workflow_state.get('phase_outputs', {})
         if phase_name in phase_outputs:
             output_info = phase_outputs[phase_name]
             output = output_info.get('output', {})
@@ -1134,7 +1282,7 @@ class DecideWorkflow:
     
     def collect_all_phase_outputs(self) -> str:
         """Collect all phase outputs for final report"""
-        phase_outputs = st.session_state.workflow_state.get('phase_outputs', {})
+        phase_outputs = session_state.workflow_state.get('phase_outputs', {})
         
         if not phase_outputs:
             return "No phase outputs available for report generation."
@@ -1143,11 +1291,11 @@ class DecideWorkflow:
         consolidated_output += "=" * 60 + "\n\n"
         
         # Add project information and document details at the beginning
-        project_info = st.session_state.workflow_state.get('project_info', {})
-        documents = st.session_state.workflow_state.get('documents', [])
+        project_info = session_state.workflow_state.get('project_info', {})
+        documents = session_state.workflow_state.get('documents', [])
         
         consolidated_output += "PROJECT INFORMATION\n"
-        language_tag = st.session_state.workflow_state.get('language_tag', 'en')
+        language_tag = session_state.workflow_state.get('language_tag', 'en')
         consolidated_output += f"Target Output Language: {language_tag}\n"
         consolidated_output += "-" * 30 + "\n"
         consolidated_output += f"Project Name: {project_info.get('name', 'Not specified')}\n"
@@ -1167,7 +1315,7 @@ class DecideWorkflow:
             consolidated_output += "Files Used: No files uploaded\n"
         
         # Add simulation explanations if available
-        explanations = st.session_state.workflow_state.get('simulation_explanations', {})
+        explanations = session_state.workflow_state.get('simulation_explanations', {})
         if explanations:
             consolidated_output += "SIMULATION RESULTS - EXECUTIVE SUMMARY\n"
             consolidated_output += "-" * 40 + "\n"
@@ -1211,7 +1359,7 @@ class DecideWorkflow:
             Formatted explanation text for the specified audience
         """
         try:
-            explanations = st.session_state.workflow_state.get('simulation_explanations', {})
+            explanations = session_state.workflow_state.get('simulation_explanations', {})
             
             if not explanations:
                 return "No simulation explanations available. Run the simulation phase first."
@@ -1233,16 +1381,16 @@ class DecideWorkflow:
             'execution_date': datetime.now().isoformat(),
             'total_phases': len(all_results),
             'phases_completed': list(all_results.keys()),
-            'documents_processed': len(st.session_state.workflow_state.get('documents', [])),
+            'documents_processed': len(session_state.workflow_state.get('documents', [])),
             'success_rate': 100,  # If we reach here, all phases succeeded
             'total_agents_used': 9,
             'methodology': 'DECIDE Framework with CrewAI Multi-Agent Orchestration'
         }
 
     def _ensure_workflow_state(self):
-        if 'workflow_state' not in st.session_state:
-            st.session_state.workflow_state = {}
-        ws = st.session_state.workflow_state
+        if 'workflow_state' not in session_state:
+            session_state.workflow_state = {}
+        ws = session_state.workflow_state
         if 'phase_outputs' not in ws:
             ws['phase_outputs'] = {}
         if 'documents' not in ws:
@@ -1250,7 +1398,7 @@ class DecideWorkflow:
         if 'project_info' not in ws:
             ws['project_info'] = {}
         if 'language_tag' not in ws:
-            ws['language_tag'] = st.session_state.get('language_tag', 'en')
+            ws['language_tag'] = session_state.get('language_tag', 'en')
 
     def _store_phase_output(self, phase_key: str, output: Any):
         """Store phase output in session_state and persist a single latest Markdown file (no history)."""
@@ -1266,19 +1414,11 @@ class DecideWorkflow:
         timestamp_iso = datetime.now().isoformat()
 
         # Keep full output on disk, but trim what we keep in session to avoid heavy memory usage
-        # NOTE: 200k chars ~ 200 KB in memory; tune if needed.
-        MAX_SESSION_CHARS = 200_000  # safe default
-
-        # If too large, keep a truncated copy in session_state; full output still goes to disk below
-        session_out = (
-            out_str if len(out_str) <= MAX_SESSION_CHARS
-            else out_str[:MAX_SESSION_CHARS] + "\n...[truncated in session]"
-        )
-
-        st.session_state.workflow_state['phase_outputs'][phase_key] = {
-            'timestamp': timestamp_iso,
-            'output': session_out
-        }
+        with self.state_lock:
+            session_state.workflow_state['phase_outputs'][phase_key] = {
+                'timestamp': timestamp_iso,
+                'output': self._session_copy(out_str)
+            }
 
 
         # Persist a single 'latest' file per phase (overwrites each run)
@@ -1290,7 +1430,7 @@ class DecideWorkflow:
         latest_path = os.path.join(latest_dir, f"{phase_key}.md")
 
         # Compose Markdown header
-        lang_tag = st.session_state.workflow_state.get('language_tag', 'en')
+        lang_tag = session_state.workflow_state.get('language_tag', 'en')
         timestamp_tag = datetime.now().strftime("%Y%m%d_%H%M%S")
         header = [
             f"# Phase: {phase_key.capitalize()}",
@@ -1307,8 +1447,9 @@ class DecideWorkflow:
                 f.write(md_full)
 
             # Track just the latest path (no archive array)
-            saved = st.session_state.workflow_state.setdefault("saved_markdown_files", {})
-            saved[phase_key] = {"latest": latest_path}
+            with self.state_lock:
+                saved = session_state.workflow_state.setdefault("saved_markdown_files", {})
+                saved[phase_key] = {"latest": latest_path}
 
             SessionManager.add_log("INFO", f"Saved (latest) {latest_path}")
 
@@ -1325,8 +1466,231 @@ class DecideWorkflow:
         except Exception as e:
             SessionManager.add_log("WARNING", f"Failed to save Markdown file for {phase_key}: {str(e)}")
     
+    def _session_copy(self, out_str: str) -> str:
+        """Output as kept in session_state: truncated past MAX_SESSION_CHARS (~200 KB)"""
+        if len(out_str) <= self.MAX_SESSION_CHARS:
+            return out_str
+        return out_str[:self.MAX_SESSION_CHARS] + "\n...[truncated in session]"
+
+    # -------------------------------------------
+    # Checkpoints
+
+    def _checkpoint_path(self, workflow_id: Optional[str] = None) -> str:
+        return os.path.join("outputs", workflow_id or self.workflow_id, "latest", self.CHECKPOINT_FILE)
+
+    def load_checkpoint(self, workflow_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Load the checkpoint of a workflow (default: this one), or None if there is none"""
+        path = self._checkpoint_path(workflow_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            SessionManager.add_log("WARNING", f"Ignoring unreadable checkpoint {path}: {str(e)}")
+            return None
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        """
+        Write the checkpoint atomically, refreshing its session snapshot
+
+        The checkpoint records the completed phases and their results (minus the
+        output itself, which lives in the phase's latest .md file), where each
+        phase's Markdown was saved, and the session state the phases read besides
+        phase outputs, so a new session can pick up where this one stopped.
+        """
+        ws = session_state.workflow_state
+        # Phases still running keep writing these; snapshot them instead of iterating live
+        with self.state_lock:
+            saved = dict(ws.get('saved_markdown_files', {}))
+            phase_outputs = dict(ws.get('phase_outputs', {}))
+            simulation_explanations = ws.get('simulation_explanations')
+            documents = list(ws.get('documents', []))
+
+        state['workflow_id'] = self.workflow_id
+        state['updated_at'] = datetime.now().isoformat()
+        state['phase_files'] = {
+            phase: {
+                'path': files.get('latest'),
+                'timestamp': phase_outputs.get(phase, {}).get('timestamp')
+            }
+            for phase, files in saved.items() if files.get('latest')
+        }
+        # Outputs that only live in session (e.g. context_base)
+        state['inline_outputs'] = {
+            phase: output for phase, output in phase_outputs.items() if phase not in saved
+        }
+        state['session'] = {
+            'project_info': ws.get('project_info', {}),
+            'language_tag': ws.get('language_tag', 'en'),
+            'vector_store_status': ws.get('vector_store_status'),
+            'vector_namespace': session_state.get('vector_namespace'),
+            'simulation_explanations': simulation_explanations,
+            # Metadata only; document content is already in the vector store
+            'documents': [
+                {k: v for k, v in doc.items() if k not in ('content', 'chunks')}
+                for doc in documents
+            ]
+        }
+
+        path = self._checkpoint_path()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, ensure_ascii=False, indent=2, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            SessionManager.add_log("WARNING", f"Failed to write checkpoint {path}: {str(e)}")
+
+    def checkpoint_phase(self, phase_name: str, phase_result: Dict[str, Any]):
+        """Record a successfully completed phase in the checkpoint"""
+        state = self.load_checkpoint() or {'completed_phases': [], 'phase_results': {}}
+        state.setdefault('phase_results', {})[phase_name] = {
+            k: v for k, v in phase_result.items() if k != 'output' or isinstance(v, str)
+        }
+        completed = state.setdefault('completed_phases', [])
+        if phase_name not in completed:
+            completed.append(phase_name)
+        self._save_checkpoint(state)
+
+    def _read_phase_markdown(self, path: str) -> Optional[str]:
+        """Phase output from a latest .md file written by _store_phase_output (header stripped)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                md = f.read()
+        except OSError:
+            return None
+        # Header: phase, timestamp, workflow id, language tag, blank line
+        parts = md.split("\n", 4)
+        return parts[4] if len(parts) == 5 else None
+
+    def _restore_checkpoint(self, state: Dict[str, Any]) -> List[str]:
+        """
+        Rehydrate session state from a checkpoint
+
+        Returns:
+            Completed phases whose outputs could be restored, in completion order
+        """
+        self._ensure_workflow_state()
+        ws = session_state.workflow_state
+        session = state.get('session', {})
+
+        ws['project_info'] = session.get('project_info') or ws['project_info']
+        ws['language_tag'] = session.get('language_tag') or ws['language_tag']
+        for key in ('vector_store_status', 'simulation_explanations'):
+            if session.get(key) is not None:
+                ws[key] = session[key]
+        if session.get('vector_namespace'):
+            session_state['vector_namespace'] = session['vector_namespace']
+        if not ws['documents']:
+            ws['documents'] = session.get('documents', [])
+
+        for phase, output in state.get('inline_outputs', {}).items():
+            ws['phase_outputs'][phase] = output
+
+        saved = ws.setdefault('saved_markdown_files', {})
+        for phase, info in state.get('phase_files', {}).items():
+            output = self._read_phase_markdown(info.get('path') or '')
+            if output is None:
+                continue
+            ws['phase_outputs'][phase] = {
+                'timestamp': info.get('timestamp') or state.get('updated_at'),
+                'output': self._session_copy(output)
+            }
+            saved[phase] = {'latest': info['path']}
+
+        # A phase without its stored output has to run again
+        restored = []
+        for phase in state.get('completed_phases', []):
+            if phase in ws['phase_outputs'] or phase not in state.get('phase_files', {}):
+                restored.append(phase)
+        return restored
+
+    def resume_from(self, phase: Optional[str] = None, workflow_id: Optional[str] = None,
+                    use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Resume a workflow from its checkpoint, skipping completed phases
+
+        Args:
+            phase: Phase to re-run along with every phase that depends on it
+                   (default: continue after the last successful phase)
+            workflow_id: Checkpointed workflow to resume (default: this one)
+            use_cache: Reuse cached outputs of re-run phases whose inputs are unchanged
+
+        Returns:
+            Workflow execution result, as from run_complete_workflow
+        """
+        self._ensure_workflow_state()
+        self.use_phase_cache = use_cache
+        self.cached_phases = set()
+        try:
+            state = self.load_checkpoint(workflow_id)
+            if state is None:
+                return {
+                    'success': False,
+                    'error': f"No checkpoint found for {workflow_id or self.workflow_id}",
+                    'workflow_id': self.workflow_id
+                }
+
+            if workflow_id and workflow_id != self.workflow_id:
+                # Adopt the checkpointed workflow; this session's outputs belong to another one
+                self.workflow_id = workflow_id
+                session_state.workflow_state['workflow_id'] = workflow_id
+                session_state.workflow_state['phase_outputs'] = {}
+                session_state.workflow_state['saved_markdown_files'] = {}
+
+            graph = self.get_phase_graph()
+            if phase is not None and phase not in {name for name, _, _ in graph}:
+                return {
+                    'success': False,
+                    'error': f"Unknown phase: {phase}",
+                    'workflow_id': self.workflow_id
+                }
+
+            completed = self._restore_checkpoint(state)
+
+            # Re-run the requested phase and, transitively, everything downstream of it
+            rerun = {phase} if phase else set()
+            for name, _, inputs in graph:
+                if rerun & set(inputs):
+                    rerun.add(name)
+            completed = [p for p in completed if p not in rerun]
+
+            state['completed_phases'] = completed
+            self._save_checkpoint(state)
+
+            ws = session_state.workflow_state
+            ws['completed_phases'] = list(completed)
+            ws['workflow_completed'] = False
+
+            completed_results = {}
+            for name in completed:
+                result = dict(state.get('phase_results', {}).get(name, {'success': True, 'phase': name}))
+                if 'output' not in result:
+                    result['output'] = ws['phase_outputs'].get(name, {}).get('output', '')
+                completed_results[name] = result
+
+            SessionManager.add_log(
+                "INFO",
+                f"Resuming {self.workflow_id} with {len(completed_results)} checkpointed phases"
+                + (f", re-running from {phase}" if phase else "")
+            )
+
+            enhanced_manager = EnhancedWorkflowManager(self)
+            return enhanced_manager.run_enhanced_workflow(completed_results=completed_results)
+
+        except Exception as e:
+            error_msg = f"Workflow resume failed: {str(e)}"
+            SessionManager.add_log("ERROR", error_msg)
+            return {
+                'success': False,
+                'error': error_msg,
+                'workflow_id': self.workflow_id
+            }
+
     def _language_directive(self) -> str:
-        tag = st.session_state.workflow_state.get('language_tag', 'en')
+        tag = session_state.workflow_state.get('language_tag', 'en')
         return (
             "LANGUAGE POLICY:\n"
             "- Think, reason, and plan internally in ENGLISH.\n"
@@ -1356,7 +1720,7 @@ class DecideWorkflow:
     def _get_saved_markdown_bundle(self) -> str:
         """Build a consolidated Markdown bundle from the single 'latest' .md files plus project info and vector DB status."""
         self._ensure_workflow_state()
-        ws = st.session_state.workflow_state
+        ws = session_state.workflow_state
         saved = ws.get("saved_markdown_files", {})
         project = ws.get("project_info", {})
         lang_tag = ws.get("language_tag", "en")